@@ -4,6 +4,9 @@ import os
 
 src_dir = os.path.join(os.getcwd(), 'src')
 icon_path = os.path.join(src_dir, 'icon.ico')
+# TALLYCOUNTER_ONEDIR=1 builds a one-folder app instead of a single .exe
+# (used by benchmarks/bench_startup.py; skips the one-file unpack on every start)
+onedir = os.environ.get('TALLYCOUNTER_ONEDIR') == '1'
 
 a = Analysis(
     [os.path.join(src_dir, 'main.py')],
@@ -38,9 +41,9 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
+    *([] if onedir else [a.binaries, a.datas]),
     [],
+    exclude_binaries=onedir,
     name='TallyCounter',
     debug=False,
     bootloader_ignore_signals=False,
@@ -56,3 +59,14 @@ exe = EXE(
     entitlements_file=None,
     icon=icon_path if os.path.exists(icon_path) else None,
 )
+
+if onedir:
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=False,
+        upx=True,
+        upx_exclude=[],
+        name='TallyCounter',
+    )
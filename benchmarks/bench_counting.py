@@ -0,0 +1,163 @@
+"""
+Benchmark suite for the counting engine on synthetic process tables.
+
+Drives MonitorCore.poll_once() (the loop MonitorWorker runs) through an
+in-memory FakeProcessSource, so it needs no real processes and runs on any OS.
+
+Scenarios, each at 1k, 10k and 50k processes:
+  chrome   Chrome-like browser + helper trees among ordinary services
+  uwp      Store-app style targets whose running exe path differs from config
+  churn    2% of processes exit and are replaced by new pids before every scan
+
+Reported per case:
+  scans_per_sec              median scan rate
+  net_alloc_blocks_per_scan  Python memory blocks still allocated after a scan
+                             (should stay ~0; growth means something is retained)
+  peak_scan_kib              peak memory allocated while one scan runs
+  peak_rss_mib               process peak RSS after the case (Linux/macOS)
+
+Usage:
+  python benchmarks/bench_counting.py [--sizes 1000 10000 50000] [--scans 20]
+                                      [--output results.json] [--compare old.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+sys.path.insert(0, HERE)
+
+from database import Database  # noqa: E402
+from monitor_core import MonitorCore  # noqa: E402
+from synthetic import (CHROME_EXE, UWP_INSTALLED_EXE, UWP_RUNNING_EXE,  # noqa: E402
+                       FakeProcessSource, build_process_tree, rebase_exes)
+
+MEMORY_SCANS = 5
+
+SCENARIOS = {
+    # name: (build_process_tree kwargs, target exe, churn)
+    "chrome": ({"chrome_instances": 25, "helpers_per_chrome": 15}, CHROME_EXE, 0.0),
+    "uwp":    ({"uwp_instances": 10}, UWP_INSTALLED_EXE, 0.0),
+    "churn":  ({"chrome_instances": 25, "helpers_per_chrome": 15}, CHROME_EXE, 0.02),
+}
+
+
+def peak_rss_mib():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_case(tmp, scenario, size, scans):
+    tree_kwargs, target, churn = SCENARIOS[scenario]
+    procs = build_process_tree(size, **tree_kwargs)
+    exe_root = os.path.join(tmp, f"{scenario}_{size}")
+    procs = rebase_exes(exe_root, procs, missing={UWP_RUNNING_EXE})
+    target_path = os.path.join(exe_root, target.lstrip("/"))
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    open(target_path, "a").close()
+
+    source = FakeProcessSource(procs, churn=churn)
+    db = Database(os.path.join(tmp, f"{scenario}_{size}.db"))
+    core = MonitorCore(target_path, db=db, source=source)
+    count = core.poll_once()  # warm caches
+
+    # Timing pass, without tracemalloc (it slows allocation-heavy code several-fold)
+    times = []
+    for _ in range(scans):
+        source.advance()
+        start = time.perf_counter()
+        core.poll_once()
+        times.append(time.perf_counter() - start)
+
+    # Memory pass
+    blocks = []
+    peaks = []
+    for _ in range(min(scans, MEMORY_SCANS)):
+        source.advance()
+        start_blocks = sys.getallocatedblocks()
+        tracemalloc.start()
+        core.poll_once()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        blocks.append(sys.getallocatedblocks() - start_blocks)
+        peaks.append(peak)
+    db.close()
+
+    return {
+        "scenario": scenario,
+        "processes": len(procs),
+        "count": count,
+        "scans_per_sec": 1 / statistics.median(times),
+        "median_scan_ms": statistics.median(times) * 1000,
+        "net_alloc_blocks_per_scan": statistics.median(blocks),
+        "peak_scan_kib": max(peaks) / 1024,
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["scenario"], r["processes"]): r for r in json.load(f)["results"]}
+    print(f"\nvs {baseline_path}:")
+    for r in results:
+        old = baseline.get((r["scenario"], r["processes"]))
+        if old:
+            ratio = r["scans_per_sec"] / old["scans_per_sec"]
+            print(f"  {r['scenario']:<7}{r['processes']:>7}  {ratio:5.2f}x scans/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--scans", type=int, default=20)
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--compare", help="Print scan-rate ratios against an earlier JSON run")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="tally_bench_")
+    results = []
+    try:
+        print(f"{'scenario':<9}{'procs':>7}{'count':>7}{'scans/s':>10}{'ms/scan':>10}"
+              f"{'blocks':>8}{'peak KiB':>10}{'RSS MiB':>9}")
+        for scenario in args.scenarios:
+            for size in args.sizes:
+                r = run_case(tmp, scenario, size, args.scans)
+                results.append(r)
+                rss = f"{r['peak_rss_mib']:.1f}" if r["peak_rss_mib"] is not None else "-"
+                print(f"{scenario:<9}{r['processes']:>7}{r['count']:>7}{r['scans_per_sec']:>10.1f}"
+                      f"{r['median_scan_ms']:>10.2f}{r['net_alloc_blocks_per_scan']:>8.0f}"
+                      f"{r['peak_scan_kib']:>10.1f}{rss:>9}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": results,
+            }, f, indent=2)
+        print(f"\nSaved {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: GUI event-loop latency with the scanner in-process vs out-of-process.
+
+A 5 ms QTimer runs on the Qt main thread and records how late each tick fires
+while the monitor scans a synthetic /proc table as fast as it can:
+
+  idle            no monitor running (baseline)
+  in-process      MonitorCore on a background thread of the GUI process
+  out-of-process  OutOfProcessMonitor (scan runs in a child process)
+
+Usage:
+  QT_QPA_PLATFORM=offscreen python benchmarks/bench_gui_latency.py [--procs 20000] [--seconds 5]
+"""
+
+import argparse
+import functools
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+sys.path.insert(0, HERE)
+
+from database import Database  # noqa: E402
+from monitor_core import MonitorCore  # noqa: E402
+from process_source import ProcFsProcessSource  # noqa: E402
+from scanner_process import OutOfProcessMonitor  # noqa: E402
+from synthetic import CHROME_EXE, build_process_tree, write_fake_procfs  # noqa: E402
+
+TICK_MS = 5
+
+
+def measure_latency(app, seconds):
+    from PyQt6.QtCore import QTimer, QEventLoop
+    lateness = []
+    last = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        lateness.append(max(0.0, (now - last[0]) * 1000 - TICK_MS))
+        last[0] = now
+
+    timer = QTimer()
+    timer.setInterval(TICK_MS)
+    timer.timeout.connect(tick)
+    timer.start()
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+    timer.stop()
+    lateness.sort()
+    return {
+        "ticks": len(lateness),
+        "p50_ms": statistics.median(lateness),
+        "p99_ms": lateness[int(len(lateness) * 0.99) - 1],
+        "max_ms": lateness[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--procs", type=int, default=20_000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+
+    tmp = tempfile.mkdtemp(prefix="tally_latency_")
+    try:
+        root = os.path.join(tmp, "proc")
+        exe_dir = write_fake_procfs(root, build_process_tree(args.procs))
+        target = os.path.join(exe_dir, CHROME_EXE.lstrip("/"))
+        db_path = os.path.join(tmp, "bench.db")
+        results = {}
+
+        results["idle"] = measure_latency(app, args.seconds)
+
+        core = MonitorCore(target, db=Database(db_path), source=ProcFsProcessSource(root))
+        core.poll_interval = 0  # scan back-to-back: worst case for the GIL
+        thread = threading.Thread(target=core.run, daemon=True)
+        thread.start()
+        results["in-process"] = measure_latency(app, args.seconds)
+        core.stop()
+        thread.join()
+
+        monitor = OutOfProcessMonitor(target, db_name=db_path, poll_interval=0,
+                                      source_factory=functools.partial(ProcFsProcessSource, root))
+        thread = threading.Thread(target=monitor.run, daemon=True)
+        thread.start()
+        results["out-of-process"] = measure_latency(app, args.seconds)
+        monitor.stop()
+        thread.join()
+
+        print(f"{'mode':<16}{'ticks':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for mode, r in results.items():
+            print(f"{mode:<16}{r['ticks']:>8}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['max_ms']:>10.2f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark: /proc scanner vs the psutil paths on a synthetic process table.
+
+Builds a fake /proc with N processes (default 10,000) in a temp directory and
+times three ways of counting the same instances:
+
+  baseline   the original monitor loop: process_iter() fetching exe for
+             every process, then psutil.Process(ppid).name() per match
+  psutil     InstanceScanner.count() with PsutilProcessSource
+  procfs     InstanceScanner.count() with ProcFsProcessSource
+
+psutil is pointed at the same tree via PROCFS_PATH.
+
+Usage:
+  python benchmarks/bench_proc_scanner.py [--procs 10000] [--repeat 20]
+
+Linux only for the psutil comparison; the /proc reader itself only needs a
+filesystem, so it runs wherever the fake tree can be written.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+sys.path.insert(0, HERE)
+
+from process_source import ProcFsProcessSource, PsutilProcessSource  # noqa: E402
+from scanner import InstanceScanner  # noqa: E402
+from synthetic import CHROME_EXE, build_process_tree, write_fake_procfs  # noqa: E402
+
+
+def baseline_count(executable_path):
+    """The counting loop as it was before the process-source abstraction."""
+    import psutil
+    executable_name = os.path.basename(executable_path)
+    name_lower = executable_name.lower()
+
+    def same_exe(path_a, path_b):
+        try:
+            return os.path.samefile(path_a, path_b)
+        except (FileNotFoundError, OSError):
+            return os.path.basename(path_a).lower() == os.path.basename(path_b).lower()
+
+    main_pids = set()
+    for proc in psutil.process_iter(['pid', 'ppid', 'name', 'exe']):
+        try:
+            proc_name = proc.info['name']
+            proc_exe = proc.info['exe']
+            if sys.platform == 'win32':
+                if proc_name.lower() != name_lower:
+                    continue
+            elif proc_name != executable_name:
+                continue
+            if proc_exe and not same_exe(proc_exe, executable_path):
+                continue
+            parent_is_same = False
+            ppid = proc.info['ppid']
+            if ppid:
+                try:
+                    parent_name = psutil.Process(ppid).name()
+                    if sys.platform == 'win32':
+                        parent_is_same = parent_name.lower() == name_lower
+                    else:
+                        parent_is_same = parent_name == executable_name
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            if not parent_is_same:
+                main_pids.add(proc.info['pid'])
+        except (psutil.NoSuchProcess, psutil.AccessDenied, FileNotFoundError):
+            continue
+    return len(main_pids)
+
+
+def time_scans(count_fn, exe_path, repeat):
+    samples = []
+    count = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = count_fn(exe_path)
+        samples.append(time.perf_counter() - start)
+    return count, samples
+
+
+def report(label, count, samples):
+    median = statistics.median(samples) * 1000
+    best = min(samples) * 1000
+    print(f"{label:<10} count={count:<4} median={median:8.2f} ms  best={best:8.2f} ms  "
+          f"({1000 / median:.1f} scans/s)")
+    return median
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--procs", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="tally_fakeproc_")
+    try:
+        root = os.path.join(tmp, "proc")
+        procs = build_process_tree(args.procs)
+        exe_dir = write_fake_procfs(root, procs)
+        target = os.path.join(exe_dir, CHROME_EXE.lstrip("/"))
+        print(f"Synthetic table: {len(procs)} processes under {root}")
+
+        count, samples = time_scans(InstanceScanner(ProcFsProcessSource(root)).count, target,
+                                    args.repeat)
+        procfs_ms = report("procfs", count, samples)
+
+        try:
+            import psutil
+        except ImportError:
+            print("psutil     not installed, skipping comparison")
+            return
+        if not sys.platform.startswith("linux"):
+            print("psutil     PROCFS_PATH override is Linux-only, skipping comparison")
+            return
+        saved = psutil.PROCFS_PATH
+        psutil.PROCFS_PATH = root
+        try:
+            count, samples = time_scans(baseline_count, target, args.repeat)
+            baseline_ms = report("baseline", count, samples)
+            count, samples = time_scans(InstanceScanner(PsutilProcessSource()).count, target,
+                                        args.repeat)
+            psutil_ms = report("psutil", count, samples)
+        finally:
+            psutil.PROCFS_PATH = saved
+        print(f"speed-up   procfs vs baseline {baseline_ms / procfs_ms:.1f}x, "
+              f"vs psutil {psutil_ms / procfs_ms:.1f}x; psutil vs baseline "
+              f"{baseline_ms / psutil_ms:.1f}x")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
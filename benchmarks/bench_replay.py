@@ -0,0 +1,126 @@
+"""
+Benchmark: end-to-end trace replay with a simulated clock.
+
+Synthesizes a trace spanning several days (5 s snapshots across midnight) in
+which top-level app instances, each with a few helper children, start and
+stop at random. The generator keeps its own ground truth of how many
+top-level instances were running at every snapshot. The trace is replayed
+through MonitorCore + Database via proc_trace.replay(), and the run checks:
+
+  * every day's stored maximum equals the ground-truth maximum
+  * a day that starts with instances already running (midnight rollover) is recorded
+  * database writes never exceed the number of snapshots, and there is at most
+    one write per count change plus one per day
+
+Throughput is reported as simulated hours per wall-clock second.
+
+Usage:
+  python benchmarks/bench_replay.py [--days 2] [--procs 500] [--min-speedup 1000]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+sys.path.insert(0, HERE)
+
+from database import Database  # noqa: E402
+from proc_trace import TraceWriter, replay  # noqa: E402
+from synthetic import build_process_tree  # noqa: E402
+
+APP_EXE = "/opt/tally/tally"
+INTERVAL = 5
+
+
+def synthesize_trace(path, days, procs, seed=1):
+    """Write a trace and return the ground-truth daily maxima."""
+    rng = random.Random(seed)
+    table = {pid: (ppid, name, exe) for pid, ppid, name, exe in
+             build_process_tree(procs, chrome_instances=5, tally_instances=0, seed=seed)}
+    next_pid = max(table) + 1
+    instances = {}  # top-level pid -> helper pids
+    truth = {}
+    # Start at 22:00 so the first midnight arrives early, with instances running
+    start = datetime(2026, 3, 1, 22, 0).timestamp()
+    steps = int(days * 86400 / INTERVAL)
+
+    with TraceWriter(path, INTERVAL) as writer:
+        for step in range(steps):
+            t = start + step * INTERVAL
+            if rng.random() < 0.02 and len(instances) < 12:
+                pid = next_pid
+                table[pid] = (1, "tally", APP_EXE)
+                helpers = []
+                for i in range(rng.randint(0, 3)):
+                    table[pid + 1 + i] = (pid, "tally", APP_EXE)
+                    helpers.append(pid + 1 + i)
+                instances[pid] = helpers
+                next_pid += 10
+            elif rng.random() < 0.015 and instances:
+                pid = rng.choice(sorted(instances))
+                for helper in instances.pop(pid):
+                    table.pop(helper, None)
+                table.pop(pid)
+            writer.write_snapshot(t, dict(table))
+            day = datetime.fromtimestamp(t).strftime('%Y-%m-%d')
+            truth[day] = max(truth.get(day, 0), len(instances))
+    return truth, steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=float, default=2.0)
+    parser.add_argument("--procs", type=int, default=500)
+    parser.add_argument("--min-speedup", type=float, default=1000.0,
+                        help="Fail if replay is slower than this multiple of real time")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="tally_replay_")
+    try:
+        trace = os.path.join(tmp, "synthetic.trace.gz")
+        truth, steps = synthesize_trace(trace, args.days, args.procs)
+        print(f"Trace: {steps} snapshots, {os.path.getsize(trace) / 1024:.0f} KiB compressed")
+
+        # The target exe must exist for samefile; the trace's paths don't, so
+        # matching falls back to the exe name exactly as for a moved install.
+        exe_path = os.path.join(tmp, "tally")
+        open(exe_path, "w").close()
+        db = Database(os.path.join(tmp, "replay.db"))
+        result = replay(trace, exe_path, db)
+        db.close()
+
+        hours_per_sec = result["simulated_seconds"] / 3600 / result["wall_seconds"]
+        print(f"Replayed {result['polls']} polls in {result['wall_seconds']:.2f} s: "
+              f"{hours_per_sec:.1f} simulated h / wall s ({result['speedup']:.0f}x)")
+        print(f"DB writes: {result['writes']}  count changes: {result['count_changes']}")
+
+        failures = []
+        for day, expected in sorted(truth.items()):
+            got = result["daily_max"].get(day)
+            status = "ok" if got == expected and day not in result["mismatches"] else "FAIL"
+            print(f"  {day}  expected {expected:>2}  replayed {got:>2}  {status}")
+            if status != "ok":
+                failures.append(f"{day}: expected {expected}, got {got}")
+        if result["mismatches"]:
+            failures.append(f"database disagrees with replay: {result['mismatches']}")
+        if result["writes"] > result["count_changes"] + len(truth):
+            failures.append("more database writes than count changes + days")
+        if result["speedup"] < args.min_speedup:
+            failures.append(f"replay ran at {result['speedup']:.0f}x, below {args.min_speedup:.0f}x")
+
+        if failures:
+            print("\nFAILED:\n  " + "\n  ".join(failures))
+            sys.exit(1)
+        print("\nAll checks passed.")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Benchmark: tray-app start-up time and per-module import cost, against a budget.
+
+Launches src/main.py (and optionally a PyInstaller one-folder build) under the
+offscreen Qt platform with TALLYCOUNTER_STARTUP_PROBE set. The app then writes
+its start-up timings once the first count arrives, opens the dashboard, and quits:
+
+  tray_ms          main.py import → tray icon shown
+  first_count_ms   main.py import → first instance count delivered
+  dashboard_ms     main.py import → dashboard shown and painted
+  process_ms       process launch → tray icon shown (includes the interpreter)
+  wall_ms          process launch → exit, measured from outside
+
+As many runs again under `python -X importtime` record the median cumulative
+import time of the project's modules and the heavy dependencies (PyQt6, psutil).
+
+Everything is compared with benchmarks/startup_budget.json. The budget also
+lists modules that must not be loaded before the first count, such as the
+windows that are built lazily. Any metric over budget fails the run, as does
+an imported project module that has no budget yet, so new modules can't slip
+past the gate.
+
+Usage:
+  python benchmarks/bench_startup.py [--runs 5] [--budget FILE] [--update-budget]
+                                     [--frozen] [--frozen-dir DIST_DIR]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+SRC = os.path.join(ROOT, "src")
+DEFAULT_BUDGET = os.path.join(HERE, "startup_budget.json")
+RUN_TIMEOUT = 60  # seconds
+BUDGET_HEADROOM = 1.5  # --update-budget writes measured × this …
+MIN_SLACK_MS = 5.0     # … but at least measured + this, so sub-ms imports don't flap
+
+TIMINGS = {
+    # report name: key written by the probe
+    "tray_ms": "startup_tray_ms",
+    "first_count_ms": "startup_first_count_ms",
+    "dashboard_ms": "startup_dashboard_ms",
+    "process_ms": "startup_process_ms",
+}
+THIRD_PARTY = ["PyQt6.QtCore", "PyQt6.QtGui", "PyQt6.QtWidgets", "psutil", "sqlite3"]
+
+
+def project_modules():
+    return sorted(f[:-3] for f in os.listdir(SRC) if f.endswith(".py"))
+
+
+def prepare_data_dir(data_dir):
+    """A fresh database configured to count the Python interpreter."""
+    sys.path.insert(0, SRC)
+    os.environ["TALLYCOUNTER_DATA_DIR"] = data_dir
+    from database import Database
+    db = Database()
+    db.set_config("executable_path", sys.executable)
+    db.close()
+
+
+def launch(cmd, data_dir):
+    """Run the app once and return (probe timings, wall ms, stderr)."""
+    probe = os.path.join(data_dir, "probe.json")
+    if os.path.exists(probe):
+        os.remove(probe)
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", TALLYCOUNTER_DATA_DIR=data_dir,
+               TALLYCOUNTER_STARTUP_PROBE=probe)
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=RUN_TIMEOUT)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if not os.path.exists(probe):
+        raise RuntimeError(f"{' '.join(cmd)} exited ({proc.returncode}) without writing the probe:\n"
+                           f"{proc.stderr[-2000:]}")
+    with open(probe, encoding="utf-8") as f:
+        return json.load(f), wall_ms, proc.stderr
+
+
+def measure(cmd, data_dir, runs):
+    samples = {name: [] for name in TIMINGS}
+    samples["wall_ms"] = []
+    modules = set()
+    for _ in range(runs):
+        probe, wall_ms, _ = launch(cmd, data_dir)
+        for name, key in TIMINGS.items():
+            samples[name].append(probe[key])
+        samples["wall_ms"].append(wall_ms)
+        modules.update(probe["modules_at_first_count"])
+    return {name: statistics.median(values) for name, values in samples.items()}, modules
+
+
+def parse_importtime(stderr, wanted):
+    """Cumulative import ms per wanted module from `-X importtime` output."""
+    result = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+            result.setdefault(name, int(cumulative) / 1000)
+        except ValueError:
+            continue  # the header line
+    return {name: result[name] for name in wanted if name in result}
+
+
+def build_frozen(dist_dir):
+    """Build the one-folder app from TallyCounter.spec; return its executable or None."""
+    if importlib.util.find_spec("PyInstaller") is None:
+        print("PyInstaller is not installed; skipping the frozen build.")
+        return None
+    work_dir = os.path.join(dist_dir, "_build")
+    print("Building one-folder app with PyInstaller …")
+    subprocess.run([sys.executable, "-m", "PyInstaller", "--noconfirm", "--log-level", "WARN",
+                    "--distpath", dist_dir, "--workpath", work_dir, "TallyCounter.spec"],
+                   cwd=ROOT, env=dict(os.environ, TALLYCOUNTER_ONEDIR="1"), check=True)
+    return frozen_executable(dist_dir)
+
+
+def frozen_executable(dist_dir):
+    name = "TallyCounter.exe" if sys.platform == "win32" else "TallyCounter"
+    path = os.path.join(dist_dir, "TallyCounter", name)
+    return path if os.path.exists(path) else None
+
+
+def check_budget(results, forbidden_found, budget):
+    failures = []
+    print(f"\n{'metric':<36}{'measured':>10}{'budget':>10}")
+    for section, metrics in results.items():
+        for name, value in metrics.items():
+            key = f"{section}.{name}"
+            limit = budget.get("limits", {}).get(key)
+            if limit is None:
+                status = "NO BUDGET" if section == "import" else ""
+            else:
+                status = "ok" if value <= limit else "OVER"
+            limit_text = f"{limit:>10.1f}" if limit is not None else f"{'-':>10}"
+            print(f"{key:<36}{value:>10.1f}{limit_text}  {status}")
+            if status == "OVER":
+                failures.append(f"{key} {value:.1f} ms > {limit} ms")
+            elif status == "NO BUDGET":
+                failures.append(f"{key} has no budget (add it, or run with --update-budget)")
+    for label, modules in forbidden_found.items():
+        if modules:
+            failures.append(f"{label} loaded before the first count: {', '.join(sorted(modules))}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Timed launches per layout (median)")
+    parser.add_argument("--budget", default=DEFAULT_BUDGET)
+    parser.add_argument("--update-budget", action="store_true",
+                        help=f"Rewrite the limits as measured × {BUDGET_HEADROOM} "
+                             f"(at least + {MIN_SLACK_MS:.0f} ms)")
+    parser.add_argument("--frozen", action="store_true",
+                        help="Also build and time a PyInstaller one-folder app")
+    parser.add_argument("--frozen-dir", help="Time an existing one-folder build in this dist dir")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    with open(args.budget, encoding="utf-8") as f:
+        budget = json.load(f)
+    forbidden = set(budget.get("not_loaded_before_first_count", []))
+
+    tmp = tempfile.mkdtemp(prefix="tally_startup_")
+    results = {}
+    forbidden_found = {}
+    try:
+        data_dir = os.path.join(tmp, "data")
+        os.makedirs(data_dir)
+        prepare_data_dir(data_dir)
+        source_cmd = [sys.executable, os.path.join(SRC, "main.py")]
+
+        results["source"], modules = measure(source_cmd, data_dir, args.runs)
+        forbidden_found["source"] = forbidden & modules
+        imports = {}
+        for _ in range(args.runs):
+            _, _, stderr = launch([sys.executable, "-X", "importtime"] + source_cmd[1:], data_dir)
+            for name, ms in parse_importtime(stderr, project_modules() + THIRD_PARTY).items():
+                imports.setdefault(name, []).append(ms)
+        results["import"] = {name: statistics.median(values) for name, values in imports.items()}
+
+        exe = None
+        if args.frozen_dir:
+            exe = frozen_executable(args.frozen_dir)
+            if exe is None:
+                print(f"No one-folder build found in {args.frozen_dir}")
+        elif args.frozen:
+            exe = build_frozen(os.path.join(tmp, "dist"))
+        if exe:
+            results["frozen"], modules = measure([exe], data_dir, args.runs)
+            forbidden_found["frozen"] = forbidden & modules
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    if args.update_budget:
+        budget["limits"] = {f"{section}.{name}":
+                            round(max(value * BUDGET_HEADROOM, value + MIN_SLACK_MS), 1)
+                            for section, metrics in results.items()
+                            for name, value in metrics.items()}
+        with open(args.budget, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"Updated {args.budget}")
+
+    failures = check_budget(results, forbidden_found, budget)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nWithin budget.")
+
+
+if __name__ == "__main__":
+    main()
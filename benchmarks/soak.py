@@ -0,0 +1,257 @@
+"""
+Soak test: months of tray-app operation under a simulated clock.
+
+Runs the real TallyCounterApp offscreen (QT_QPA_PLATFORM=offscreen) against a
+FakeProcessSource and a temporary data directory. Each tick advances the
+simulated clock, starts or stops a few app instances, forces one monitor poll
+on the real monitor thread and lets the Qt event loop deliver the resulting
+signals (dashboard count updates, heatmap rebuilds). Every simulated day the
+dashboard flips a month back and forth, and every few days monitoring is
+switched between two executables the way Configure → Save does, so the
+monitor's retarget path, the alert reset and the scanner caches see real
+target changes. An "above" alert rule is installed so there are windows to reset.
+
+Once a day after a warm-up it samples:
+
+  rss_mib            resident set size of the process
+  py_objects         objects tracked by the garbage collector (after gc.collect)
+  qt_widgets         QApplication.allWidgets()
+  qt_threads         live QThread wrappers
+  refresh_receivers  slots connected to DashboardWindow.refresh_requested
+
+and fails if any of them grows past its threshold between the first and the
+last sample.
+
+Usage:
+  python benchmarks/soak.py [--months 3] [--step-minutes 10] [--reconfigure-days 7]
+                            [--max-rss-growth 25] [--max-object-growth 5000]
+"""
+
+import argparse
+import gc
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+sys.path.insert(0, HERE)
+
+from synthetic import TALLY_EXE, FakeProcessSource, build_process_tree, rebase_exes  # noqa: E402
+
+POLL_TIMEOUT = 5.0  # seconds to wait for the monitor thread to finish a forced poll
+ALT_EXE = "/opt/tally-beta/tally-beta"  # the second target reconfiguration switches to
+
+
+class SoakSource(FakeProcessSource):
+    """FakeProcessSource whose target app instances (with helpers) start and stop at random.
+
+    Instances are started from any of `targets`, so each target has some to count.
+
+    advance() runs on the main thread and scans on the monitor thread, so both
+    hold a lock.
+    """
+
+    def __init__(self, procs, targets, churn=0.01, seed=1):
+        super().__init__(procs, churn=churn, seed=seed)
+        self.targets = targets
+        self.instances = {}  # top-level pid -> helper pids
+        self._lock = threading.Lock()
+
+    def scan(self):
+        with self._lock:
+            return super().scan()
+
+    def exe(self, pid):
+        with self._lock:
+            return super().exe(pid)
+
+    def advance(self):
+        with self._lock:
+            self._advance()
+
+    def _advance(self):
+        super().advance()
+        rng = self._rng
+        if rng.random() < 0.05 and len(self.instances) < 8:
+            pid = self._next_pid
+            target = rng.choice(self.targets)
+            self._procs[pid] = (1, os.path.basename(target), target)
+            helpers = [pid + 1 + i for i in range(rng.randint(0, 3))]
+            for helper in helpers:
+                self._procs[helper] = (pid, os.path.basename(target), target)
+            self.instances[pid] = helpers
+            self._next_pid += 10
+        elif rng.random() < 0.05 and self.instances:
+            pid = rng.choice(sorted(self.instances))
+            for helper in self.instances.pop(pid):
+                self._procs.pop(helper, None)
+            self._procs.pop(pid, None)
+
+
+def rss_mib():
+    import psutil
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def sample(tally):
+    from PyQt6.QtCore import QThread
+    gc.collect()
+    qt_threads = sum(1 for o in gc.get_objects() if isinstance(o, QThread))
+    # Count objects after the isinstance() pass: its first run creates caches of its own
+    gc.collect()
+    return {
+        "rss_mib": rss_mib(),
+        "py_objects": len(gc.get_objects()),
+        "qt_widgets": len(tally.app.allWidgets()),
+        "qt_threads": qt_threads,
+        "refresh_receivers": tally.dashboard_window.receivers(
+            tally.dashboard_window.refresh_requested),
+    }
+
+
+def flush_events(app):
+    from PyQt6.QtCore import QCoreApplication, QEvent
+    app.processEvents()
+    # deleteLater() only runs from an event loop; flush it explicitly
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+
+
+def wait_for_polls(core, polls):
+    deadline = time.monotonic() + POLL_TIMEOUT
+    while core.diagnostics.total_polls < polls:
+        if time.monotonic() > deadline:
+            raise RuntimeError("monitor thread did not complete a poll")
+        time.sleep(0.0005)
+
+
+def force_poll(tally):
+    """Force a poll and wait until the monitor thread's poll count moves past it."""
+    core = tally.monitor.worker.core
+    wait_for_polls(core, 1)  # a freshly started monitor polls once by itself first
+    before = core.diagnostics.total_polls
+    core.force_poll()
+    wait_for_polls(core, before + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--months", type=float, default=3.0)
+    parser.add_argument("--step-minutes", type=float, default=10.0,
+                        help="Simulated time between polls")
+    parser.add_argument("--procs", type=int, default=2000)
+    parser.add_argument("--reconfigure-days", type=float, default=7.0,
+                        help="Simulated days between switches of the monitored executable")
+    parser.add_argument("--warmup-days", type=int, default=7)
+    parser.add_argument("--max-rss-growth", type=float, default=25.0, metavar="MIB")
+    parser.add_argument("--max-object-growth", type=int, default=5000)
+    parser.add_argument("--max-widget-growth", type=int, default=0)
+    parser.add_argument("--max-thread-growth", type=int, default=0)
+    parser.add_argument("--max-receiver-growth", type=int, default=0)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="tally_soak_")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["TALLYCOUNTER_DATA_DIR"] = tmp
+    try:
+        procs = build_process_tree(args.procs, tally_instances=0)
+        procs = rebase_exes(os.path.join(tmp, "root"), procs)
+        targets = [os.path.join(tmp, "root", exe.lstrip("/")) for exe in (TALLY_EXE, ALT_EXE)]
+        for target in targets:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            open(target, "a").close()
+        source = SoakSource(procs, targets)
+
+        from database import Database
+        db = Database()
+        db.set_config("executable_path", targets[0])
+        db.add_alert_rule("above", threshold=2, minutes=30)
+        db.close()
+
+        sim = {"now": datetime(2026, 1, 1).timestamp()}
+        import main as tray
+        tally = tray.TallyCounterApp(source=source,
+                                     clock=lambda: datetime.fromtimestamp(sim["now"]))
+        flush_events(tally.app)  # runs check_initial_configuration → start_monitoring
+        if tally.monitor is None:
+            raise RuntimeError("monitoring did not start")
+        tally.ensure_dashboard()  # built lazily by the app; the soak exercises it from day one
+
+        step = args.step_minutes * 60
+        ticks_per_day = int(86400 / step)
+        days = int(args.months * 30)
+        reconfigure_every = max(1, int(args.reconfigure_days * ticks_per_day))
+        rng = random.Random(2)
+        samples = []
+        reconfigurations = 0
+        wall_start = time.perf_counter()
+
+        print(f"{'day':>5}{'RSS MiB':>10}{'objects':>10}{'widgets':>9}{'threads':>9}{'receivers':>11}")
+        for tick in range(days * ticks_per_day):
+            sim["now"] += step
+            source.advance()
+            switched = None
+            if tick and tick % reconfigure_every == 0:
+                reconfigurations += 1
+                switched = targets[reconfigurations % len(targets)]
+                tally.start_monitoring(switched)
+            force_poll(tally)
+            if switched is not None and tally.monitor.worker.core.executable_path != switched:
+                raise RuntimeError(f"monitor did not switch to {switched}")
+            flush_events(tally.app)
+
+            if tick % ticks_per_day == ticks_per_day - 1:
+                day = tick // ticks_per_day + 1
+                # Browse the dashboard the way a user would
+                if rng.random() < 0.5:
+                    tally.dashboard_window.show()
+                tally.dashboard_window.prev_month_action()
+                tally.dashboard_window.next_month_action()
+                tally.dashboard_window.hide()
+                flush_events(tally.app)
+                if day > args.warmup_days:
+                    s = sample(tally)
+                    samples.append(s)
+                    if len(samples) == 1 or day % 10 == 0 or day == days:
+                        print(f"{day:>5}{s['rss_mib']:>10.1f}{s['py_objects']:>10}"
+                              f"{s['qt_widgets']:>9}{s['qt_threads']:>9}{s['refresh_receivers']:>11}")
+
+        wall = time.perf_counter() - wall_start
+        polls = days * ticks_per_day
+        print(f"\n{polls} polls over {days} simulated days, {reconfigurations} target switches, "
+              f"{wall:.1f} s wall")
+        tally.exit_app()
+
+        if len(samples) < 2:
+            print("Too few samples; increase --months or lower --warmup-days.")
+            sys.exit(2)
+        limits = {
+            "rss_mib": args.max_rss_growth,
+            "py_objects": args.max_object_growth,
+            "qt_widgets": args.max_widget_growth,
+            "qt_threads": args.max_thread_growth,
+            "refresh_receivers": args.max_receiver_growth,
+        }
+        failures = []
+        for metric, limit in limits.items():
+            growth = samples[-1][metric] - samples[0][metric]
+            status = "ok" if growth <= limit else "FAIL"
+            print(f"  {metric:<18} {samples[0][metric]:>10.1f} → {samples[-1][metric]:>10.1f}"
+                  f"  growth {growth:>+9.1f}  limit {limit:>8}  {status}")
+            if status != "ok":
+                failures.append(metric)
+        if failures:
+            print(f"\nFAILED: {', '.join(failures)} grew past the limit")
+            sys.exit(1)
+        print("\nAll checks passed.")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
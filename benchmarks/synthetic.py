@@ -0,0 +1,159 @@
+"""
+Synthetic process tables for the benchmarks.
+
+build_process_tree() returns a list of (pid, ppid, name, exe) tuples shaped
+like a busy desktop / terminal server: shells and services, a Chrome-like
+multi-process app (one browser process plus many helper children), and a few
+instances of a plain single-process app.
+
+write_fake_procfs() lays the same table out as a /proc-style directory so both
+ProcFsProcessSource and psutil (via psutil.PROCFS_PATH) can read it.
+
+FakeProcessSource serves a table straight from memory through the
+ProcessSource interface, optionally churning pids between scans, so the
+counting engine can be exercised on any OS without real processes.
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from process_source import ProcessGone, ProcessSource  # noqa: E402
+
+BOOT_TIME = 1_700_000_000
+
+CHROME_EXE = "/opt/google/chrome/chrome"
+TALLY_EXE = "/opt/tally/tally"
+FILLER_NAMES = ["bash", "sshd", "systemd", "python3", "node", "java", "postgres",
+                "nginx", "cron", "dbus-daemon", "kworker", "containerd-shim"]
+
+
+UWP_INSTALLED_EXE = "/opt/uwp/Notepad/notepad"
+UWP_RUNNING_EXE = "/opt/WindowsApps/Microsoft.WindowsNotepad_11.2310.13.0_x64/Notepad/notepad"
+
+
+def build_process_tree(total, chrome_instances=20, helpers_per_chrome=12,
+                       tally_instances=8, uwp_instances=0, seed=1):
+    """Return [(pid, ppid, name, exe), ...] with roughly `total` processes.
+
+    uwp_instances adds 'notepad' processes whose running exe path differs from
+    UWP_INSTALLED_EXE, like Store apps whose real path lives under WindowsApps.
+    """
+    rng = random.Random(seed)
+    procs = [(1, 0, "systemd", "/usr/lib/systemd/systemd")]
+    next_pid = 2
+
+    def add(ppid, name, exe):
+        nonlocal next_pid
+        pid = next_pid
+        next_pid += rng.randint(1, 3)  # gaps, like a real pid space
+        procs.append((pid, ppid, name, exe))
+        return pid
+
+    for _ in range(chrome_instances):
+        browser = add(1, "chrome", CHROME_EXE)
+        for _ in range(helpers_per_chrome):
+            add(browser, "chrome", CHROME_EXE)
+    for _ in range(tally_instances):
+        add(1, "tally", TALLY_EXE)
+    for _ in range(uwp_instances):
+        add(1, "notepad", UWP_RUNNING_EXE)
+
+    parents = [1]
+    while len(procs) < total:
+        name = rng.choice(FILLER_NAMES)
+        pid = add(rng.choice(parents), name, f"/usr/bin/{name}")
+        if rng.random() < 0.2:
+            parents.append(pid)
+    return procs
+
+
+def write_fake_procfs(root, procs):
+    """Write procs as <root>/<pid>/stat + exe symlink, plus <root>/stat with btime."""
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, "stat"), "w") as f:
+        f.write("cpu  0 0 0 0 0 0 0 0 0 0\n")
+        f.write(f"btime {BOOT_TIME}\n")
+
+    exe_dir = os.path.join(root, "_exe")
+    for _, _, _, exe in procs:
+        path = os.path.join(exe_dir, exe.lstrip("/"))
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+
+    for pid, ppid, name, exe in procs:
+        pid_dir = os.path.join(root, str(pid))
+        os.makedirs(pid_dir, exist_ok=True)
+        # 50 fields after comm; psutil reads up to field 42, we need 4 and 22
+        fields = ["S", str(ppid)] + ["0"] * 48
+        fields[19] = str(100 + pid)  # starttime in clock ticks
+        with open(os.path.join(pid_dir, "stat"), "w") as f:
+            f.write(f"{pid} ({name}) {' '.join(fields)}\n")
+        with open(os.path.join(pid_dir, "status"), "w") as f:
+            f.write(f"Name:\t{name}\nPPid:\t{ppid}\nUid:\t0\t0\t0\t0\n")
+        with open(os.path.join(pid_dir, "cmdline"), "w") as f:
+            f.write(exe + "\0")
+        os.symlink(os.path.join(exe_dir, exe.lstrip("/")), os.path.join(pid_dir, "exe"))
+    return exe_dir
+
+
+class FakeProcessSource(ProcessSource):
+    """
+    In-memory ProcessSource over a synthetic table.
+
+    With churn > 0, every advance() makes that fraction of processes exit and
+    replaces them with new processes on fresh pids (same name, exe and parent),
+    modelling short-lived helpers and constant pid turnover. advance() is kept
+    separate from scan() so benchmarks can leave it out of the timed region.
+    """
+
+    def __init__(self, procs, churn=0.0, seed=1):
+        self._rng = random.Random(seed)
+        self.churn = churn
+        self._procs = {pid: (ppid, name, exe) for pid, ppid, name, exe in procs}
+        self._next_pid = max(self._procs) + 1
+        self.scans = 0
+
+    def advance(self):
+        if not self.churn:
+            return
+        victims = self._rng.sample(sorted(self._procs), int(len(self._procs) * self.churn))
+        for pid in victims:
+            if pid == 1:
+                continue
+            ppid, name, exe = self._procs.pop(pid)
+            if ppid not in self._procs:
+                ppid = 1
+            self._procs[self._next_pid] = (ppid, name, exe)
+            self._next_pid += 1
+
+    def scan(self):
+        self.scans += 1
+        return {pid: (ppid, name) for pid, (ppid, name, _) in self._procs.items()}
+
+    def exe(self, pid):
+        entry = self._procs.get(pid)
+        if entry is None:
+            raise ProcessGone(pid)
+        return entry[2]
+
+
+def rebase_exes(root, procs, missing=()):
+    """
+    Re-point every exe under root and create it as an empty file, so
+    os.path.samefile has something real to compare. Paths listed in `missing`
+    are re-pointed but not created (e.g. a UWP exe the config can't see).
+    """
+    created = set()
+    rebased = []
+    for pid, ppid, name, exe in procs:
+        path = os.path.join(root, exe.lstrip("/"))
+        if exe not in missing and path not in created:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+            created.add(path)
+        rebased.append((pid, ppid, name, path))
+    return rebased
@@ -0,0 +1,171 @@
+"""
+Threshold alerts evaluated on every monitor poll.
+
+Rules live in the alert_rules table and come in three kinds:
+
+  above      count > threshold for at least `minutes`
+  daily_max  today's maximum > threshold (fires once per day)
+  idle       count == 0 for at least `minutes` between hour_from and hour_to
+
+Each rule keeps only the time its condition started to hold and whether it
+has already fired for the current episode, so evaluating a sample is O(1) per
+rule however long the window. A rule fires once per episode. It can fire again
+after its condition has been false at least once, or for daily_max, on the next day.
+The day a daily_max rule last fired is also kept in config, so restarting the
+monitor later that day does not fire it (and its command) again.
+
+When a rule fires, every alert listener gets a message (the tray shows it as
+a notification) and the rule's command, if any, is started in the background
+with TALLY_ALERT_RULE, TALLY_ALERT_MESSAGE and TALLY_COUNT in its environment.
+
+Qt-free; MonitorCore owns an AlertEngine and reloads the rules when the
+`alert_rules_version` config value changes.
+"""
+
+import os
+import shlex
+import subprocess
+import sys
+from collections import namedtuple
+from datetime import date
+
+KINDS = ("above", "daily_max", "idle")
+VERSION_KEY = "alert_rules_version"
+FIRED_DATE_KEY = "alert_{}_fired_date"  # per daily_max rule id
+
+AlertRule = namedtuple("AlertRule", [
+    "id", "kind", "threshold", "minutes", "hour_from", "hour_to", "command", "enabled",
+])
+
+
+def describe(rule: AlertRule) -> str:
+    if rule.kind == "above":
+        text = f"more than {rule.threshold} running"
+        if rule.minutes:
+            text += f" for {rule.minutes} min"
+    elif rule.kind == "daily_max":
+        text = f"daily max above {rule.threshold}"
+    else:
+        text = "none running"
+        if rule.minutes:
+            text += f" for {rule.minutes} min"
+        text += f" between {rule.hour_from:02d}:00 and {rule.hour_to:02d}:00"
+    return text
+
+
+def in_hours(hour, hour_from, hour_to):
+    """True if hour lies in [hour_from, hour_to), wrapping past midnight (22 → 6)."""
+    if hour_from == hour_to:
+        return True  # the whole day
+    if hour_from < hour_to:
+        return hour_from <= hour < hour_to
+    return hour >= hour_from or hour < hour_to
+
+
+class _RuleState:
+    __slots__ = ("rule", "since", "fired", "fired_date")
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.since = None       # timestamp the condition started holding, None while false
+        self.fired = False      # fired during the current episode
+        self.fired_date = None  # daily_max: the day it last fired
+
+
+class AlertEngine:
+    def __init__(self, rules=()):
+        self._states = []
+        self._listeners = []
+        self._hooks = []  # running command hooks, reaped on later evaluations
+        self._loaded_version = None
+        self._loaded = False
+        self._db = None  # set by reload(); where daily_max rules record the day they fired
+        self.set_rules(rules)
+
+    def add_listener(self, callback):
+        """Call callback(message) whenever a rule fires."""
+        self._listeners.append(callback)
+
+    def set_rules(self, rules):
+        """Replace the rules, keeping the window state of rules that did not change."""
+        old = {state.rule: state for state in self._states}
+        self._states = [old.get(rule) or _RuleState(rule) for rule in rules if rule.enabled]
+
+    def reload(self, db):
+        """Re-read the rules if they were edited since the last load; cheap to call every poll."""
+        self._db = db
+        version = db.get_config(VERSION_KEY)
+        if not self._loaded or version != self._loaded_version:
+            self._loaded, self._loaded_version = True, version
+            self.set_rules([AlertRule(*row) for row in db.get_alert_rules()])
+            for state in self._states:
+                if state.rule.kind == "daily_max" and state.fired_date is None:
+                    fired = db.get_config(FIRED_DATE_KEY.format(state.rule.id))
+                    state.fired_date = date.fromisoformat(fired) if fired else None
+
+    def reset(self):
+        """Forget every window, e.g. after the monitor switches to another executable."""
+        self._states = [_RuleState(state.rule) for state in self._states]
+
+    def __len__(self):
+        return len(self._states)
+
+    def evaluate(self, now, count, today_max):
+        """Feed one sample (a datetime, the count and today's maximum); return the messages fired."""
+        if self._hooks:
+            self._hooks = [p for p in self._hooks if p.poll() is None]
+        if not self._states:
+            return []
+        ts = now.timestamp()
+        fired = []
+        for state in self._states:
+            rule = state.rule
+            if rule.kind == "daily_max":
+                day = now.date()
+                if today_max is not None and today_max > rule.threshold and state.fired_date != day:
+                    state.fired_date = day
+                    if self._db is not None:
+                        self._db.set_config(FIRED_DATE_KEY.format(rule.id), day.isoformat())
+                    fired.append((rule, f"Daily max reached {today_max} (limit {rule.threshold})"))
+                continue
+            if rule.kind == "above":
+                holds = count > rule.threshold
+            else:
+                holds = count == 0 and in_hours(now.hour, rule.hour_from, rule.hour_to)
+            if not holds:
+                state.since = None
+                state.fired = False
+                continue
+            if state.since is None:
+                state.since = ts
+            if not state.fired and ts - state.since >= rule.minutes * 60:
+                state.fired = True
+                if rule.kind == "above":
+                    message = f"{count} running, above {rule.threshold}"
+                else:
+                    message = "None running"
+                if rule.minutes:
+                    message += f" for {rule.minutes} min"
+                fired.append((rule, message))
+        for rule, message in fired:
+            self._fire(rule, message, count)
+        return [message for _, message in fired]
+
+    def _fire(self, rule, message, count):
+        for callback in self._listeners:
+            callback(message)
+        if rule.command:
+            self._run_hook(rule, message, count)
+
+    def _run_hook(self, rule, message, count):
+        env = dict(os.environ, TALLY_ALERT_RULE=str(rule.id), TALLY_ALERT_MESSAGE=message,
+                   TALLY_COUNT=str(count))
+        args = rule.command if sys.platform == 'win32' else shlex.split(rule.command)
+        try:
+            self._hooks.append(subprocess.Popen(
+                args, env=env, stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            ))
+        except (OSError, ValueError) as e:
+            for callback in self._listeners:
+                callback(f"Alert command failed: {e}")
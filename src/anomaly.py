@@ -0,0 +1,103 @@
+"""
+Unusual-day detection over the daily maxima.
+
+Each closed day is compared with the days before it:
+
+  baseline   median of the previous 28 days
+  spread     1.4826 × their median absolute deviation (at least 1 instance)
+  weekday    median of the same weekday over the previous 8 weeks, minus
+             the median of those 8 weeks
+  trend      least-squares slope of the previous 28 days, projected from
+             the middle of that window to the day itself
+
+  expected = baseline + weekday + trend
+  score    = (max_instances - expected) / spread
+
+A day is flagged when |score| ≥ 3.5 and at least 14 earlier days were
+recorded. Scores are written to the day_scores table with a high-water mark
+in config (anomaly_high_water), so update() only scores days that closed
+since the last run. Opening the dashboard on years of history costs one
+pass the first time and almost nothing afterwards.
+
+Qt-free. Plain statistics on short lists; numpy is not a dependency of the
+app and each day needs only a few dozen values.
+"""
+
+import statistics
+from collections import deque, namedtuple
+from datetime import date, timedelta
+
+WINDOW_DAYS = 28
+SEASON_DAYS = 56
+MIN_HISTORY = 14
+THRESHOLD = 3.5
+MAD_SCALE = 1.4826
+MIN_SPREAD = 1.0
+HIGH_WATER_KEY = "anomaly_high_water"
+
+DayScore = namedtuple("DayScore", ["date", "max_instances", "expected", "score", "slope", "flagged"])
+
+
+def _slope(points):
+    """Least-squares slope of [(x, y)]; 0 for fewer than two distinct x."""
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    if not sxx:
+        return 0.0, mean_x
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    return sxy / sxx, mean_x
+
+
+def score_day(day: date, value: int, history) -> DayScore:
+    """Score one day against history: [(date, max_instances)] of earlier days, oldest first."""
+    recent = [(d, v) for d, v in history if (day - d).days <= WINDOW_DAYS]
+    if len(recent) < MIN_HISTORY:
+        return DayScore(day.isoformat(), value, None, None, None, False)
+    values = [v for _, v in recent]
+    baseline = statistics.median(values)
+    mad = statistics.median(abs(v - baseline) for v in values)
+    spread = max(MAD_SCALE * mad, MIN_SPREAD)
+
+    same_weekday = [v for d, v in history if d.weekday() == day.weekday()]
+    weekday = 0.0
+    if len(same_weekday) >= 3:
+        weekday = statistics.median(same_weekday) - statistics.median(v for _, v in history)
+
+    # x is days before `day` (negative), so the projection runs from the window's middle to 0
+    slope, mean_x = _slope([(-(day - d).days, v) for d, v in recent])
+    expected = baseline + weekday + slope * (0 - mean_x)
+    score = (value - expected) / spread
+    return DayScore(day.isoformat(), value, round(expected, 2), round(score, 2),
+                    round(slope, 4), abs(score) >= THRESHOLD)
+
+
+def update(db, today=None) -> int:
+    """Score every closed day after the high-water mark; return how many were scored."""
+    today = today or date.today()
+    last_closed = today - timedelta(days=1)
+    high_water = db.get_config(HIGH_WATER_KEY)
+    if high_water:
+        start = date.fromisoformat(high_water) + timedelta(days=1)
+    else:
+        first, _ = db.get_data_extent()
+        if first is None:
+            return 0
+        start = date.fromisoformat(first)
+    if start > last_closed:
+        return 0
+
+    history = deque()  # (date, value) within SEASON_DAYS of the day being scored
+    scores = []
+    rows = db.iter_counts_for_range((start - timedelta(days=SEASON_DAYS)).isoformat(),
+                                    last_closed.isoformat())
+    for date_str, value in rows:
+        day = date.fromisoformat(date_str)
+        while history and (day - history[0][0]).days > SEASON_DAYS:
+            history.popleft()
+        if day >= start:
+            scores.append(score_day(day, value, history))
+        history.append((day, value))
+    db.save_day_scores(scores, last_closed.isoformat())
+    return len(scores)
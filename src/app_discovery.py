@@ -0,0 +1,359 @@
+"""
+Installed-application discovery for the Configure window.
+
+Each provider lists (display_name, exe_path) pairs from one source and
+returns a cheap change stamp for it:
+
+  RegistryProvider     Windows: the Uninstall hives; stamped with the
+                       last-write time of every uninstall subkey
+  DesktopFileProvider  Linux/BSD: XDG .desktop entries; stamped with the
+                       mtimes of the applications directories
+  PathProvider         Linux/BSD: executables on $PATH; stamped with $PATH
+                       and the mtimes of its directories
+
+Results are kept in the database per source. A source is only rescanned
+when its stamp differs from the stored one, so reopening the window shows
+the cached list at once and the background refresh usually does no work.
+
+Qt-free, like scanner.py.
+"""
+
+import configparser
+import json
+import os
+import shlex
+import shutil
+import stat
+import sys
+from typing import List, Tuple
+
+if sys.platform == 'win32':
+    import winreg
+
+
+class AppProvider:
+    # Key under which the results and stamp are stored
+    source = ""
+
+    def available(self) -> bool:
+        """Return False if the source does not exist on this platform."""
+        return True
+
+    def stamp(self) -> str:
+        """Return a string that changes whenever scan() could return something different."""
+        raise NotImplementedError
+
+    def scan(self) -> List[Tuple[str, str]]:
+        """Return (display_name, exe_path) pairs."""
+        raise NotImplementedError
+
+
+def _dir_mtimes(dirs):
+    """[(dir, mtime_ns or None)] — a missing directory is part of the stamp too."""
+    result = []
+    for d in dirs:
+        try:
+            result.append((d, os.stat(d).st_mtime_ns))
+        except OSError:
+            result.append((d, None))
+    return result
+
+
+# ── Windows registry ──────────────────────────────────────────────────────────
+
+UNINSTALL_KEYS = [
+    (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
+    (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
+    (winreg.HKEY_CURRENT_USER,  r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
+] if sys.platform == 'win32' else []  # no registry elsewhere: the list stays empty
+
+
+def _resolve_exe_from_icon(display_icon: str) -> str:
+    """Extract the exe path from a DisplayIcon value like 'C:\\app.exe,0'."""
+    if not display_icon:
+        return ""
+    # Strip icon index suffix: "path.exe,0"  or  "path.exe,-1"
+    path = display_icon.strip().strip('"')
+    if "," in path:
+        path = path.rsplit(",", 1)[0].strip()
+    path = path.strip('"')
+    if path.lower().endswith(".exe") and os.path.isfile(path):
+        return path
+    return ""
+
+
+def _find_main_exe(install_location: str) -> str:
+    """Try to find a single .exe in the root of the install location."""
+    if not install_location or not os.path.isdir(install_location):
+        return ""
+    try:
+        exes = [f for f in os.listdir(install_location) if f.lower().endswith(".exe")]
+        if len(exes) == 1:
+            return os.path.join(install_location, exes[0])
+    except OSError:
+        pass
+    return ""
+
+
+def _subkeys(root):
+    i = 0
+    while True:
+        try:
+            yield winreg.EnumKey(root, i)
+        except OSError:
+            return
+        i += 1
+
+
+class RegistryProvider(AppProvider):
+    source = "registry"
+
+    def available(self):
+        return sys.platform == 'win32'
+
+    def stamp(self):
+        # A key's last-write time moves when its values change, and the parent's
+        # when subkeys are added or removed; reading them skips the value
+        # queries and file checks that make a full scan slow
+        stamps = []
+        for hive, key_path in UNINSTALL_KEYS:
+            try:
+                with winreg.OpenKey(hive, key_path) as root:
+                    stamps.append([key_path, winreg.QueryInfoKey(root)[2]])
+                    for sub_name in _subkeys(root):
+                        try:
+                            with winreg.OpenKey(root, sub_name) as sub:
+                                stamps.append([sub_name, winreg.QueryInfoKey(sub)[2]])
+                        except OSError:
+                            continue
+            except OSError:
+                stamps.append([key_path, None])
+        return json.dumps(stamps)
+
+    def scan(self):
+        apps = []
+        for hive, key_path in UNINSTALL_KEYS:
+            try:
+                with winreg.OpenKey(hive, key_path) as root:
+                    for sub_name in _subkeys(root):
+                        try:
+                            with winreg.OpenKey(root, sub_name) as sub:
+                                app = self._read_entry(sub, sub_name)
+                        except OSError:
+                            continue
+                        if app:
+                            apps.append(app)
+            except OSError:
+                continue
+        return apps
+
+    @staticmethod
+    def _read_entry(sub, sub_name):
+        def val(name):
+            try:
+                return winreg.QueryValueEx(sub, name)[0]
+            except OSError:
+                return ""
+
+        display_name     = val("DisplayName").strip()
+        display_icon     = val("DisplayIcon")
+        install_location = val("InstallLocation").strip().strip('"')
+        system_component = val("SystemComponent")
+
+        # Skip unnamed, system components, and updates
+        if not display_name:
+            return None
+        if system_component == 1:
+            return None
+        if "KB" in sub_name and sub_name.startswith("{") is False:
+            return None
+
+        exe = _resolve_exe_from_icon(display_icon) or _find_main_exe(install_location)
+        return (display_name, exe) if exe else None
+
+
+# ── XDG .desktop entries ──────────────────────────────────────────────────────
+
+def _which(command, path=None):
+    """Resolve a command to the real executable file, or "" if it isn't one."""
+    exe = command if os.sep in command else shutil.which(command, path=path)
+    if not exe:
+        return ""
+    # Follow symlinks (/usr/bin/python3 → python3.12) so the name the process
+    # table reports matches the saved path
+    exe = os.path.realpath(exe)
+    try:
+        st = os.stat(exe)
+    except OSError:
+        return ""
+    if not stat.S_ISREG(st.st_mode) or not os.access(exe, os.X_OK):
+        return ""
+    return exe
+
+
+def _exec_command(exec_line):
+    """Return the program an Exec= line runs, skipping `env VAR=value` prefixes."""
+    try:
+        args = shlex.split(exec_line)
+    except ValueError:
+        return ""
+    if args and os.path.basename(args[0]) == "env":
+        args = args[1:]
+        while args and ("=" in args[0] or args[0].startswith("-")):
+            args = args[1:]
+    return args[0] if args else ""
+
+
+class DesktopFileProvider(AppProvider):
+    source = "desktop"
+
+    def __init__(self, dirs=None):
+        self._dirs = dirs
+
+    def available(self):
+        return sys.platform != 'win32'
+
+    def dirs(self):
+        """applications/ directories in XDG precedence order (user first)."""
+        if self._dirs is not None:
+            return list(self._dirs)
+        home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+        dirs = [home] + [d for d in data_dirs.split(":") if d]
+        return [os.path.join(d, "applications") for d in dict.fromkeys(dirs)]
+
+    def _tree(self):
+        """Every directory under the applications dirs; entries may sit in subfolders."""
+        for top in self.dirs():
+            if not os.path.isdir(top):
+                yield top
+                continue
+            for dirpath, _dirnames, _filenames in os.walk(top):
+                yield dirpath
+
+    def stamp(self):
+        return json.dumps(_dir_mtimes(self._tree()))
+
+    def scan(self):
+        apps = []
+        seen_ids = set()  # a desktop-file ID in the user dir hides the system one
+        for top in self.dirs():
+            for dirpath, _dirnames, filenames in os.walk(top):
+                for filename in sorted(filenames):
+                    if not filename.endswith(".desktop"):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    file_id = os.path.relpath(path, top).replace(os.sep, "-")
+                    if file_id in seen_ids:
+                        continue
+                    seen_ids.add(file_id)
+                    app = self._read_entry(path)
+                    if app:
+                        apps.append(app)
+        return apps
+
+    @staticmethod
+    def _read_entry(path):
+        parser = configparser.RawConfigParser(strict=False, interpolation=None)
+        parser.optionxform = str  # keys are case-sensitive
+        try:
+            parser.read(path, encoding="utf-8")
+            entry = parser["Desktop Entry"]
+        except (configparser.Error, KeyError, UnicodeDecodeError, OSError):
+            return None
+        if entry.get("Type", "Application") != "Application":
+            return None
+        if entry.get("NoDisplay") == "true" or entry.get("Hidden") == "true":
+            return None
+        name = entry.get("Name", "").strip()
+        command = entry.get("TryExec", "").strip() or _exec_command(entry.get("Exec", ""))
+        exe = _which(command) if command else ""
+        return (name, exe) if name and exe else None
+
+
+# ── $PATH executables ─────────────────────────────────────────────────────────
+
+class PathProvider(AppProvider):
+    source = "path"
+
+    def __init__(self, path=None):
+        self._path = path
+
+    def available(self):
+        return sys.platform != 'win32'
+
+    def dirs(self):
+        path = self._path if self._path is not None else os.environ.get("PATH", "")
+        return list(dict.fromkeys(d for d in path.split(os.pathsep) if d))
+
+    def stamp(self):
+        return json.dumps(_dir_mtimes(self.dirs()))
+
+    def scan(self):
+        apps = []
+        for d in self.dirs():
+            try:
+                names = sorted(os.listdir(d))
+            except OSError:
+                continue
+            for name in names:
+                if name.startswith("."):
+                    continue
+                exe = _which(os.path.join(d, name))
+                if exe:
+                    apps.append((name, exe))
+        return apps
+
+
+# ── Cached discovery ──────────────────────────────────────────────────────────
+
+def default_providers() -> List[AppProvider]:
+    """Providers in priority order: earlier ones win when two list the same exe."""
+    providers = [RegistryProvider(), DesktopFileProvider(), PathProvider()]
+    return [p for p in providers if p.available()]
+
+
+def merge_apps(per_source, providers) -> List[Tuple[str, str]]:
+    """Combine per-source results into one sorted list, unique by name and by exe."""
+    names, exes = {}, set()
+    for provider in providers:
+        for name, exe in per_source.get(provider.source, []):
+            key = os.path.normcase(exe)
+            if name in names or key in exes:
+                continue
+            names[name] = exe
+            exes.add(key)
+    return sorted(names.items(), key=lambda x: x[0].lower())
+
+
+def cached_apps(db, providers=None) -> List[Tuple[str, str]]:
+    """The last discovered list, straight from the database (no scanning)."""
+    providers = providers if providers is not None else default_providers()
+    per_source = {p.source: db.get_installed_apps(p.source) for p in providers}
+    return merge_apps(per_source, providers)
+
+
+def refresh_apps(db, providers=None, force=False):
+    """Rescan the sources whose stamp changed; return (apps, changed_sources)."""
+    providers = providers if providers is not None else default_providers()
+    per_source = {}
+    changed = []
+    for provider in providers:
+        stamp = provider.stamp()
+        if not force and db.get_app_source_stamp(provider.source) == stamp:
+            per_source[provider.source] = db.get_installed_apps(provider.source)
+            continue
+        apps = provider.scan()
+        db.replace_installed_apps(provider.source, stamp, apps)
+        per_source[provider.source] = apps
+        changed.append(provider.source)
+    return merge_apps(per_source, providers), changed
+
+
+def enumerate_installed_apps() -> List[Tuple[str, str]]:
+    """
+    Return a sorted list of (display_name, exe_path) tuples for installed apps,
+    scanning every source without the cache.
+    """
+    providers = default_providers()
+    return merge_apps({p.source: p.scan() for p in providers}, providers)
@@ -0,0 +1,124 @@
+"""
+Ranked fuzzy search over the discovered apps.
+
+AppIndex lowercases and tokenizes every (display_name, exe_path) once, then
+ranks each query against that index:
+
+  exact name                      "firefox"      → Firefox
+  name prefix                     "fire"         → Firefox
+  word prefix                     "code"         → Visual Studio Code
+  initials                        "vsc"          → Visual Studio Code
+  substring                       "tudio"        → Visual Studio Code
+  exe file name                   "code.exe"     → Visual Studio Code
+  subsequence                     "vscde"        → Visual Studio Code
+
+A longer query can only match a subset of what its prefix matched, so when
+the query grows the search narrows the previous matches instead of the whole
+index.
+
+Qt-free; the Configure window wraps it in a list model.
+"""
+
+import os
+import re
+from typing import List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+|[^\W\d_]+")
+
+# Score tiers; within a tier shorter names rank first
+EXACT, PREFIX, WORD_PREFIX, INITIALS, SUBSTRING, EXE_NAME, SUBSEQUENCE = (
+    7000, 6000, 5000, 4000, 3000, 2000, 0)
+
+
+def tokenize(name: str) -> List[str]:
+    """Split on punctuation, spaces, digits and camelCase: 'OBS-Studio64' → obs, studio, 64."""
+    return [t.lower() for t in _TOKEN_RE.findall(name)]
+
+
+class _Entry:
+    __slots__ = ("name", "exe", "lower", "tokens", "initials", "exe_name", "word_starts")
+
+    def __init__(self, name, exe):
+        self.name = name
+        self.exe = exe
+        self.lower = name.lower()
+        self.tokens = tokenize(name)
+        self.initials = "".join(t[0] for t in self.tokens)
+        self.exe_name = os.path.basename(exe).lower()
+        # Positions in `lower` where a word starts, for subsequence bonuses
+        self.word_starts = {m.start() for m in _TOKEN_RE.finditer(name)}
+
+
+def _subsequence_score(entry: _Entry, query: str) -> Optional[int]:
+    """Greedy left-to-right match of query's characters in the name; None if they don't all occur."""
+    text = entry.lower
+    score = 0
+    pos = 0
+    prev = -2
+    for ch in query:
+        found = text.find(ch, pos)
+        if found < 0:
+            return None
+        if found == prev + 1:
+            score += 5   # consecutive characters
+        if found in entry.word_starts:
+            score += 10  # lands on the start of a word
+        score -= min(found - pos, 10)  # gaps cost, capped per character
+        prev = found
+        pos = found + 1
+    return SUBSEQUENCE + 1000 + score
+
+
+def score(entry: _Entry, query: str) -> Optional[int]:
+    """Rank entry for a lowercase, stripped query; higher is better, None is no match."""
+    name = entry.lower
+    if name == query:
+        return EXACT
+    length_penalty = min(len(name), 999)
+    if name.startswith(query):
+        return PREFIX - length_penalty
+    if any(t.startswith(query) for t in entry.tokens[1:]):
+        return WORD_PREFIX - length_penalty
+    if " " not in query and entry.initials.startswith(query):
+        return INITIALS - len(entry.initials)
+    at = name.find(query)
+    if at >= 0:
+        return SUBSTRING - min(at, 999)
+    if query in entry.exe_name:
+        return EXE_NAME - len(entry.exe_name)
+    return _subsequence_score(entry, query)
+
+
+class AppIndex:
+    def __init__(self, apps: List[Tuple[str, str]] = ()):
+        self._entries = [_Entry(name, exe) for name, exe in apps]
+        self._last_query = ""
+        self._last_matches = None  # entry positions matching _last_query
+
+    def __len__(self):
+        return len(self._entries)
+
+    def entry(self, i: int) -> Tuple[str, str]:
+        e = self._entries[i]
+        return e.name, e.exe
+
+    def search(self, text: str) -> List[int]:
+        """Return entry positions matching text, best first; every entry for a blank query."""
+        query = " ".join(text.lower().split())
+        if not query:
+            self._last_query, self._last_matches = "", None
+            return list(range(len(self._entries)))
+        if self._last_matches is not None and query.startswith(self._last_query):
+            candidates = self._last_matches
+        else:
+            candidates = range(len(self._entries))
+        ranked = []
+        entries = self._entries
+        for i in candidates:
+            s = score(entries[i], query)
+            if s is not None:
+                ranked.append((-s, entries[i].lower, i))
+        ranked.sort()
+        matches = [i for _, _, i in ranked]
+        self._last_query, self._last_matches = query, matches
+        return matches
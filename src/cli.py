@@ -0,0 +1,383 @@
+"""
+Command-line interface for querying and exporting recorded counts.
+
+Usage:
+  python cli.py stats [--from DATE] [--to DATE] [--by user|session|container] [--json]
+  python cli.py export [--from DATE] [--to DATE] -o PATH [--format FMT] [--by user|session|container]
+  python cli.py count-now [--exe PATH]
+  python cli.py tail [-n DAYS] [-f] [--interval SECONDS]
+  python cli.py diagnostics [--polls N] [--exe PATH] [--local] [--json] [--records]
+  python cli.py status [--json]
+  python cli.py poll
+  python cli.py live [--watch SECONDS]
+  python cli.py alerts [list [--json] | add KIND ... | remove ID | enable ID | disable ID]
+
+The frozen build exposes the same commands as `TallyCounter.exe --cli ...`.
+
+Only database.py, exporter.py and the Qt-free monitor modules are imported (never PyQt6), so
+a query starts in tens of milliseconds and is cheap to call from login scripts
+and scheduled tasks.
+
+live reads the shared-memory snapshot the running instance rewrites after
+every poll (see live_reader.py): no IPC round trip, no database.
+
+status, poll, count-now and diagnostics ask the running tray app or headless
+daemon first (see single_instance.py) and answer from its live state without
+opening the database; count-now and diagnostics fall back to a local scan.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+from database import Database
+import exporter
+import single_instance
+from scanner import DIMENSIONS
+
+
+def _attach_console():
+    # The frozen .exe is built windowed (no console), so stdout is None.
+    # Re-attach to the console of the shell that launched us, if any.
+    if sys.platform != 'win32' or sys.stdout is not None:
+        return
+    import ctypes
+    if ctypes.windll.kernel32.AttachConsole(-1):
+        sys.stdout = open("CONOUT$", "w", encoding="utf-8")
+        sys.stderr = open("CONOUT$", "w", encoding="utf-8")
+
+
+def _exe_name(db):
+    exe_path = db.get_config("executable_path") or ""
+    return os.path.basename(exe_path) if exe_path else "Unknown"
+
+
+# ── Subcommands ────────────────────────────────────────────────────────────────
+
+def cmd_stats(db, args):
+    summary = db.get_data_summary()
+    today = date.today().isoformat()
+    today_rows = db.get_counts_for_range(today, today)
+    summary["executable_path"] = db.get_config("executable_path") or ""
+    summary["today_max"] = today_rows[0][1] if today_rows else None
+    if args.start or args.end:
+        start = args.start or "0000-01-01"
+        end = args.end or "9999-12-31"
+        rows, peak = db.get_range_summary(start, end)
+        summary["range"] = {"from": start, "to": end, "rows": rows, "max_instances": peak}
+    if args.by:
+        summary["by_" + args.by] = [
+            {args.by: name, "days": days, "max_instances": peak}
+            for name, days, peak in db.get_group_summary(args.by, args.start or "0000-01-01",
+                                                         args.end or "9999-12-31")
+        ]
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    print(f"Executable:  {summary['executable_path'] or '(not configured)'}")
+    print(f"Recorded:    {summary['rows']} days"
+          + (f" ({summary['first_date']} → {summary['last_date']})" if summary['rows'] else ""))
+    print(f"All-time max: {summary['max_instances'] if summary['max_instances'] is not None else '—'}")
+    print(f"Today's max:  {summary['today_max'] if summary['today_max'] is not None else '—'}")
+    if "range" in summary:
+        r = summary["range"]
+        print(f"Range:       {r['from']} → {r['to']}: {r['rows']} days, "
+              f"max {r['max_instances'] if r['max_instances'] is not None else '—'}")
+    if args.by:
+        groups = summary["by_" + args.by]
+        print(f"\nBy {args.by}:" if groups else f"\nNothing recorded by {args.by}.")
+        width = max((len(g[args.by]) for g in groups), default=0)
+        for g in groups:
+            print(f"  {g[args.by]:<{width}}  max {g['max_instances']:>3}  on {g['days']} days")
+    return 0
+
+
+def cmd_export(db, args):
+    written = exporter.export_range(db, args.start, args.end, args.output, _exe_name(db),
+                                    fmt=args.format, group_by=args.by)
+    print(f"Exported {written} rows to {args.output}")
+    return 0
+
+
+def _live(cmd):
+    """Result of cmd from the running instance, or None if none is reachable."""
+    try:
+        return single_instance.request(cmd)
+    except (single_instance.NoInstance, RuntimeError):
+        return None
+
+
+def _configured_exe(args):
+    if args.exe:
+        return args.exe
+    db = Database()
+    try:
+        return db.get_config("executable_path")
+    finally:
+        db.close()
+
+
+def cmd_count_now(_db, args):
+    if not args.exe and not args.local:
+        snapshot = _live("snapshot")
+        if snapshot and snapshot.get("count") is not None:
+            print(snapshot["count"])
+            return 0
+    from scanner import count_instances
+    exe_path = _configured_exe(args)
+    if not exe_path:
+        print("No executable configured; pass --exe PATH.", file=sys.stderr)
+        return 2
+    print(count_instances(exe_path))
+    return 0
+
+
+def cmd_tail(db, args):
+    rows = db.get_recent_counts(args.lines) if args.lines > 0 else []
+    for date_str, max_inst in rows:
+        print(f"{date_str}  {max_inst}")
+    if not args.follow:
+        return 0
+
+    # Follow mode: print a line whenever a day's maximum changes
+    seen = dict(rows)
+    since = rows[-1][0] if rows else date.today().isoformat()
+    sys.stdout.flush()
+    try:
+        while True:
+            time.sleep(args.interval)
+            for date_str, max_inst in db.get_counts_for_range(since, "9999-12-31"):
+                if seen.get(date_str) != max_inst:
+                    seen[date_str] = max_inst
+                    since = date_str
+                    print(f"{date_str}  {max_inst}", flush=True)
+    except KeyboardInterrupt:
+        return 0
+
+
+def _print_diagnostics(summary, label):
+    print(f"{summary['polls']} polls of {label}")
+    print(f"{'metric':<18}{'last':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, stats in summary["metrics"].items():
+        fmt = "{:>10.2f}" if name.endswith("_ms") else "{:>10.0f}"
+        print(f"{name:<18}" + "".join(fmt.format(stats[k]) for k in ("last", "p50", "p95", "p99", "max")))
+    for name, value in sorted(summary.get("extra", {}).items()):
+        print(f"{name:<28}{value}")
+
+
+def cmd_diagnostics(_db, args):
+    if not (args.exe or args.local or args.records):
+        summary = _live("diagnostics")
+        if summary is not None:
+            if args.json:
+                print(json.dumps(summary, indent=2))
+            else:
+                _print_diagnostics(summary, "the running instance")
+            return 0
+
+    from monitor_core import MonitorCore
+    exe_path = _configured_exe(args)
+    if not exe_path:
+        print("No executable configured; pass --exe PATH.", file=sys.stderr)
+        return 2
+    # Time the same poll the monitor runs, but against a throwaway database:
+    # only the running monitor records history
+    import tempfile
+    with tempfile.TemporaryDirectory(prefix="tally-diagnostics-") as scratch:
+        db = Database(os.path.join(scratch, "diagnostics.db"))
+        try:
+            core = MonitorCore(exe_path, db=db)
+            for _ in range(args.polls):
+                core.poll_once()
+        finally:
+            db.close()
+    if args.json:
+        print(core.diagnostics.to_json(include_records=args.records))
+    else:
+        _print_diagnostics(core.diagnostics.summary(), exe_path)
+    return 0
+
+
+def cmd_status(_db, args):
+    snapshot = _live("snapshot")
+    if snapshot is None:
+        if args.json:
+            print(json.dumps({"running": False}))
+        else:
+            print("Tally Counter is not running.")
+        return 1
+    snapshot["running"] = True
+    if args.json:
+        print(json.dumps(snapshot, indent=2))
+        return 0
+    def show(value):
+        return value if value is not None else "—"
+    print(f"Running:     {snapshot['mode']} (pid {snapshot['pid']})")
+    print(f"Executable:  {snapshot['executable_path']}")
+    print(f"Running now: {show(snapshot['count'])}")
+    print(f"Today's max: {show(snapshot['today_max'])}")
+    print(f"Polls:       {snapshot['polls']}")
+    for dimension, names in (snapshot.get("groups") or {}).items():
+        if names:
+            by = ", ".join(f"{name} {n}" for name, n in sorted(names.items(), key=lambda kv: (-kv[1], kv[0])))
+            print(f"{'By ' + dimension + ':':<13}{by}")
+    return 0
+
+
+def cmd_poll(_db, args):
+    try:
+        single_instance.request("poll")
+    except single_instance.NoInstance:
+        print("Tally Counter is not running.", file=sys.stderr)
+        return 1
+    except RuntimeError as e:
+        print(f"Poll failed: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _parse_hours(text):
+    try:
+        start, end = (int(h) for h in text.split("-"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected FROM-TO hours, e.g. 9-17 or 22-6")
+    if not (0 <= start <= 23 and 0 <= end <= 23):
+        raise argparse.ArgumentTypeError("hours must be 0-23")
+    return start, end
+
+
+def cmd_alerts(db, args):
+    import alerts
+    action = args.alerts_command or "list"
+    if action == "add":
+        kind = args.kind.replace("-", "_")
+        hour_from, hour_to = args.hours or (0, 0)
+        rule_id = db.add_alert_rule(kind, args.threshold, args.minutes, hour_from, hour_to,
+                                    args.command or "")
+        print(f"Added rule {rule_id}")
+        return 0
+    if action in ("remove", "enable", "disable"):
+        if action == "remove":
+            found = db.delete_alert_rule(args.id)
+        else:
+            found = db.set_alert_rule_enabled(args.id, action == "enable")
+        if not found:
+            print(f"No alert rule {args.id}", file=sys.stderr)
+            return 1
+        return 0
+
+    rules = [alerts.AlertRule(*row) for row in db.get_alert_rules()]
+    if getattr(args, "json", False):
+        print(json.dumps([rule._asdict() for rule in rules], indent=2))
+        return 0
+    if not rules:
+        print("No alert rules.")
+    for rule in rules:
+        state = "" if rule.enabled else "  (disabled)"
+        command = f"  → {rule.command}" if rule.command else ""
+        print(f"{rule.id:>4}  {alerts.describe(rule)}{command}{state}")
+    return 0
+
+
+def cmd_live(_db, args):
+    import live_reader
+    argv = ["--watch", str(args.watch)] if args.watch else []
+    return live_reader.main(argv)
+
+
+# ── Entry point ────────────────────────────────────────────────────────────────
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="TallyCounter --cli",
+                                     description="Query and export Tally Counter data.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("stats", help="Summary of recorded data")
+    p.add_argument("--from", dest="start", metavar="DATE", help="Range start (YYYY-MM-DD)")
+    p.add_argument("--to", dest="end", metavar="DATE", help="Range end (YYYY-MM-DD)")
+    p.add_argument("--by", choices=DIMENSIONS, help="Also summarize per user, session or container")
+    p.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("export", help="Export a date range to a file")
+    p.add_argument("--from", dest="start", metavar="DATE", default="0000-01-01")
+    p.add_argument("--to", dest="end", metavar="DATE", default="9999-12-31")
+    p.add_argument("-o", "--output", required=True, help="Output file (.csv, .jsonl, .csv.gz, .jsonl.gz)")
+    p.add_argument("--format", choices=list(exporter.FORMATS),
+                   help="Output format (default: from the file extension)")
+    p.add_argument("--by", choices=DIMENSIONS,
+                   help="Export each user's, session's or container's daily maximum instead of the totals")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("count-now", help="Count running instances right now")
+    p.add_argument("--exe", help="Executable to count (default: the configured one)")
+    p.add_argument("--local", action="store_true",
+                   help="Scan here even if the app is running")
+    p.set_defaults(func=cmd_count_now, needs_db=False)
+
+    p = sub.add_parser("tail", help="Show the most recent daily maxima")
+    p.add_argument("-n", "--lines", type=int, default=10, metavar="DAYS")
+    p.add_argument("-f", "--follow", action="store_true", help="Keep printing updates")
+    p.add_argument("--interval", type=float, default=5.0, metavar="SECONDS")
+    p.set_defaults(func=cmd_tail)
+
+    p = sub.add_parser("diagnostics", help="Monitor metrics from the running app, or from local polls")
+    p.add_argument("--polls", type=int, default=20, help="Number of polls to run (default: 20)")
+    p.add_argument("--exe", help="Executable to count (default: the configured one)")
+    p.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    p.add_argument("--local", action="store_true",
+                   help="Run local polls even if the app is running")
+    p.add_argument("--records", action="store_true",
+                   help="Include every poll record in the JSON (local polls only)")
+    p.set_defaults(func=cmd_diagnostics, needs_db=False)
+
+    p = sub.add_parser("status", help="Live state of the running app")
+    p.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    p.set_defaults(func=cmd_status, needs_db=False)
+
+    p = sub.add_parser("poll", help="Make the running app count now")
+    p.set_defaults(func=cmd_poll, needs_db=False)
+
+    p = sub.add_parser("alerts", help="List and edit alert rules")
+    alerts_sub = p.add_subparsers(dest="alerts_command")
+    a = alerts_sub.add_parser("list", help="List the rules (default)")
+    a.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    a = alerts_sub.add_parser("add", help="Add a rule")
+    a.add_argument("kind", choices=["above", "daily-max", "idle"],
+                   help="above: count > THRESHOLD for MINUTES; daily-max: today's max > THRESHOLD; "
+                        "idle: none running for MINUTES within HOURS")
+    a.add_argument("--threshold", type=int, default=0)
+    a.add_argument("--minutes", type=int, default=0, help="How long the condition must hold")
+    a.add_argument("--hours", type=_parse_hours, metavar="FROM-TO",
+                   help="Hours an idle rule applies, e.g. 9-17 (default: all day)")
+    a.add_argument("--command", help="Command to start when the rule fires")
+    for action in ("remove", "enable", "disable"):
+        a = alerts_sub.add_parser(action, help=f"{action.capitalize()} a rule")
+        a.add_argument("id", type=int)
+    p.set_defaults(func=cmd_alerts)
+
+    p = sub.add_parser("live", help="Print the live snapshot from shared memory as JSON")
+    p.add_argument("--watch", type=float, metavar="SECONDS",
+                   help="Keep printing whenever the snapshot changes")
+    p.set_defaults(func=cmd_live, needs_db=False)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    _attach_console()
+    args = build_parser().parse_args(argv)
+    if not getattr(args, "needs_db", True):
+        return args.func(None, args)
+    db = Database()
+    try:
+        return args.func(db, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,16 @@
-﻿import os
-import sys
-import winreg
+﻿import sys
 from typing import List, Tuple
 from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-                              QLabel, QLineEdit, QPushButton, QListWidget,
-                              QListWidgetItem, QFileDialog, QMessageBox)
-from PyQt6.QtCore import pyqtSignal, Qt, QThread
+                              QLabel, QLineEdit, QPushButton, QListView,
+                              QFileDialog, QMessageBox, QTabWidget, QTableWidget,
+                              QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PyQt6.QtCore import pyqtSignal, Qt, QThread, QAbstractListModel, QModelIndex
+from PyQt6.QtGui import QColor
 from database import Database
+from app_discovery import cached_apps, refresh_apps
+from app_search import AppIndex
+from monitor_core import POLL_INTERVAL
+from scanner import InstanceScanner
 
 
 WINDOW_STYLE = """
@@ -26,23 +30,60 @@ WINDOW_STYLE = """
     QLineEdit:focus {
         border: 1px solid #4ade80;
     }
-    QListWidget {
+    QListView {
         background-color: #252525;
         border: 1px solid #333;
         border-radius: 6px;
         outline: none;
     }
-    QListWidget::item {
+    QListView::item {
         padding: 8px 12px;
         border-bottom: 1px solid #2a2a2a;
     }
-    QListWidget::item:selected {
+    QListView::item:selected {
         background-color: #2d4a35;
         color: #4ade80;
     }
-    QListWidget::item:hover:!selected {
+    QListView::item:hover:!selected {
         background-color: #2a2a2a;
     }
+    QTabWidget::pane {
+        border: none;
+    }
+    QTabBar::tab {
+        background-color: #252525;
+        color: #888;
+        border: 1px solid #333;
+        border-bottom: none;
+        border-top-left-radius: 6px;
+        border-top-right-radius: 6px;
+        padding: 6px 14px;
+        margin-right: 2px;
+    }
+    QTabBar::tab:selected {
+        background-color: #2d4a35;
+        color: #4ade80;
+    }
+    QTableWidget {
+        background-color: #252525;
+        gridline-color: #2a2a2a;
+        border: 1px solid #333;
+        border-radius: 6px;
+        outline: none;
+    }
+    QTableWidget::item:selected {
+        background-color: #2d4a35;
+        color: #4ade80;
+    }
+    QHeaderView::section {
+        background-color: #252525;
+        color: #888;
+        font-size: 11px;
+        font-weight: 600;
+        padding: 5px 8px;
+        border: none;
+        border-bottom: 1px solid #333;
+    }
     QPushButton {
         background-color: #2d2d2d;
         color: #e0e0e0;
@@ -80,104 +121,92 @@ WINDOW_STYLE = """
 """
 
 
-# â”€â”€ Registry enumeration â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
-
-UNINSTALL_KEYS = [
-    (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
-    (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
-    (winreg.HKEY_CURRENT_USER,  r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
-]
-
+# â”€â”€ Background loader thread â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
 
-def _resolve_exe_from_icon(display_icon: str) -> str:
-    """Extract the exe path from a DisplayIcon value like 'C:\\app.exe,0'."""
-    if not display_icon:
-        return ""
-    # Strip icon index suffix: "path.exe,0"  or  "path.exe,-1"
-    path = display_icon.strip().strip('"')
-    if "," in path:
-        path = path.rsplit(",", 1)[0].strip()
-    path = path.strip('"')
-    if path.lower().endswith(".exe") and os.path.isfile(path):
-        return path
-    return ""
+class AppLoaderThread(QThread):
+    """Rescans the discovery sources whose change stamp moved, then emits the merged list."""
+    apps_loaded = pyqtSignal(list)
 
+    def run(self):
+        db = Database()  # one connection per thread
+        try:
+            apps, _changed = refresh_apps(db)
+        finally:
+            db.close()
+        self.apps_loaded.emit(apps)
 
-def _find_main_exe(install_location: str) -> str:
-    """Try to find a single .exe in the root of the install location."""
-    if not install_location or not os.path.isdir(install_location):
-        return ""
-    try:
-        exes = [f for f in os.listdir(install_location) if f.lower().endswith(".exe")]
-        if len(exes) == 1:
-            return os.path.join(install_location, exes[0])
-    except OSError:
-        pass
-    return ""
 
+class RunningAppsThread(QThread):
+    """Groups the running processes by executable, off the UI thread."""
+    apps_loaded = pyqtSignal(list)
 
-def enumerate_installed_apps() -> List[Tuple[str, str]]:
-    """
-    Return a sorted list of (display_name, exe_path) tuples for installed apps.
-    Only includes entries where we can confidently resolve an exe path.
-    """
-    apps: dict = {}  # name â†’ exe_path (deduplicate by name)
+    def __init__(self, scanner, max_age=None):
+        super().__init__()
+        self.scanner = scanner
+        self.max_age = max_age
 
-    for hive, key_path in UNINSTALL_KEYS:
+    def run(self):
         try:
-            with winreg.OpenKey(hive, key_path) as root:
-                i = 0
-                while True:
-                    try:
-                        sub_name = winreg.EnumKey(root, i)
-                        i += 1
-                    except OSError:
-                        break
-                    try:
-                        with winreg.OpenKey(root, sub_name) as sub:
-                            def val(name):
-                                try:
-                                    return winreg.QueryValueEx(sub, name)[0]
-                                except OSError:
-                                    return ""
-
-                            display_name     = val("DisplayName").strip()
-                            display_icon     = val("DisplayIcon")
-                            install_location = val("InstallLocation").strip().strip('"')
-                            system_component = val("SystemComponent")
-
-                            # Skip unnamed, system components, and updates
-                            if not display_name:
-                                continue
-                            if system_component == 1:
-                                continue
-                            if "KB" in sub_name and sub_name.startswith("{") is False:
-                                continue
-
-                            exe = _resolve_exe_from_icon(display_icon)
-                            if not exe:
-                                exe = _find_main_exe(install_location)
-                            if not exe:
-                                continue
-
-                            if display_name not in apps:
-                                apps[display_name] = exe
-                    except OSError:
-                        continue
-        except OSError:
-            continue
-
-    return sorted(apps.items(), key=lambda x: x[0].lower())
+            apps = self.scanner.running_apps(self.max_age)
+        except Exception:
+            apps = []  # a failed snapshot shows as an empty table; Refresh tries again
+        self.apps_loaded.emit(apps)
 
 
-# â”€â”€ Background loader thread â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
+# ── App list model ────────────────────────────────────────────────────────────
 
-class AppLoaderThread(QThread):
-    apps_loaded = pyqtSignal(list)
+class AppListModel(QAbstractListModel):
+    """Rows are positions in an AppIndex, best match first.
 
-    def run(self):
-        apps = enumerate_installed_apps()
-        self.apps_loaded.emit(apps)
+    With no rows the model shows one disabled placeholder row ("Loading…",
+    "No matching apps found") instead, so the view never needs extra widgets.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._index = AppIndex()
+        self._rows: list[int] = []
+        self._query = ""
+        self.placeholder = "Loading installed apps…"
+
+    def set_apps(self, apps: List[Tuple[str, str]]):
+        self.beginResetModel()
+        self._index = AppIndex(apps)
+        self._rows = self._index.search(self._query)
+        self.placeholder = "No matching apps found"
+        self.endResetModel()
+
+    def set_filter(self, text: str):
+        self._query = text
+        self.beginResetModel()
+        self._rows = self._index.search(text)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows) or 1
+
+    def flags(self, index):
+        if not self._rows:
+            return Qt.ItemFlag.NoItemFlags
+        return super().flags(index)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if not self._rows:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return self.placeholder
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QColor(Qt.GlobalColor.gray)
+            return None
+        name, exe = self._index.entry(self._rows[index.row()])
+        if role == Qt.ItemDataRole.DisplayRole:
+            return name
+        if role in (Qt.ItemDataRole.ToolTipRole, Qt.ItemDataRole.UserRole):
+            return exe
+        return None
 
 
 # â”€â”€ Config window â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
@@ -185,10 +214,15 @@ class AppLoaderThread(QThread):
 class ConfigWindow(QWidget):
     configuration_saved = pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, scanner_provider=None):
         super().__init__()
         self.db = Database()
+        # Returns the running monitor's scanner (or None) so its process table can be reused
+        self._scanner_provider = scanner_provider
+        self._own_scanner = None
+        self._running_loader = None
         self._all_apps: list[tuple[str, str]] = []
+        self.app_model = AppListModel(self)
         self._selected_exe = ""
         self.init_ui()
         self.check_initial_config()
@@ -207,23 +241,59 @@ class ConfigWindow(QWidget):
         header.setObjectName("sectionLabel")
         root.addWidget(header)
 
-        # â”€â”€ Search box â”€â”€
+        self.tabs = QTabWidget()
+        root.addWidget(self.tabs)
+
+        # ── Installed tab: search box + app list ──
+        installed_tab = QWidget()
+        installed = QVBoxLayout(installed_tab)
+        installed.setContentsMargins(0, 8, 0, 0)
         self.search_edit = QLineEdit()
         self.search_edit.setPlaceholderText("Search installed appsâ€¦")
-        self.search_edit.textChanged.connect(self._filter_list)
-        root.addWidget(self.search_edit)
+        self.search_edit.textChanged.connect(self.app_model.set_filter)
+        installed.addWidget(self.search_edit)
 
-        # â”€â”€ App list â”€â”€
-        self.app_list = QListWidget()
+        self.app_list = QListView()
         self.app_list.setMinimumHeight(280)
-        self.app_list.currentItemChanged.connect(self._on_item_selected)
-        self.app_list.itemDoubleClicked.connect(self._on_item_double_clicked)
-
-        loading_item = QListWidgetItem("Loading installed appsâ€¦")
-        loading_item.setForeground(Qt.GlobalColor.gray)
-        loading_item.setFlags(Qt.ItemFlag.NoItemFlags)
-        self.app_list.addItem(loading_item)
-        root.addWidget(self.app_list)
+        self.app_list.setUniformItemSizes(True)
+        self.app_list.setModel(self.app_model)
+        self.app_list.selectionModel().currentChanged.connect(self._on_item_selected)
+        self.app_list.doubleClicked.connect(self._on_item_double_clicked)
+        installed.addWidget(self.app_list)
+        self.tabs.addTab(installed_tab, "Installed")
+
+        # ── Running now tab: processes grouped by executable ──
+        running_tab = QWidget()
+        running = QVBoxLayout(running_tab)
+        running.setContentsMargins(0, 8, 0, 0)
+        self.running_table = QTableWidget(0, 4)
+        self.running_table.setHorizontalHeaderLabels(["App", "Instances", "Processes", "Memory MiB"])
+        header = self.running_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.running_table.verticalHeader().setVisible(False)
+        self.running_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.running_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.running_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        header.setSortIndicator(3, Qt.SortOrder.DescendingOrder)  # largest memory first
+        self.running_table.setSortingEnabled(True)
+        self.running_table.currentItemChanged.connect(self._on_running_selected)
+        self.running_table.itemDoubleClicked.connect(self._on_running_double_clicked)
+        running.addWidget(self.running_table)
+
+        running_row = QHBoxLayout()
+        self.running_status = QLabel()
+        self.running_status.setStyleSheet("color: #888; font-size: 11px;")
+        self.refresh_running_button = QPushButton("Refresh")
+        self.refresh_running_button.clicked.connect(self.refresh_running)
+        running_row.addWidget(self.running_status)
+        running_row.addStretch()
+        running_row.addWidget(self.refresh_running_button)
+        running.addLayout(running_row)
+        self.tabs.addTab(running_tab, "Running now")
+        self._running_tab = running_tab
+        self._running_loaded = False
+        self.tabs.currentChanged.connect(self._on_tab_changed)
 
         # â”€â”€ Selected exe path â”€â”€
         path_label = QLabel("EXECUTABLE PATH")
@@ -251,7 +321,10 @@ class ConfigWindow(QWidget):
         btn_row.addWidget(self.save_button)
         root.addLayout(btn_row)
 
-        # Start loading apps in background
+        # Show the last discovered list at once, then rescan changed sources in background
+        self._all_apps = cached_apps(self.db)
+        if self._all_apps:
+            self.app_model.set_apps(self._all_apps)
         self._loader = AppLoaderThread()
         self._loader.apps_loaded.connect(self._on_apps_loaded)
         self._loader.start()
@@ -263,38 +336,85 @@ class ConfigWindow(QWidget):
             self._selected_exe = exe
             self.save_button.setEnabled(False)
             self.browse_button.setEnabled(False)
-            self.search_edit.setEnabled(False)
-            self.app_list.setEnabled(False)
+            self.tabs.setEnabled(False)
             self.reset_button.setEnabled(True)
         else:
             self.save_button.setEnabled(False)  # enabled once something is selected
             self.reset_button.setEnabled(False)
 
     def _on_apps_loaded(self, apps: List[Tuple[str, str]]):
+        if apps == self._all_apps and apps:
+            return  # the cached list is current; keep the selection and scroll position
         self._all_apps = apps
-        self._populate_list(apps)
-
-    def _populate_list(self, apps: List[Tuple[str, str]]):
-        self.app_list.clear()
-        if not apps:
-            item = QListWidgetItem("No matching apps found")
-            item.setForeground(Qt.GlobalColor.gray)
-            item.setFlags(Qt.ItemFlag.NoItemFlags)
-            self.app_list.addItem(item)
+        self.app_model.set_apps(apps)
+
+    # ── Running now ──
+
+    def _on_tab_changed(self, index):
+        # The first snapshot is taken when the tab is first opened, not with the window
+        if self.tabs.widget(index) is self._running_tab and not self._running_loaded:
+            self.refresh_running()
+
+    def refresh_running(self):
+        if self._running_loader is not None and self._running_loader.isRunning():
             return
-        for name, exe in apps:
-            item = QListWidgetItem(name)
-            item.setToolTip(exe)
-            item.setData(Qt.ItemDataRole.UserRole, exe)
-            self.app_list.addItem(item)
+        scanner = self._scanner_provider() if self._scanner_provider else None
+        if scanner is not None:
+            # The monitor scanned within the last poll interval: group its table
+            max_age = POLL_INTERVAL * 2
+        else:
+            if self._own_scanner is None:
+                self._own_scanner = InstanceScanner()  # kept so exe lookups stay cached
+            scanner, max_age = self._own_scanner, None
+        self._running_loaded = True
+        self.refresh_running_button.setEnabled(False)
+        self.running_status.setText("Reading processes…")
+        self._running_loader = RunningAppsThread(scanner, max_age)
+        self._running_loader.apps_loaded.connect(self._on_running_loaded)
+        self._running_loader.start()
+
+    def _on_running_loaded(self, apps):
+        table = self.running_table
+        table.setSortingEnabled(False)  # don't re-sort while rows are being filled
+        table.setRowCount(len(apps))
+        for row, app in enumerate(apps):
+            name_item = QTableWidgetItem(app.name)
+            name_item.setToolTip(app.exe)
+            name_item.setData(Qt.ItemDataRole.UserRole, app.exe)
+            table.setItem(row, 0, name_item)
+            for col, value in enumerate((app.instances, app.processes,
+                                         round(app.rss / (1024 * 1024), 1)), start=1):
+                item = QTableWidgetItem()
+                item.setData(Qt.ItemDataRole.DisplayRole, value)  # numeric, so columns sort by value
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                table.setItem(row, col, item)
+        table.setSortingEnabled(True)
+        processes = sum(app.processes for app in apps)
+        self.running_status.setText(f"{len(apps)} executables, {processes} processes")
+        self.refresh_running_button.setEnabled(True)
+
+    def _running_exe(self, item):
+        return self.running_table.item(item.row(), 0).data(Qt.ItemDataRole.UserRole) if item else None
+
+    def _on_running_selected(self, current, _previous):
+        exe = self._running_exe(current)
+        if exe:
+            self._selected_exe = exe
+            self.path_edit.setText(exe)
+            self.save_button.setEnabled(True)
+
+    def _on_running_double_clicked(self, item):
+        """Double-click saves immediately."""
+        exe = self._running_exe(item)
+        if exe:
+            self._selected_exe = exe
+            self.path_edit.setText(exe)
+            self.save_configuration()
 
-    def _filter_list(self, text: str):
-        query = text.lower()
-        filtered = [(n, e) for n, e in self._all_apps if query in n.lower()]
-        self._populate_list(filtered)
+    # ── Installed apps ──
 
     def _on_item_selected(self, current, _previous):
-        if current is None:
+        if not current.isValid():
             return
         exe = current.data(Qt.ItemDataRole.UserRole)
         if exe:
@@ -302,9 +422,9 @@ class ConfigWindow(QWidget):
             self.path_edit.setText(exe)
             self.save_button.setEnabled(True)
 
-    def _on_item_double_clicked(self, item):
+    def _on_item_double_clicked(self, index):
         """Double-click saves immediately."""
-        exe = item.data(Qt.ItemDataRole.UserRole)
+        exe = index.data(Qt.ItemDataRole.UserRole)
         if exe:
             self._selected_exe = exe
             self.path_edit.setText(exe)
@@ -312,7 +432,8 @@ class ConfigWindow(QWidget):
 
     def browse_executable(self):
         path, _ = QFileDialog.getOpenFileName(
-            self, "Select Executable", "", "Executable Files (*.exe)"
+            self, "Select Executable", "",
+            "Executable Files (*.exe)" if sys.platform == 'win32' else "All Files (*)"
         )
         if path:
             self._selected_exe = path
@@ -336,8 +457,7 @@ class ConfigWindow(QWidget):
         self.save_button.setEnabled(False)
         self.reset_button.setEnabled(False)
         self.browse_button.setEnabled(True)
-        self.search_edit.setEnabled(True)
-        self.app_list.setEnabled(True)
+        self.tabs.setEnabled(True)
         self.search_edit.setFocus()
 
 
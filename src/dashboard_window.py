@@ -2,12 +2,12 @@ import os
 import psutil
 from datetime import datetime
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                              QLabel, QPushButton, QFrame)
+                              QLabel, QPushButton, QFrame, QComboBox)
 from PyQt6.QtCore import QTimer, QDate, Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QIcon
 from heatmap_widget import CalendarHeatmap
 from database import Database
-from export_dialog import ExportDialog
+import anomaly
 
 APP_STYLE = """
     QMainWindow, QWidget {
@@ -30,8 +30,23 @@ APP_STYLE = """
     QPushButton:pressed {
         background-color: #222;
     }
+    QComboBox {
+        background-color: #2d2d2d;
+        color: #e0e0e0;
+        border: 1px solid #444;
+        border-radius: 6px;
+        padding: 5px 8px;
+        font-size: 12px;
+    }
+    QComboBox:hover { border: 1px solid #666; }
+    QComboBox QAbstractItemView {
+        background-color: #252525;
+        selection-background-color: #2d4a35;
+    }
 """
 
+VIEW_PREFIXES = {"user": "User", "session": "Session", "container": "Container"}
+
 STAT_CARD_STYLE = """
     QFrame {
         background-color: #252525;
@@ -70,6 +85,7 @@ class DashboardWindow(QMainWindow):
         # Prime CPU percent so first read is non-zero
         psutil.cpu_percent(interval=None)
         self.init_ui()
+        self.refresh_views()
         self.load_heatmap_data()
 
         self.time_timer = QTimer(self)
@@ -133,6 +149,12 @@ class DashboardWindow(QMainWindow):
         prev_btn.setFixedWidth(80)
         prev_btn.clicked.connect(self.prev_month_action)
         left_layout.addWidget(prev_btn)
+        # Whose daily maxima the heatmap shows: everyone, or one user / session / container
+        self.view_combo = QComboBox()
+        self.view_combo.setFixedWidth(130)
+        self.view_combo.setToolTip("Show everyone's instances, or one user's, session's or container's")
+        self.view_combo.currentIndexChanged.connect(self.load_heatmap_data)
+        left_layout.addWidget(self.view_combo)
         left_layout.addStretch()
 
         self.month_label = QLabel()
@@ -156,7 +178,7 @@ class DashboardWindow(QMainWindow):
         export_btn = QPushButton("\u2b07")    # ⬇ downwards arrow
         export_btn.setFixedSize(32, 32)
         export_btn.setStyleSheet(_icon_btn_style)
-        export_btn.setToolTip("Export data to CSV")
+        export_btn.setToolTip("Export data (CSV / JSON Lines)")
         export_btn.clicked.connect(self.open_export_dialog)
         next_btn = QPushButton("Next \u203a")
         next_btn.setFixedWidth(80)
@@ -198,17 +220,54 @@ class DashboardWindow(QMainWindow):
         self.today_max_label.setText(str(today_data[0][1]) if today_data else "0")
         self.heatmap.set_data(self.heatmap.data, db=self.db, live_count=current_count)
 
+    def refresh_views(self):
+        """List every user, session and container recorded so far, keeping the current choice."""
+        current = self.view_combo.currentData()
+        self.view_combo.blockSignals(True)
+        self.view_combo.clear()
+        self.view_combo.addItem("Everyone", None)
+        for dimension, prefix in VIEW_PREFIXES.items():
+            for name in self.db.get_group_names(dimension):
+                self.view_combo.addItem(f"{prefix}: {name}", (dimension, name))
+        index = self.view_combo.findData(current)
+        self.view_combo.setCurrentIndex(max(index, 0))
+        self.view_combo.blockSignals(False)
+        if index < 0 and current is not None:
+            self.load_heatmap_data()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_views()  # users who started the app since the dashboard was last open
+
     def load_heatmap_data(self):
         year = self.heatmap.current_date.year()
         month = self.heatmap.current_date.month()
-        counts = self.db.get_counts_for_month(year, month)
+        view = self.view_combo.currentData()
+        if view is None:
+            counts = self.db.get_counts_for_month(year, month)
+            anomalies = self.load_anomalies(year, month)
+        else:
+            first = QDate(year, month, 1)
+            counts = self.db.get_group_counts_for_range(
+                view[0], view[1], first.toString('yyyy-MM-dd'),
+                first.addDays(first.daysInMonth() - 1).toString('yyyy-MM-dd'))
+            anomalies = {}  # scored for the totals only
         data_for_heatmap = {}
         for date_str, count in counts:
             q_date = QDate.fromString(date_str, 'yyyy-MM-dd')
             data_for_heatmap[q_date] = count
-        self.heatmap.set_data(data_for_heatmap, db=self.db, live_count=self.get_live_count())
+        self.heatmap.set_data(data_for_heatmap, db=self.db, live_count=self.get_live_count(),
+                              anomalies=anomalies)
         self.update_month_label()
 
+    def load_anomalies(self, year, month):
+        """Score any days closed since the last look, then return this month's unusual days."""
+        anomaly.update(self.db)
+        first = QDate(year, month, 1)
+        last = first.addDays(first.daysInMonth() - 1)
+        rows = self.db.get_flagged_days(first.toString('yyyy-MM-dd'), last.toString('yyyy-MM-dd'))
+        return {QDate.fromString(d, 'yyyy-MM-dd'): (expected, score) for d, _, expected, score in rows}
+
     def get_live_count(self):
         try:
             return int(self.current_count_label.text())
@@ -216,6 +275,7 @@ class DashboardWindow(QMainWindow):
             return None
 
     def open_export_dialog(self):
+        from export_dialog import ExportDialog  # loaded on first use, not at tray start-up
         dlg = ExportDialog(self.db, self)
         dlg.exec()
 
@@ -3,6 +3,10 @@ import os
 import sys
 
 def get_data_dir():
+    # TALLYCOUNTER_DATA_DIR overrides the location (used by the soak and startup benchmarks)
+    override = os.environ.get("TALLYCOUNTER_DATA_DIR")
+    if override:
+        return override
     # When frozen by PyInstaller, store db next to the .exe
     # When running normally, store next to the script
     if getattr(sys, 'frozen', False):
@@ -24,12 +28,67 @@ class Database:
                     max_instances INTEGER NOT NULL
                 )
             """)
+            self.conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_daily_counts_max
+                ON daily_counts (max_instances)
+            """)
             self.conn.execute("""
                 CREATE TABLE IF NOT EXISTS config (
                     key TEXT PRIMARY KEY,
                     value TEXT NOT NULL
                 )
             """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS alert_rules (
+                    id INTEGER PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    threshold INTEGER NOT NULL DEFAULT 0,
+                    minutes INTEGER NOT NULL DEFAULT 0,
+                    hour_from INTEGER NOT NULL DEFAULT 0,
+                    hour_to INTEGER NOT NULL DEFAULT 0,
+                    command TEXT NOT NULL DEFAULT '',
+                    enabled INTEGER NOT NULL DEFAULT 1
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS app_sources (
+                    source TEXT PRIMARY KEY,
+                    stamp TEXT NOT NULL,
+                    scanned_at TEXT NOT NULL
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS installed_apps (
+                    source TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    exe TEXT NOT NULL,
+                    PRIMARY KEY (source, name, exe)
+                )
+            """)
+            # Daily maxima per user / session / container (scanner.DIMENSIONS)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS group_daily_counts (
+                    dimension TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    max_instances INTEGER NOT NULL,
+                    PRIMARY KEY (dimension, name, date)
+                )
+            """)
+            self.conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_group_daily_counts_date
+                ON group_daily_counts (dimension, date)
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS day_scores (
+                    date TEXT PRIMARY KEY,
+                    max_instances INTEGER NOT NULL,
+                    expected REAL,
+                    score REAL,
+                    slope REAL,
+                    flagged INTEGER NOT NULL DEFAULT 0
+                )
+            """)
 
     def set_config(self, key, value):
         with self.conn:
@@ -44,6 +103,76 @@ class Database:
             result = cursor.fetchone()
             return result[0] if result else None
 
+    def get_alert_rules(self):
+        """Return every alert rule as (id, kind, threshold, minutes, hour_from, hour_to, command, enabled)."""
+        with self.conn:
+            cursor = self.conn.execute("""
+                SELECT id, kind, threshold, minutes, hour_from, hour_to, command, enabled
+                FROM alert_rules ORDER BY id
+            """)
+            return cursor.fetchall()
+
+    def _bump_alert_rules_version(self):
+        # The running monitor polls this key and reloads its rules when it moves
+        self.conn.execute("""
+            INSERT INTO config (key, value) VALUES ('alert_rules_version', '1')
+            ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+        """)
+
+    def add_alert_rule(self, kind, threshold=0, minutes=0, hour_from=0, hour_to=0, command=""):
+        """Insert an alert rule and return its id."""
+        with self.conn:
+            cursor = self.conn.execute("""
+                INSERT INTO alert_rules (kind, threshold, minutes, hour_from, hour_to, command)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (kind, threshold, minutes, hour_from, hour_to, command))
+            self._bump_alert_rules_version()
+            return cursor.lastrowid
+
+    def set_alert_rule_enabled(self, rule_id, enabled):
+        """Enable or disable a rule; return False if there is no such rule."""
+        with self.conn:
+            cursor = self.conn.execute("UPDATE alert_rules SET enabled = ? WHERE id = ?",
+                                       (1 if enabled else 0, rule_id))
+            self._bump_alert_rules_version()
+            return cursor.rowcount > 0
+
+    def delete_alert_rule(self, rule_id):
+        """Delete a rule; return False if there is no such rule."""
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM alert_rules WHERE id = ?", (rule_id,))
+            self.conn.execute("DELETE FROM config WHERE key = ?", (f"alert_{rule_id}_fired_date",))
+            self._bump_alert_rules_version()
+            return cursor.rowcount > 0
+
+    def get_app_source_stamp(self, source):
+        """Return the change stamp stored with source's discovered apps, or None."""
+        with self.conn:
+            cursor = self.conn.execute("SELECT stamp FROM app_sources WHERE source = ?", (source,))
+            result = cursor.fetchone()
+            return result[0] if result else None
+
+    def get_installed_apps(self, source):
+        """Return the (name, exe) pairs last discovered from source, in discovery order."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "SELECT name, exe FROM installed_apps WHERE source = ? ORDER BY rowid", (source,)
+            )
+            return cursor.fetchall()
+
+    def replace_installed_apps(self, source, stamp, apps):
+        """Replace source's discovered apps and stamp in one transaction."""
+        with self.conn:
+            self.conn.execute("DELETE FROM installed_apps WHERE source = ?", (source,))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO installed_apps (source, name, exe) VALUES (?, ?, ?)",
+                ((source, name, exe) for name, exe in apps)
+            )
+            self.conn.execute("""
+                INSERT OR REPLACE INTO app_sources (source, stamp, scanned_at)
+                VALUES (?, ?, datetime('now'))
+            """, (source, stamp))
+
     def update_daily_max(self, date, count):
         with self.conn:
             cursor = self.conn.execute("SELECT max_instances FROM daily_counts WHERE date = ?", (date,))
@@ -54,6 +183,86 @@ class Database:
             else:
                 self.conn.execute("INSERT INTO daily_counts (date, max_instances) VALUES (?, ?)", (date, count))
 
+    def update_group_daily_maxes(self, date, counts):
+        """Raise the daily maxima of (dimension, name, count) triples in one transaction."""
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO group_daily_counts (dimension, name, date, max_instances)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (dimension, name, date)
+                DO UPDATE SET max_instances = MAX(max_instances, excluded.max_instances)
+            """, ((dimension, name, date, count) for dimension, name, count in counts))
+
+    def get_group_counts_for_date(self, date):
+        """Return (dimension, name, max_instances) rows recorded for one day."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "SELECT dimension, name, max_instances FROM group_daily_counts WHERE date = ?",
+                (date,)
+            )
+            return cursor.fetchall()
+
+    def get_group_names(self, dimension):
+        """Return every name ever recorded for dimension, sorted."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "SELECT DISTINCT name FROM group_daily_counts WHERE dimension = ? ORDER BY name",
+                (dimension,)
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_group_counts_for_range(self, dimension, name, start_date, end_date):
+        """Return (date, max_instances) rows of one user / session / container in the inclusive range."""
+        with self.conn:
+            cursor = self.conn.execute("""
+                SELECT date, max_instances FROM group_daily_counts
+                WHERE dimension = ? AND name = ? AND date >= ? AND date <= ? ORDER BY date
+            """, (dimension, name, start_date, end_date))
+            return cursor.fetchall()
+
+    def get_group_summary(self, dimension, start_date, end_date):
+        """Return (name, days recorded, max_instances) per name of dimension in the range."""
+        with self.conn:
+            cursor = self.conn.execute("""
+                SELECT name, COUNT(*), MAX(max_instances) FROM group_daily_counts
+                WHERE dimension = ? AND date >= ? AND date <= ?
+                GROUP BY name ORDER BY MAX(max_instances) DESC, name
+            """, (dimension, start_date, end_date))
+            return cursor.fetchall()
+
+    def get_group_range_summary(self, dimension, start_date, end_date):
+        """Return (rows, max_instances) of dimension's (day, name) rows in the inclusive range."""
+        with self.conn:
+            cursor = self.conn.execute("""
+                SELECT COUNT(*), MAX(max_instances) FROM group_daily_counts
+                WHERE dimension = ? AND date >= ? AND date <= ?
+            """, (dimension, start_date, end_date))
+            return cursor.fetchone()
+
+    def count_group_rows_for_range(self, dimension, start_date, end_date):
+        """Return the number of (day, name) rows of dimension in the inclusive range."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "SELECT COUNT(*) FROM group_daily_counts WHERE dimension = ? AND date >= ? AND date <= ?",
+                (dimension, start_date, end_date)
+            )
+            return cursor.fetchone()[0]
+
+    def iter_group_counts_for_range(self, dimension, start_date, end_date, chunk_size=500):
+        """Yield (date, name, max_instances) rows of dimension in date order, chunk_size at a time."""
+        cursor = self.conn.execute("""
+            SELECT date, name, max_instances FROM group_daily_counts
+            WHERE dimension = ? AND date >= ? AND date <= ? ORDER BY date, name
+        """, (dimension, start_date, end_date))
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
     def get_counts_for_month(self, year, month):
         date_prefix = f"{year}-{month:02d}"
         with self.conn:
@@ -69,3 +278,100 @@ class Database:
             )
             return cursor.fetchall()
 
+    def get_recent_counts(self, limit):
+        """Return the latest `limit` recorded days as (date, max_instances) rows, oldest first."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "SELECT date, max_instances FROM daily_counts ORDER BY date DESC LIMIT ?",
+                (limit,)
+            )
+            return cursor.fetchall()[::-1]
+
+    def get_data_extent(self):
+        """Return (first_date, last_date) of recorded days, or (None, None) if empty.
+
+        Each bound is a single primary-key index probe, so this is cheap however
+        much history has been recorded.
+        """
+        with self.conn:
+            first = self.conn.execute("SELECT MIN(date) FROM daily_counts").fetchone()[0]
+            last = self.conn.execute("SELECT MAX(date) FROM daily_counts").fetchone()[0]
+            return first, last
+
+    def get_data_summary(self):
+        """Return a dict with first_date, last_date, rows and max_instances over all history."""
+        first, last = self.get_data_extent()
+        with self.conn:
+            peak = self.conn.execute("SELECT MAX(max_instances) FROM daily_counts").fetchone()[0]
+            rows = self.conn.execute("SELECT COUNT(*) FROM daily_counts").fetchone()[0]
+        return {"first_date": first, "last_date": last, "rows": rows, "max_instances": peak}
+
+    def get_range_summary(self, start_date, end_date):
+        """Return (rows, max_instances) for recorded days in the inclusive range."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "SELECT COUNT(*), MAX(max_instances) FROM daily_counts WHERE date >= ? AND date <= ?",
+                (start_date, end_date)
+            )
+            return cursor.fetchone()
+
+    def count_rows_for_range(self, start_date, end_date):
+        """Return the number of recorded days between start_date and end_date (inclusive)."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "SELECT COUNT(*) FROM daily_counts WHERE date >= ? AND date <= ?",
+                (start_date, end_date)
+            )
+            return cursor.fetchone()[0]
+
+    def iter_counts_for_range(self, start_date, end_date, chunk_size=500):
+        """Yield (date, max_instances) rows in date order, fetching chunk_size rows at a time.
+
+        Unlike get_counts_for_range this never materializes the whole range, so
+        memory stays bounded however many rows are selected.
+        """
+        cursor = self.conn.execute(
+            "SELECT date, max_instances FROM daily_counts WHERE date >= ? AND date <= ? ORDER BY date",
+            (start_date, end_date)
+        )
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    def save_day_scores(self, scores, high_water):
+        """Store DayScore rows and advance the anomaly high-water mark in one transaction."""
+        with self.conn:
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO day_scores (date, max_instances, expected, score, slope, flagged)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, ((s.date, s.max_instances, s.expected, s.score, s.slope, int(s.flagged)) for s in scores))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO config (key, value) VALUES ('anomaly_high_water', ?)",
+                (high_water,)
+            )
+
+    def get_flagged_days(self, start_date, end_date):
+        """Return (date, max_instances, expected, score) for unusual days in the inclusive range."""
+        with self.conn:
+            cursor = self.conn.execute("""
+                SELECT date, max_instances, expected, score FROM day_scores
+                WHERE flagged AND date >= ? AND date <= ? ORDER BY date
+            """, (start_date, end_date))
+            return cursor.fetchall()
+
+    def count_flagged_days(self, start_date, end_date):
+        """Return the number of unusual days in the inclusive range."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "SELECT COUNT(*) FROM day_scores WHERE flagged AND date >= ? AND date <= ?",
+                (start_date, end_date)
+            )
+            return cursor.fetchone()[0]
+
+    def close(self):
+        self.conn.close()
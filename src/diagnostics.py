@@ -0,0 +1,85 @@
+"""
+Monitor hot-path instrumentation.
+
+Every poll produces one PollRecord. MonitorDiagnostics keeps the most recent
+ones in a fixed-size ring buffer and summarizes them as percentiles, for the
+tray app's Diagnostics window and for `cli.py diagnostics --json`.
+
+Qt-free; recording a poll is a single deque append.
+"""
+
+import json
+import threading
+import time
+from collections import deque, namedtuple
+
+DEFAULT_CAPACITY = 720  # one hour of 5-second polls
+
+PollRecord = namedtuple("PollRecord", [
+    "timestamp",        # wall-clock time the poll finished
+    "poll_ms",          # whole poll: scan + persist + notify
+    "processes",        # processes in the snapshot
+    "name_matches",     # processes whose name matched the target
+    "exe_resolutions",  # exe lookups requested from the process source
+    "samefile_calls",   # os.path.samefile comparisons
+    "db_write_ms",      # time spent in update_daily_max
+    "emits",            # listener notifications sent
+    "alert_ms",         # alert rule evaluation, including the rule reload check
+])
+
+# Fields summarized as percentiles (everything but the timestamp)
+METRICS = PollRecord._fields[1:]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class MonitorDiagnostics:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self._records = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.total_polls = 0
+        self.started = time.time()
+        self.extra = {}  # one-off measurements, e.g. startup timings
+
+    def record(self, record: PollRecord):
+        with self._lock:
+            self._records.append(record)
+            self.total_polls += 1
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def summary(self) -> dict:
+        """Return {'polls', 'window', 'metrics': {name: {last, p50, p95, p99, max, mean}}}."""
+        records = self.records()
+        metrics = {}
+        for i, name in enumerate(METRICS, start=1):
+            values = sorted(r[i] for r in records)
+            if not values:
+                continue
+            metrics[name] = {
+                "last": records[-1][i],
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+                "max": values[-1],
+                "mean": sum(values) / len(values),
+            }
+        return {
+            "polls": self.total_polls,
+            "window": len(records),
+            "uptime_s": time.time() - self.started,
+            "metrics": metrics,
+            "extra": dict(self.extra),
+        }
+
+    def to_json(self, include_records=False) -> str:
+        data = self.summary()
+        if include_records:
+            data["records"] = [r._asdict() for r in self.records()]
+        return json.dumps(data, indent=2)
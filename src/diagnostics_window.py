@@ -0,0 +1,82 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                              QTableWidget, QTableWidgetItem, QHeaderView, QApplication)
+from PyQt6.QtCore import QTimer, Qt
+from diagnostics import METRICS
+
+COLUMNS = ("last", "p50", "p95", "p99", "max")
+REFRESH_MS = 2000
+
+
+class DiagnosticsWindow(QDialog):
+    """Live percentiles of the monitor's per-poll metrics."""
+
+    def __init__(self, diagnostics_provider, parent=None):
+        super().__init__(parent)
+        # Called on every refresh, since the monitor (and its diagnostics) can be replaced
+        self._provider = diagnostics_provider
+        self.setWindowTitle("Tally Counter — Diagnostics")
+        self.setMinimumSize(560, 320)
+
+        layout = QVBoxLayout(self)
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget(len(METRICS), len(COLUMNS))
+        self.table.setVerticalHeaderLabels(list(METRICS))
+        self.table.setHorizontalHeaderLabels([c.upper() for c in COLUMNS])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        btn_row = QHBoxLayout()
+        btn_row.addStretch()
+        self.copy_btn = QPushButton("Copy JSON")
+        self.copy_btn.clicked.connect(self._copy_json)
+        btn_row.addWidget(self.copy_btn)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        btn_row.addWidget(close_btn)
+        layout.addLayout(btn_row)
+
+        # Only poll the ring buffer while the window is on screen
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        diagnostics = self._provider()
+        if diagnostics is None:
+            self.summary_label.setText("Monitoring is not running.")
+            self.table.clearContents()
+            return
+        summary = diagnostics.summary()
+        text = (f"{summary['polls']} polls in {summary['uptime_s'] / 60:.0f} min "
+                f"· showing the last {summary['window']}")
+        if summary["extra"]:
+            text += "\n" + " · ".join(f"{k}: {v}" for k, v in sorted(summary["extra"].items()))
+        self.summary_label.setText(text)
+        for row, name in enumerate(METRICS):
+            stats = summary["metrics"].get(name)
+            for col, key in enumerate(COLUMNS):
+                text = _format(name, stats[key]) if stats else "—"
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, col, item)
+
+    def _copy_json(self):
+        diagnostics = self._provider()
+        if diagnostics is not None:
+            QApplication.clipboard().setText(diagnostics.to_json())
+
+
+def _format(name, value):
+    return f"{value:.2f}" if name.endswith("_ms") else f"{value:.0f}"
@@ -1,12 +1,16 @@
-import csv
 import os
+import threading
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                               QPushButton, QCalendarWidget, QFileDialog,
                               QMessageBox, QFrame, QTableWidget,
                               QTableWidgetItem, QHeaderView, QWidget,
-                              QSizePolicy, QAbstractItemView)
-from PyQt6.QtCore import Qt, QDate
+                              QSizePolicy, QAbstractItemView, QProgressBar,
+                              QComboBox)
+from PyQt6.QtCore import Qt, QDate, QThread, pyqtSignal
 from PyQt6.QtGui import QTextCharFormat, QColor, QFont, QBrush
+from database import Database
+import anomaly
+import exporter
 
 DIALOG_STYLE = """
     QDialog, QWidget {
@@ -95,6 +99,28 @@ DIALOG_STYLE = """
         border-color: #333;
         color: #555;
     }
+    QComboBox {
+        background-color: #2d2d2d;
+        color: #e0e0e0;
+        border: 1px solid #444;
+        border-radius: 6px;
+        padding: 5px 8px;
+        font-size: 12px;
+    }
+    QComboBox QAbstractItemView {
+        background-color: #252525;
+        selection-background-color: #2d4a35;
+    }
+    QProgressBar {
+        background-color: #252525;
+        border: 1px solid #333;
+        border-radius: 4px;
+        color: #aaa;
+        font-size: 10px;
+        text-align: center;
+        max-height: 14px;
+    }
+    QProgressBar::chunk { background-color: #2d4a35; border-radius: 4px; }
     QFrame#sep { color: #333; }
     QLabel#section { color: #888; font-size: 11px; font-weight: 600; letter-spacing: 1px; }
     QLabel#info { color: #aaa; font-size: 12px; }
@@ -121,6 +147,49 @@ ENDPOINT_FMT.setFontWeight(QFont.Weight.Bold)
 
 CLEAR_FMT = QTextCharFormat()
 
+# The preview table shows at most this many days; the export itself streams the whole range
+PREVIEW_DAYS = 120
+PREVIEW_GROUP_ROWS = 500  # and at most this many (day, name) rows when grouped
+
+
+class ExportWorker(QThread):
+    """Streams the selected range to disk off the UI thread."""
+    progress = pyqtSignal(int, int)   # rows written, total rows
+    completed = pyqtSignal(int)       # rows written
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_path, start_str, end_str, save_path, fmt, exe_name, group_by=None):
+        super().__init__()
+        self.db_path = db_path
+        self.start_str = start_str
+        self.end_str = end_str
+        self.save_path = save_path
+        self.fmt = fmt
+        self.exe_name = exe_name
+        self.group_by = group_by
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self):
+        # SQLite connections are per-thread, so the worker opens its own
+        db = Database(self.db_path)
+        try:
+            written = exporter.export_range(
+                db, self.start_str, self.end_str, self.save_path, self.exe_name,
+                fmt=self.fmt, progress=self.progress.emit,
+                cancel_event=self._cancel_event, group_by=self.group_by,
+            )
+            self.completed.emit(written)
+        except exporter.ExportCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            db.close()
+
 
 def _sep(parent=None):
     line = QFrame(parent)
@@ -136,12 +205,16 @@ class ExportDialog(QDialog):
         self.start_date = None   # QDate
         self.end_date = None     # QDate
         self._picking = "start"  # "start" | "end"
-        self._all_rows = []      # cached db rows for current selection
+        self._export_rows = 0    # rows the current selection would export
+        self._highlighted = None # (start, end) QDates currently formatted on the calendar
+        self._worker = None      # ExportWorker while an export is running
+        self._save_path = ""
 
         self.setWindowTitle("Export Data")
         self.setMinimumWidth(520)
         self.setMinimumHeight(680)
         self.setStyleSheet(DIALOG_STYLE)
+        anomaly.update(self.db)  # score any days that closed since the dashboard last did
         self._init_ui()
 
     # ── UI setup ───────────────────────────────────────────────────────────────
@@ -158,6 +231,7 @@ class ExportDialog(QDialog):
 
         preset_row = QHBoxLayout()
         preset_row.setSpacing(6)
+        self._preset_btns = []
         for label, fn in [
             ("This Month",   self._preset_this_month),
             ("Last Month",   self._preset_last_month),
@@ -169,6 +243,7 @@ class ExportDialog(QDialog):
             b.setObjectName("quickBtn")
             b.clicked.connect(fn)
             preset_row.addWidget(b)
+            self._preset_btns.append(b)
         preset_row.addStretch()
         root.addLayout(preset_row)
 
@@ -204,11 +279,12 @@ class ExportDialog(QDialog):
         tbl_header_row.addWidget(self.range_summary_lbl)
         root.addLayout(tbl_header_row)
 
-        self.table = QTableWidget(0, 3)
-        self.table.setHorizontalHeaderLabels(["Date", "Day", "Max Instances"])
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Date", "Day", "Max Instances", "Unusual"])
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
         self.table.verticalHeader().setVisible(False)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
@@ -224,13 +300,30 @@ class ExportDialog(QDialog):
         self.status_lbl.setObjectName("info")
         bottom.addWidget(self.status_lbl, 1)
 
-        clear_btn = QPushButton("Clear")
-        clear_btn.clicked.connect(self._clear)
-        self.export_btn = QPushButton("Export CSV")
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        bottom.addWidget(self.progress_bar, 1)
+
+        self.group_combo = QComboBox()
+        self.group_combo.addItem("Totals", None)
+        self.group_combo.addItem("By user", "user")
+        self.group_combo.addItem("By session", "session")
+        self.group_combo.addItem("By container", "container")
+        self.group_combo.setToolTip("Export the daily totals, or each user's / session's / container's daily maximum")
+        self.group_combo.currentIndexChanged.connect(self._refresh)
+
+        self.clear_btn = QPushButton("Clear")
+        self.clear_btn.clicked.connect(self._clear)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setVisible(False)
+        self.cancel_btn.clicked.connect(self._cancel_export)
+        self.export_btn = QPushButton("Export…")
         self.export_btn.setObjectName("exportBtn")
         self.export_btn.setEnabled(False)
         self.export_btn.clicked.connect(self._do_export)
-        bottom.addWidget(clear_btn)
+        bottom.addWidget(self.group_combo)
+        bottom.addWidget(self.clear_btn)
+        bottom.addWidget(self.cancel_btn)
         bottom.addWidget(self.export_btn)
         root.addLayout(bottom)
 
@@ -265,41 +358,92 @@ class ExportDialog(QDialog):
     # ── Highlight calendar ─────────────────────────────────────────────────────
 
     def _highlight_calendar(self):
-        # Clear a wide window around today
-        today = QDate.currentDate()
-        for d in range(-400, 400):
-            self.calendar.setDateTextFormat(today.addDays(d), CLEAR_FMT)
-
+        # Only touch the days whose format actually changes between the
+        # previously highlighted range and the new one.
+        new = None
         if self.start_date and self.end_date:
-            d = self.start_date
-            while d <= self.end_date:
-                if d == self.start_date or d == self.end_date:
-                    self.calendar.setDateTextFormat(d, ENDPOINT_FMT)
-                else:
-                    self.calendar.setDateTextFormat(d, RANGE_FMT)
-                d = d.addDays(1)
+            new = (self.start_date, self.end_date)
         elif self.start_date:
-            self.calendar.setDateTextFormat(self.start_date, ENDPOINT_FMT)
+            new = (self.start_date, self.start_date)
+        old = self._highlighted
+
+        if old == new:
+            return
+
+        if old is None or new is None or old[1] < new[0] or new[1] < old[0]:
+            # Disjoint (or one side empty): clear the old range, paint the new one
+            if old:
+                self._format_days(old[0], old[1], CLEAR_FMT)
+            if new:
+                self._format_days(new[0], new[1], RANGE_FMT)
+        else:
+            # Overlapping: clear what fell out, paint what came in
+            (old_start, old_end), (new_start, new_end) = old, new
+            self._format_days(old_start, new_start.addDays(-1), CLEAR_FMT)
+            self._format_days(new_end.addDays(1), old_end, CLEAR_FMT)
+            self._format_days(new_start, old_start.addDays(-1), RANGE_FMT)
+            self._format_days(old_end.addDays(1), new_end, RANGE_FMT)
+            # Old endpoints that are now interior days go back to the range colour
+            for d in (old_start, old_end):
+                if new_start < d < new_end:
+                    self.calendar.setDateTextFormat(d, RANGE_FMT)
+
+        if new:
+            self.calendar.setDateTextFormat(new[0], ENDPOINT_FMT)
+            self.calendar.setDateTextFormat(new[1], ENDPOINT_FMT)
+        self._highlighted = new
+
+    def _format_days(self, first, last, fmt):
+        """Apply fmt to every day from first to last inclusive (no-op if first > last)."""
+        d = first
+        while d <= last:
+            self.calendar.setDateTextFormat(d, fmt)
+            d = d.addDays(1)
 
     # ── Populate data table ────────────────────────────────────────────────────
 
     def _populate_table(self):
+        self.table.clearSpans()
         self.table.setRowCount(0)
         if not self.start_date or not self.end_date:
             return
 
+        # Only the first PREVIEW_DAYS days are fetched, so All Time costs the same as a month
+        preview_end = min(self.end_date, self.start_date.addDays(PREVIEW_DAYS - 1))
         start_str = self.start_date.toString("yyyy-MM-dd")
-        end_str   = self.end_date.toString("yyyy-MM-dd")
+        end_str   = preview_end.toString("yyyy-MM-dd")
+        group_by = self.group_combo.currentData()
+        if group_by is None:
+            self.table.setHorizontalHeaderLabels(["Date", "Day", "Max Instances", "Unusual"])
+            row_idx = self._fill_totals(start_str, end_str, preview_end)
+        else:
+            self.table.setHorizontalHeaderLabels(["Date", group_by.capitalize(), "Max Instances", ""])
+            row_idx = self._fill_groups(group_by, start_str, end_str)
+
+        hidden = preview_end.daysTo(self.end_date)
+        if hidden > 0:
+            self.table.insertRow(row_idx)
+            more = QTableWidgetItem(f"… {hidden} more days, not shown")
+            more.setForeground(QBrush(QColor("#555")))
+            more.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.table.setItem(row_idx, 0, more)
+            self.table.setSpan(row_idx, 0, 1, self.table.columnCount())
+
+        self.table.scrollToTop()
+
+    def _fill_totals(self, start_str, end_str, preview_end):
+        """One row per day of the preview, with the unusual-day notes; return the row count."""
         rows = self.db.get_counts_for_range(start_str, end_str)
-        self._all_rows = rows
 
         # Build a lookup for fast access
         data = {r[0]: r[1] for r in rows}
+        flagged = {d: (expected, score) for d, _, expected, score
+                   in self.db.get_flagged_days(start_str, end_str)}
 
-        # Walk every day in the range
+        # Walk every day in the preview
         d = self.start_date
         row_idx = 0
-        while d <= self.end_date:
+        while d <= preview_end:
             date_str  = d.toString("yyyy-MM-dd")
             day_name  = d.toString("dddd")
             max_inst  = data.get(date_str)
@@ -328,27 +472,78 @@ class ExportDialog(QDialog):
             self.table.setItem(row_idx, 0, date_item)
             self.table.setItem(row_idx, 1, day_item)
             self.table.setItem(row_idx, 2, val_item)
+            if date_str in flagged:
+                expected, score = flagged[date_str]
+                note = QTableWidgetItem(f"{'▲' if score > 0 else '▼'} {score:+.1f}σ  (~{expected:.1f})")
+                note.setForeground(QBrush(QColor("#f59e0b")))
+                note.setToolTip(f"Expected about {expected:.1f} for this day")
+                note.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.table.setItem(row_idx, 3, note)
             row_idx += 1
             d = d.addDays(1)
+        return row_idx
 
-        self.table.scrollToTop()
+    def _fill_groups(self, group_by, start_str, end_str):
+        """One row per recorded (day, name) of the preview, exactly as they export; return the row count."""
+        row_idx = 0
+        for date_str, name, max_inst in self.db.iter_group_counts_for_range(group_by, start_str, end_str):
+            if row_idx == PREVIEW_GROUP_ROWS:
+                self.table.insertRow(row_idx)
+                more = QTableWidgetItem("… more rows, not shown")
+                more.setForeground(QBrush(QColor("#555")))
+                more.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.table.setItem(row_idx, 0, more)
+                self.table.setSpan(row_idx, 0, 1, self.table.columnCount())
+                return row_idx + 1
+            self.table.insertRow(row_idx)
+            date_item = QTableWidgetItem(date_str)
+            date_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            name_item = QTableWidgetItem(name)
+            name_item.setTextAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
+            val_item = QTableWidgetItem(str(max_inst))
+            val_item.setForeground(QBrush(QColor("#4ade80")))
+            val_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.table.setItem(row_idx, 0, date_item)
+            self.table.setItem(row_idx, 1, name_item)
+            self.table.setItem(row_idx, 2, val_item)
+            row_idx += 1
+        return row_idx
 
     # ── Refresh all state ──────────────────────────────────────────────────────
 
     def _refresh(self):
         self._highlight_calendar()
         self._populate_table()
+        self._export_rows = 0
 
         if self.start_date and self.end_date:
             days   = self.start_date.daysTo(self.end_date) + 1
-            points = len(self._all_rows)
+            start_str = self.start_date.toString("yyyy-MM-dd")
+            end_str   = self.end_date.toString("yyyy-MM-dd")
+            group_by = self.group_combo.currentData()
+            if group_by is None:
+                points, peak = self.db.get_range_summary(start_str, end_str)
+                unusual = self.db.count_flagged_days(start_str, end_str)
+                recorded = "recorded"
+            else:
+                # What a grouped export would write, which can be nothing while totals exist
+                points, peak = self.db.get_group_range_summary(group_by, start_str, end_str)
+                unusual = 0
+                recorded = f"{group_by} rows"
+            self._export_rows = points
             self.instruction_lbl.setText(
                 f"{self.start_date.toString('dd MMM yyyy')}  →  "
                 f"{self.end_date.toString('dd MMM yyyy')}"
             )
-            self.range_summary_lbl.setText(f"{days} days  ·  {points} recorded")
+            summary = f"{days} days  ·  {points} {recorded}"
+            if peak is not None:
+                summary += f"  ·  peak {peak}"
+            if unusual:
+                summary += f"  ·  {unusual} unusual"
+            self.range_summary_lbl.setText(summary)
             self.status_lbl.setText(
-                "No data in range." if points == 0 else f"{points} rows ready to export."
+                f"No {'' if group_by is None else 'per-' + group_by + ' '}data in range." if points == 0
+                else f"{points} rows ready to export."
             )
             self.export_btn.setEnabled(points > 0)
         elif self.start_date:
@@ -385,41 +580,105 @@ class ExportDialog(QDialog):
         self._apply_range(end.addDays(-29), end)
 
     def _preset_all_time(self):
-        rows = self.db.get_counts_for_range("0000-01-01", "9999-12-31")
-        if not rows:
+        first, last = self.db.get_data_extent()
+        if first is None:
             QMessageBox.information(self, "No Data", "No data recorded yet.")
             return
-        dates = [r[0] for r in rows]
-        self._apply_range(QDate.fromString(min(dates), "yyyy-MM-dd"),
-                          QDate.fromString(max(dates), "yyyy-MM-dd"))
+        self._apply_range(QDate.fromString(first, "yyyy-MM-dd"),
+                          QDate.fromString(last, "yyyy-MM-dd"))
 
     # ── Export ─────────────────────────────────────────────────────────────────
 
     def _do_export(self):
-        if not self._all_rows:
+        if not self._export_rows or self._worker is not None:
             return
 
         exe_path = self.db.get_config("executable_path") or ""
         app_name = os.path.splitext(os.path.basename(exe_path))[0] if exe_path else "TallyCounter"
         start_str = self.start_date.toString("yyyy-MM-dd")
         end_str   = self.end_date.toString("yyyy-MM-dd")
-        suggested = f"{app_name}_{start_str}_to_{end_str}.csv"
+        group_by = self.group_combo.currentData()
+        by = f"_by_{group_by}" if group_by else ""
+        suggested = f"{app_name}_{start_str}_to_{end_str}{by}.csv"
 
-        save_path, _ = QFileDialog.getSaveFileName(self, "Save CSV", suggested, "CSV Files (*.csv)")
+        filters = [flt for flt, _ in exporter.FORMATS.values()]
+        save_path, chosen = QFileDialog.getSaveFileName(
+            self, "Export Data", suggested, ";;".join(filters)
+        )
         if not save_path:
             return
 
-        exe_name = os.path.basename(exe_path) if exe_path else "Unknown"
-        with open(save_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["Date", "Application", "Max Instances"])
-            for date_str, max_inst in self._all_rows:
-                # Prefix with ="..." so Excel treats as text, not a date
-                # (prevents auto-parsing and the #### column-width issue)
-                writer.writerow([f'="{date_str}"', exe_name, max_inst])
+        fmt = next((k for k, (flt, _) in exporter.FORMATS.items() if flt == chosen),
+                   exporter.format_for_path(save_path))
+        ext = exporter.FORMATS[fmt][1]
+        if not save_path.lower().endswith(ext):
+            # Swap a plain '.csv' / '.jsonl' suffix for the chosen format's one
+            for other_ext in (".csv", ".jsonl"):
+                if save_path.lower().endswith(other_ext):
+                    save_path = save_path[:-len(other_ext)]
+                    break
+            save_path += ext
 
+        exe_name = os.path.basename(exe_path) if exe_path else "Unknown"
+        self._save_path = save_path
+        self._worker = ExportWorker(self.db.db_path, start_str, end_str,
+                                    save_path, fmt, exe_name, group_by)
+        self._worker.progress.connect(self._on_export_progress)
+        self._worker.completed.connect(self._on_export_completed)
+        self._worker.cancelled.connect(self._on_export_cancelled)
+        self._worker.failed.connect(self._on_export_failed)
+        self._set_exporting(True)
+        self._worker.start()
+
+    def _set_exporting(self, exporting):
+        self.status_lbl.setVisible(not exporting)
+        self.progress_bar.setVisible(exporting)
+        self.progress_bar.setRange(0, 0)  # busy until the first progress report
+        self.cancel_btn.setVisible(exporting)
+        self.cancel_btn.setEnabled(True)
+        self.export_btn.setEnabled(not exporting and self._export_rows > 0)
+        self.clear_btn.setEnabled(not exporting)
+        self.group_combo.setEnabled(not exporting)
+        self.calendar.setEnabled(not exporting)
+        for b in self._preset_btns:
+            b.setEnabled(not exporting)
+
+    def _cancel_export(self):
+        if self._worker is not None:
+            self.cancel_btn.setEnabled(False)
+            self._worker.cancel()
+
+    def _finish_export(self):
+        self._worker.wait()
+        self._worker = None
+        self._set_exporting(False)
+
+    def _on_export_progress(self, done, total):
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(done)
+        self.progress_bar.setFormat(f"{done} / {total} rows")
+
+    def _on_export_completed(self, written):
+        self._finish_export()
         QMessageBox.information(
             self, "Export Complete",
-            f"Exported {len(self._all_rows)} rows to:\n{save_path}"
+            f"Exported {written} rows to:\n{self._save_path}"
         )
         self.accept()
+
+    def _on_export_cancelled(self):
+        self._finish_export()
+        self.status_lbl.setText("Export cancelled.")
+
+    def _on_export_failed(self, message):
+        self._finish_export()
+        QMessageBox.warning(self, "Export Failed", f"Could not export data:\n{message}")
+
+    def reject(self):
+        # Closing the dialog mid-export cancels the worker rather than orphaning it
+        if self._worker is not None:
+            self._worker.blockSignals(True)
+            self._worker.cancel()
+            self._worker.wait()
+            self._worker = None
+        super().reject()
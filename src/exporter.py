@@ -0,0 +1,154 @@
+"""
+Streaming export of recorded daily counts.
+
+Rows are pulled from the database in chunks and written straight to disk, so
+memory use stays bounded however large the selected range is. Supported
+formats are Excel-friendly CSV and JSON Lines, each optionally gzip-compressed.
+An export can also be grouped by user, session or container (one row per day and name).
+
+This module has no Qt dependency so it can be shared by the export dialog,
+the scheduler and the command-line interface.
+"""
+
+import csv
+import gzip
+import json
+import os
+
+CSV_HEADER = ["Date", "Application", "Max Instances"]
+
+# format key -> (file dialog filter, file extension)
+FORMATS = {
+    "csv":      ("CSV Files (*.csv)",               ".csv"),
+    "csv.gz":   ("Compressed CSV (*.csv.gz)",       ".csv.gz"),
+    "jsonl":    ("JSON Lines (*.jsonl)",            ".jsonl"),
+    "jsonl.gz": ("Compressed JSON Lines (*.jsonl.gz)", ".jsonl.gz"),
+}
+
+
+class ExportCancelled(Exception):
+    """Raised when an export is cancelled before it completes."""
+
+
+def format_for_path(path: str) -> str:
+    """Guess the export format from a file name, defaulting to CSV."""
+    lower = path.lower()
+    # Check the longest extensions first so '.csv.gz' wins over '.gz'
+    for fmt, (_, ext) in sorted(FORMATS.items(), key=lambda kv: -len(kv[1][1])):
+        if lower.endswith(ext):
+            return fmt
+    return "csv"
+
+
+def csv_text(value):
+    """Make a free-text cell safe to open in a spreadsheet.
+
+    User names, session names and cgroup-derived container names come from
+    the host, so one starting with = + - @ (or a tab / CR) would otherwise be
+    evaluated as a formula; a leading apostrophe makes it plain text.
+    """
+    if value and value[0] in "=+-@\t\r":
+        return "'" + value
+    return value
+
+
+def csv_row(date_str, exe_name, max_inst):
+    # Prefix with ="..." so Excel treats as text, not a date
+    # (prevents auto-parsing and the #### column-width issue)
+    return [f'="{date_str}"', csv_text(exe_name), max_inst]
+
+
+def open_output(path, fmt, append=False):
+    """Open path for text writing in fmt, transparently gzip-compressing '.gz' formats."""
+    mode = "at" if append else "wt"
+    if fmt.endswith(".gz"):
+        return gzip.open(path, mode, newline="", encoding="utf-8")
+    return open(path, mode[0], newline="", encoding="utf-8")
+
+
+def write_rows(f, fmt, rows, exe_name, header=True, on_row=None, group_by=None):
+    """Write rows to an open text file; return how many were written.
+
+    rows are (date, max_instances), or (date, name, max_instances) when
+    group_by names the dimension ("user", "session" or "container") they are grouped by.
+    on_row, if given, is called after every row with the running total and may
+    raise to abort the write.
+    """
+    written = 0
+    if fmt.startswith("csv"):
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(CSV_HEADER if group_by is None
+                            else CSV_HEADER[:2] + [group_by.capitalize()] + CSV_HEADER[2:])
+        for row in rows:
+            if group_by is None:
+                writer.writerow(csv_row(row[0], exe_name, row[1]))
+            else:
+                date_str, name, max_inst = row
+                writer.writerow(csv_row(date_str, exe_name, max_inst)[:2] + [csv_text(name), max_inst])
+            written += 1
+            if on_row:
+                on_row(written)
+    else:
+        for row in rows:
+            if group_by is None:
+                record = {"date": row[0], "application": exe_name, "max_instances": row[1]}
+            else:
+                record = {"date": row[0], "application": exe_name, group_by: row[1],
+                          "max_instances": row[2]}
+            f.write(json.dumps(record))
+            f.write("\n")
+            written += 1
+            if on_row:
+                on_row(written)
+    return written
+
+
+def export_range(db, start_date, end_date, path, exe_name, fmt=None,
+                 progress=None, cancel_event=None, chunk_size=500, group_by=None) -> int:
+    """
+    Stream rows between start_date and end_date (inclusive) into path.
+
+    With group_by ("user", "session" or "container") the daily maxima of
+    each user, session or container are written instead of the totals.
+
+    progress(done, total) is called once per chunk. If cancel_event is set
+    while exporting, the partial file is removed and ExportCancelled is raised.
+    The file is written under a temporary name and only moved into place once
+    complete, so an existing file is never left half-written.
+    """
+    fmt = fmt or format_for_path(path)
+    if group_by is None:
+        total = db.count_rows_for_range(start_date, end_date)
+    else:
+        total = db.count_group_rows_for_range(group_by, start_date, end_date)
+    tmp_path = path + ".part"
+
+    def on_row(done):
+        if done % chunk_size:
+            return
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExportCancelled()
+        if progress:
+            progress(done, total)
+
+    try:
+        with open_output(tmp_path, fmt) as f:
+            if group_by is None:
+                rows = db.iter_counts_for_range(start_date, end_date, chunk_size)
+            else:
+                rows = db.iter_group_counts_for_range(group_by, start_date, end_date, chunk_size)
+            written = write_rows(f, fmt, rows, exe_name, on_row=on_row, group_by=group_by)
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExportCancelled()
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if progress:
+        progress(written, total)
+    return written
@@ -0,0 +1,94 @@
+"""
+Headless daemon: run the monitor loop without PyQt6.
+
+Usage:
+  python headless.py [--exe PATH] [--quiet]
+  TallyCounter.exe --headless [--exe PATH] [--quiet]
+
+Counts the configured executable (or --exe) every few seconds, records daily
+maxima in the same database as the tray app and runs scheduled exports. Meant
+for servers without a desktop, e.g. as a systemd service or Windows scheduled
+task. Stops cleanly on SIGINT / SIGTERM.
+
+Holds the single-instance lock like the tray app, answers `cli.py status`,
+`poll` and `diagnostics` over local IPC and publishes the live snapshot
+(live_reader.py).
+"""
+
+import argparse
+import os
+import signal
+import sys
+from datetime import datetime
+from alerts import AlertEngine
+from database import Database
+from live_publisher import open_publisher
+from monitor_core import MonitorCore
+from scheduler import ExportScheduler
+from single_instance import InstanceLock, IpcServer
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="TallyCounter --headless",
+                                     description="Run the Tally Counter monitor without a UI.")
+    parser.add_argument("--exe", help="Executable to monitor (default: the configured one)")
+    parser.add_argument("--quiet", action="store_true", help="Only log errors")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    lock = InstanceLock()
+    if not lock.acquire():
+        print("Tally Counter is already running; only one monitor may write the database.",
+              file=sys.stderr)
+        return 1
+    db = Database()
+    exe_path = args.exe or db.get_config("executable_path")
+    if not exe_path:
+        print("No executable configured; pass --exe PATH.", file=sys.stderr)
+        return 2
+    if not os.path.exists(exe_path):
+        # The core would wait for a retarget that a daemon never gets
+        print(f"Error: Executable not found at '{exe_path}'", file=sys.stderr)
+        return 2
+
+    core = MonitorCore(exe_path, db=db, publisher=open_publisher(), alerts=AlertEngine())
+    if not args.quiet:
+        core.add_count_listener(
+            lambda count: print(f"{datetime.now():%Y-%m-%d %H:%M:%S}  {count}", flush=True)
+        )
+    core.add_error_listener(
+        lambda message: print(f"Monitoring Error: {message}", file=sys.stderr, flush=True)
+    )
+    core.add_alert_listener(
+        lambda message: print(f"{datetime.now():%Y-%m-%d %H:%M:%S}  ALERT {message}", flush=True)
+    )
+
+    def shutdown(_signum, _frame):
+        core.stop()
+
+    signal.signal(signal.SIGINT, shutdown)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, shutdown)
+
+    server = IpcServer({
+        "poll": core.force_poll,
+        "snapshot": lambda: dict(core.snapshot(), mode="headless", pid=os.getpid()),
+        "diagnostics": core.diagnostics.summary,
+    })
+    server.start()
+    scheduler = ExportScheduler()
+    scheduler.start()
+    try:
+        core.run()
+    finally:
+        scheduler.stop()
+        server.stop()
+        db.close()
+        lock.release()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,7 @@ CELL_SIZE = 48
 CELL_HEIGHT = 70   # 48 date box + 4 gap + 18 count pill
 CELL_RADIUS = 8
 PILL_RADIUS = 5
+ANOMALY_BORDER = "#f59e0b"  # amber outline on unusual days
 
 DAY_LABEL_STYLE = """
     QLabel {
@@ -74,6 +75,7 @@ class CalendarHeatmap(QWidget):
         self.data = {}
         self.db = None
         self.live_count = None
+        self.anomalies = {}  # QDate -> (expected, score) for flagged days
         self.init_ui()
 
     def init_ui(self):
@@ -90,10 +92,12 @@ class CalendarHeatmap(QWidget):
         outer.addWidget(self.container)
         self.update_calendar()
 
-    def set_data(self, data, db=None, live_count=None):
+    def set_data(self, data, db=None, live_count=None, anomalies=None):
         self.data = data
         self.db = db
         self.live_count = live_count
+        if anomalies is not None:
+            self.anomalies = anomalies
         self.update_calendar()
 
     def update_calendar(self):
@@ -147,17 +151,21 @@ class CalendarHeatmap(QWidget):
         cell.setFixedSize(CELL_SIZE, CELL_HEIGHT)
 
         if color is None:
-            # No data — muted cells
+            # No data (or a recorded 0) — muted cells, outlined amber if unusually quiet
+            if date in self.anomalies:
+                border = hover_border = f"2px solid {ANOMALY_BORDER}"
+            else:
+                border, hover_border = "1px solid #111", "1px solid #3a3a3a"
             cell.setStyleSheet(f"""
                 QWidget {{ background: transparent; }}
                 QFrame#dateBox {{
                     background-color: #2a2a2a;
-                    border: 1px solid #111;
+                    border: {border};
                     border-radius: {CELL_RADIUS}px;
                 }}
                 QFrame#dateBox:hover {{
                     background-color: #383838;
-                    border: 1px solid #3a3a3a;
+                    border: {hover_border};
                 }}
                 QFrame#countBox {{
                     background-color: #1e1e1e;
@@ -168,18 +176,23 @@ class CalendarHeatmap(QWidget):
             cell.day_lbl.setStyleSheet("color: #666; background: transparent;")
             cell.count_lbl.setStyleSheet("color: transparent; background: transparent;")
         else:
-            # Has data — green date box + darker green pill
+            # Has data — green date box + darker green pill, outlined amber if unusual
             pill = color.darker(125)
+            if date in self.anomalies:
+                border = hover_border = f"2px solid {ANOMALY_BORDER}"
+            else:
+                border = f"1px solid {color.darker(145).name()}"
+                hover_border = f"1px solid {color.name()}"
             cell.setStyleSheet(f"""
                 QWidget {{ background: transparent; }}
                 QFrame#dateBox {{
                     background-color: {color.name()};
-                    border: 1px solid {color.darker(145).name()};
+                    border: {border};
                     border-radius: {CELL_RADIUS}px;
                 }}
                 QFrame#dateBox:hover {{
                     background-color: {color.lighter(115).name()};
-                    border: 1px solid {color.name()};
+                    border: {hover_border};
                 }}
                 QFrame#countBox {{
                     background-color: {pill.name()};
@@ -191,7 +204,10 @@ class CalendarHeatmap(QWidget):
             cell.count_lbl.setStyleSheet("color: #071a0d; background: transparent;")
             cell.count_lbl.setText(str(count))
 
-        cell.setToolTip(f"Date: {date.toString('yyyy-MM-dd')}\nMax Count: {count}")
+        tooltip = f"Date: {date.toString('yyyy-MM-dd')}\nMax Count: {count}"
+        if date in self.anomalies:
+            tooltip += "\n" + self.describe_anomaly(date)
+        cell.setToolTip(tooltip)
         cell.click_callback = self.show_day_info
         return cell
 
@@ -210,10 +226,21 @@ class CalendarHeatmap(QWidget):
         today_str = QDate.currentDate().toString('yyyy-MM-dd')
         current_count = self.live_count if (date_str == today_str and self.live_count is not None) else 'N/A'
         max_display = max_count if max_count is not None else 'None'
-        QMessageBox.information(
-            self, "Day Info",
-            f"Date:              {date_str}\nMax Instances:  {max_display}\nCurrent:           {current_count}"
-        )
+        text = f"Date:              {date_str}\nMax Instances:  {max_display}\nCurrent:           {current_count}"
+        if self.db:
+            groups = {}
+            for dimension, name, peak in self.db.get_group_counts_for_date(date_str):
+                groups.setdefault(dimension, []).append(f"{name} {peak}")
+            for dimension, names in groups.items():
+                text += f"\nBy {dimension}:  " + ", ".join(sorted(names))
+        if date in self.anomalies:
+            text += "\n\n" + self.describe_anomaly(date)
+        QMessageBox.information(self, "Day Info", text)
+
+    def describe_anomaly(self, date):
+        expected, score = self.anomalies[date]
+        direction = "higher" if score > 0 else "lower"
+        return f"Unusual: {direction} than expected (~{expected:.1f}, {score:+.1f}σ)"
 
     def next_month(self):
         self.current_date = self.current_date.addMonths(1)
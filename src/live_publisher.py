@@ -0,0 +1,68 @@
+"""
+Writer side of the shared-memory live snapshot (see live_reader.py for the layout).
+
+Only the instance that holds the single-instance lock publishes: the tray
+app's monitor thread, its out-of-process scanner, or the headless daemon.
+Each poll costs one struct.pack_into into the mapping; readers never block it.
+"""
+
+import mmap
+import os
+import time
+from database import get_data_dir
+from live_reader import (FILE_NAME, HEADER, MAGIC, MAX_PATH_BYTES, PAYLOAD, PAYLOAD_OFFSET,
+                         SEQ, SEQ_OFFSET, SIZE, STATE_RUNNING, STATE_STOPPED, VERSION)
+
+
+class SnapshotPublisher:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_data_dir(), FILE_NAME)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < SIZE:
+                os.ftruncate(fd, SIZE)
+            self._map = mmap.mmap(fd, SIZE, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)  # the mapping stays valid
+        # Carry on from an earlier writer's sequence so readers always see it move
+        magic, version, seq = HEADER.unpack_from(self._map, 0)
+        if (magic, version) == (MAGIC, VERSION):
+            self._seq = seq + (seq & 1)
+        else:
+            # New file: readers see "stopped, no count yet" until the first poll
+            self._seq = 0
+            HEADER.pack_into(self._map, 0, MAGIC, VERSION, self._seq)
+            self.publish({}, STATE_STOPPED)
+
+    def publish(self, snapshot: dict, state=STATE_RUNNING):
+        """Write a MonitorCore.snapshot() dict."""
+        path = (snapshot.get("executable_path") or "").encode("utf-8")[:MAX_PATH_BYTES]
+        count = snapshot.get("count")
+        today_max = snapshot.get("today_max")
+        m = self._map
+        self._seq += 1
+        SEQ.pack_into(m, SEQ_OFFSET, self._seq)  # odd: readers retry until it is even again
+        PAYLOAD.pack_into(
+            m, PAYLOAD_OFFSET, time.time(), snapshot.get("polls") or 0,
+            -1 if count is None else count, -1 if today_max is None else today_max,
+            os.getpid(), state, (snapshot.get("date") or "").encode("ascii"),
+            len(path), path,
+        )
+        self._seq += 1
+        SEQ.pack_into(m, SEQ_OFFSET, self._seq)
+
+    def close(self, snapshot=None):
+        """Mark the snapshot stopped (keeping the last values) and unmap it."""
+        if self._map.closed:
+            return
+        if snapshot is not None:
+            self.publish(snapshot, STATE_STOPPED)
+        self._map.close()
+
+
+def open_publisher(path=None):
+    """Return a SnapshotPublisher, or None if the file can't be created (e.g. read-only folder)."""
+    try:
+        return SnapshotPublisher(path)
+    except OSError:
+        return None
@@ -0,0 +1,165 @@
+"""
+Reader for the monitor's shared-memory live snapshot.
+
+The running monitor (tray app or headless daemon) rewrites a small fixed-size
+file, `tally_counter.live` next to the database, after every poll. Other
+programs map it and read the latest count as often as they like: a read is a
+few memory loads from the mapping, with no system call, lock or IPC round
+trip, and never slows the writer down.
+
+Layout (little-endian, offsets in bytes):
+
+   0  4s    magic b'TCLV'
+   4  u32   layout version
+   8  u64   sequence: odd while the writer is mid-update
+  16  f64   timestamp of the poll (Unix seconds)
+  24  u64   polls since the monitor started
+  32  i32   instances running now (-1 before the first poll)
+  36  i32   today's maximum (-1 before the first poll)
+  40  u32   writer pid
+  44  u8    state: 1 running, 0 stopped
+  45  10s   date of today's maximum, 'YYYY-MM-DD' (ASCII)
+  55  u16   length of the executable path
+  57  1024s executable path (UTF-8)
+
+Consistency comes from the sequence number (a seqlock): the writer makes it
+odd, writes the fields, then makes it even again. A reader copies the fields
+between two reads of the sequence and retries if it was odd or moved.
+
+Depends only on the standard library, so it can be copied into other tools.
+
+Usage:
+  python live_reader.py [PATH] [--watch SECONDS]
+"""
+
+import mmap
+import os
+import struct
+import sys
+import time
+
+FILE_NAME = "tally_counter.live"
+MAGIC = b"TCLV"
+VERSION = 1
+MAX_PATH_BYTES = 1024
+
+HEADER = struct.Struct("<4sIQ")
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 8
+PAYLOAD = struct.Struct(f"<dQiiIB10sH{MAX_PATH_BYTES}s")
+PAYLOAD_OFFSET = HEADER.size
+SIZE = HEADER.size + PAYLOAD.size
+
+STATE_STOPPED, STATE_RUNNING = 0, 1
+
+
+class NoSnapshot(Exception):
+    """The snapshot file does not exist or was not written by a compatible monitor."""
+
+
+def default_path():
+    """The snapshot file of the default data directory."""
+    data_dir = os.environ.get("TALLYCOUNTER_DATA_DIR")
+    if not data_dir:
+        try:
+            from database import get_data_dir
+        except ImportError:
+            raise NoSnapshot("pass the path to tally_counter.live") from None
+        data_dir = get_data_dir()
+    return os.path.join(data_dir, FILE_NAME)
+
+
+def decode(payload: bytes) -> dict:
+    (timestamp, polls, count, today_max, pid, state,
+     day, path_len, path) = PAYLOAD.unpack(payload)
+    return {
+        "timestamp": timestamp,
+        "polls": polls,
+        "count": count if count >= 0 else None,
+        "today_max": today_max if today_max >= 0 else None,
+        "pid": pid,
+        "running": state == STATE_RUNNING,
+        "date": day.decode("ascii").rstrip("\0") or None,
+        "executable_path": path[:path_len].decode("utf-8", "replace"),
+    }
+
+
+class SnapshotReader:
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        try:
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), SIZE, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            # ValueError: the file is shorter than the layout (never written)
+            raise NoSnapshot(f"{self.path}: {e}") from e
+        magic, version, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise NoSnapshot(f"{self.path}: not a version {VERSION} snapshot")
+
+    def sequence(self) -> int:
+        """The current sequence number; it changes with every publish."""
+        return SEQ.unpack_from(self._map, SEQ_OFFSET)[0]
+
+    def read(self, retries=1000) -> dict:
+        """Return a consistent copy of the latest snapshot, with its sequence number."""
+        m = self._map
+        for _ in range(retries):
+            before = SEQ.unpack_from(m, SEQ_OFFSET)[0]
+            if before & 1:
+                continue  # the writer is mid-update
+            payload = m[PAYLOAD_OFFSET:SIZE]
+            if SEQ.unpack_from(m, SEQ_OFFSET)[0] == before:
+                snapshot = decode(payload)
+                snapshot["seq"] = before
+                return snapshot
+        raise RuntimeError("the snapshot kept changing while being read")
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read(path=None) -> dict:
+    """One-shot read of the latest snapshot."""
+    with SnapshotReader(path) as reader:
+        return reader.read()
+
+
+def main(argv=None) -> int:
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description="Print the live Tally Counter snapshot.")
+    parser.add_argument("path", nargs="?", help=f"Path to {FILE_NAME}")
+    parser.add_argument("--watch", type=float, metavar="SECONDS",
+                        help="Keep printing whenever the snapshot changes")
+    args = parser.parse_args(argv)
+    try:
+        reader = SnapshotReader(args.path)
+    except NoSnapshot as e:
+        print(e, file=sys.stderr)
+        return 1
+    with reader:
+        print(json.dumps(reader.read()), flush=True)
+        if args.watch:
+            seq = reader.sequence()
+            try:
+                while True:
+                    time.sleep(args.watch)
+                    if reader.sequence() != seq:
+                        snapshot = reader.read()
+                        seq = snapshot["seq"]
+                        print(json.dumps(snapshot), flush=True)
+            except KeyboardInterrupt:
+                pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,70 @@
+import time
+_IMPORTED = time.perf_counter()  # reference point for the startup timings
+
 import sys
 import os
-from PyQt6.QtWidgets import QApplication, QSystemTrayIcon, QMenu
-from PyQt6.QtGui import QIcon, QAction
-from PyQt6.QtCore import QTimer
+import multiprocessing
+
+if __name__ == "__main__":
+    # Lets the frozen .exe act as the out-of-process scanner child
+    multiprocessing.freeze_support()
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "--cli":
+    # Dispatch before any Qt import so CLI queries never load PyQt6
+    import cli
+    sys.exit(cli.main(sys.argv[2:]))
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "--headless":
+    # Monitor-only daemon: same loop and database, no Qt stack
+    import headless
+    sys.exit(headless.main(sys.argv[2:]))
+
+from PyQt6.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QFileDialog
+from PyQt6.QtGui import QIcon, QAction, QActionGroup
+from PyQt6.QtCore import QTimer, Qt, QObject, pyqtSignal
 from database import Database
-from config_window import ConfigWindow
-from dashboard_window import DashboardWindow
 from monitor import ProcessMonitor
+from scheduler import ExportScheduler, SCHEDULES
 import startup
+from single_instance import InstanceLock, IpcServer, NoInstance, request
+
+def _process_age():
+    """Seconds since this process was launched."""
+    if sys.platform.startswith('linux'):
+        # psutil's create_time() is only as precise as the whole-second boot time
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    import psutil  # only after the tray is up
+    return time.time() - psutil.Process().create_time()
+
+class _IpcBridge(QObject):
+    """Carries IPC requests from the server thread to the GUI thread."""
+    show_requested = pyqtSignal()
+    poll_requested = pyqtSignal()
 
 class TallyCounterApp:
-    def __init__(self):
+    def __init__(self, source=None, clock=None):
         self.app = QApplication(sys.argv)
+        # Process source and clock for the in-process monitor; None means the
+        # live process table and wall clock (benchmarks/soak.py injects fakes)
+        self.source = source
+        self.clock = clock
         self.app.setQuitOnLastWindowClosed(False)
 
         self.db = Database()
+        # Windows are built on first use; only the tray and the monitor start eagerly
         self.config_window = None
-        self.dashboard_window = DashboardWindow()
+        self.diagnostics_window = None
+        self.dashboard_window = None
         self.monitor = None
+        self.last_count = None
+        self.startup_timings = {}
+        self.ipc_bridge = _IpcBridge()
+        self.ipc_bridge.show_requested.connect(self.show_dashboard)
+        self.ipc_bridge.poll_requested.connect(self.force_poll)
 
         # Keep a persistent reference to the tray icon
         self._tray_icon_ref = self.create_icon()
@@ -30,23 +77,70 @@ class TallyCounterApp:
         self.action_startup = QAction("Start with Windows")
         self.action_startup.setCheckable(True)
         self.action_startup.setChecked(startup.is_startup_enabled())
+        self.action_scanner_process = QAction("Scan in Separate Process")
+        self.action_scanner_process.setCheckable(True)
+        self.action_scanner_process.setChecked(self.db.get_config("scanner_mode") == "process")
+        self.action_diagnostics = QAction("Diagnostics")
+        # Hidden unless Shift is held while the menu opens (or profiling is on)
+        self.action_profile = QAction("Profiling")
+        self.action_profile.setCheckable(True)
+        self.action_profile.setVisible(False)
         self.action_exit = QAction("Exit")
 
+        # Scheduled export submenu: Off / Daily / Weekly / Monthly + folder picker
+        self.schedule_menu = QMenu("Scheduled Export")
+        self.schedule_group = QActionGroup(self.schedule_menu)
+        current_schedule = self.db.get_config("export_schedule") or ""
+        for schedule in ("",) + SCHEDULES:
+            action = QAction(schedule.capitalize() or "Off", self.schedule_group)
+            action.setCheckable(True)
+            action.setChecked(schedule == current_schedule)
+            action.setData(schedule)
+            self.schedule_menu.addAction(action)
+        self.schedule_group.triggered.connect(self.on_schedule_selected)
+        self.schedule_menu.addSeparator()
+        self.action_export_dir = QAction("Choose Export Folder…")
+        self.action_export_dir.triggered.connect(self.choose_export_dir)
+        self.schedule_menu.addAction(self.action_export_dir)
+
         self.action_open.triggered.connect(self.show_dashboard)
         self.action_config.triggered.connect(self.show_config_window)
         self.action_startup.triggered.connect(self.toggle_startup)
+        self.action_scanner_process.triggered.connect(self.toggle_scanner_process)
+        self.action_diagnostics.triggered.connect(self.show_diagnostics)
+        self.action_profile.triggered.connect(self.toggle_profiling)
         self.action_exit.triggered.connect(self.exit_app)
 
         self.tray_menu.addAction(self.action_open)
         self.tray_menu.addAction(self.action_config)
         self.tray_menu.addAction(self.action_startup)
+        self.tray_menu.addMenu(self.schedule_menu)
+        self.tray_menu.addAction(self.action_scanner_process)
+        self.tray_menu.addAction(self.action_diagnostics)
+        self.tray_menu.addAction(self.action_profile)
         self.tray_menu.addSeparator()
         self.tray_menu.addAction(self.action_exit)
 
+        self.tray_menu.aboutToShow.connect(self.on_tray_menu_about_to_show)
         self.tray_icon.setContextMenu(self.tray_menu)
         self.tray_icon.activated.connect(self.on_tray_icon_activated)
         self.tray_icon.show()
 
+        self.scheduler = ExportScheduler()
+        self.scheduler.start()
+
+        self.profiler = None
+        self._profile_timer = QTimer()
+        self._profile_timer.setInterval(1000)
+        if os.environ.get("TALLYCOUNTER_PROFILE"):
+            import profiling
+            interval = profiling.env_interval()
+            if interval:
+                self.start_profiling(interval)
+
+        self._tray_shown_wall = time.time()
+        self._record_startup("startup_tray_ms")
+
         # Ensure the tray icon stays visible and config window pops up if needed
         QTimer.singleShot(0, self.check_initial_configuration)
 
@@ -61,7 +155,11 @@ class TallyCounterApp:
         else:
             return QIcon.fromTheme("system-run")
 
+    def _record_startup(self, key):
+        self.startup_timings[key] = round((time.perf_counter() - _IMPORTED) * 1000, 1)
+
     def check_initial_configuration(self):
+        self._record_startup("startup_event_loop_ms")
         executable_path = self.db.get_config('executable_path')
         if not executable_path:
             self.show_config_window()
@@ -70,33 +168,138 @@ class TallyCounterApp:
 
     def show_config_window(self):
         if not self.config_window:
-            self.config_window = ConfigWindow()
+            from config_window import ConfigWindow
+            self.config_window = ConfigWindow(scanner_provider=self.monitor_scanner)
             self.config_window.configuration_saved.connect(self.on_configuration_saved)
         self.config_window.show()
 
+    def monitor_scanner(self):
+        return self.monitor.scanner() if self.monitor is not None else None
+
     def on_configuration_saved(self, executable_path):
         self.start_monitoring(executable_path)
         self.show_dashboard()
 
     def start_monitoring(self, executable_path):
-        if self.monitor:
-            self.monitor.stop()
-        self.monitor = ProcessMonitor(executable_path)
-        self.monitor.worker.instance_count_updated.connect(self.dashboard_window.update_live_counts)
-        self.monitor.worker.error.connect(self.handle_monitor_error)
-        self.dashboard_window.refresh_requested.connect(self.monitor.worker.force_poll)
-        self.monitor.start()
-        self.dashboard_window.load_heatmap_data()
+        if self.monitor is None:
+            out_of_process = self.db.get_config("scanner_mode") == "process"
+            self.monitor = ProcessMonitor(out_of_process, self.source, self.clock)
+            self.monitor.instance_count_updated.connect(self.on_instance_count_updated)
+            self.monitor.error.connect(self.handle_monitor_error)
+            self.monitor.alert.connect(self.show_alert)
+        # Retargets the running monitor in place; only the first call starts a thread
+        self.monitor.set_targets(executable_path)
+        self._sync_core()
+        if self.dashboard_window:
+            self.dashboard_window.load_heatmap_data()
+
+    def on_instance_count_updated(self, count):
+        if self.last_count is None:
+            self._record_startup("startup_first_count_ms")
+            self._sync_core()
+            if os.environ.get("TALLYCOUNTER_STARTUP_PROBE"):
+                QTimer.singleShot(0, self._finish_startup_probe)
+        self.last_count = count
+        if self.dashboard_window:
+            self.dashboard_window.update_live_counts(count)
+
+    def _finish_startup_probe(self):
+        """For benchmarks/bench_startup.py: time the dashboard, write the timings and quit."""
+        import json
+        loaded = sorted(sys.modules)
+        self.show_dashboard()
+        self.app.processEvents()  # first paint
+        self._record_startup("startup_dashboard_ms")
+        with open(os.environ["TALLYCOUNTER_STARTUP_PROBE"], "w", encoding="utf-8") as f:
+            json.dump(dict(self.startup_timings, modules_at_first_count=loaded), f)
+        self.exit_app()
 
     def handle_monitor_error(self, error_message):
         print(f"Monitoring Error: {error_message}")
-        self.dashboard_window.current_count_label.setText("Err")
+        if self.dashboard_window:
+            self.dashboard_window.current_count_label.setText("Err")
+
+    def show_alert(self, message):
+        self.tray_icon.showMessage("Tally Counter alert", message,
+                                   QSystemTrayIcon.MessageIcon.Warning)
+
+    def ensure_dashboard(self):
+        """Return the dashboard, building it (and importing its modules) on first use."""
+        if self.dashboard_window is None:
+            from dashboard_window import DashboardWindow
+            self.dashboard_window = DashboardWindow()
+            self.dashboard_window.refresh_requested.connect(self.force_poll)
+            if self.last_count is not None:
+                self.dashboard_window.update_live_counts(self.last_count)
+        return self.dashboard_window
 
     def show_dashboard(self):
-        self.dashboard_window.load_heatmap_data()
-        self.dashboard_window.show()
-        self.dashboard_window.raise_()
-        self.dashboard_window.activateWindow()
+        dashboard = self.ensure_dashboard()
+        dashboard.load_heatmap_data()
+        dashboard.show()
+        dashboard.raise_()
+        dashboard.activateWindow()
+
+    def show_diagnostics(self):
+        if not self.diagnostics_window:
+            from diagnostics_window import DiagnosticsWindow
+            self.diagnostics_window = DiagnosticsWindow(
+                lambda: self.monitor.worker.core.diagnostics
+                if self.monitor and self.monitor.worker else None
+            )
+        self.diagnostics_window.show()
+        self.diagnostics_window.raise_()
+        self.diagnostics_window.activateWindow()
+
+    def on_tray_menu_about_to_show(self):
+        shift = bool(QApplication.keyboardModifiers() & Qt.KeyboardModifier.ShiftModifier)
+        self.action_profile.setVisible(shift or self.profiler is not None)
+
+    def toggle_profiling(self, checked: bool):
+        if checked:
+            self.start_profiling()
+        else:
+            self.stop_profiling()
+
+    def start_profiling(self, interval=None):
+        import profiling
+        if interval is None:
+            interval = float(self.db.get_config("profile_interval") or profiling.DEFAULT_INTERVAL)
+        self.profiler = profiling.Profiler(interval=interval)
+        self.profiler.start()
+        self._profile_timer.timeout.connect(self.profiler.ui_tick)
+        self._profile_timer.start()
+        self._sync_core()
+        self.action_profile.setChecked(True)
+        self.action_profile.setVisible(True)
+        self.tray_icon.setToolTip(f"Tally Counter — profiling to {self.profiler.out_dir}")
+
+    def stop_profiling(self):
+        if self.profiler is None:
+            return
+        self._profile_timer.stop()
+        self._profile_timer.timeout.disconnect()
+        self.profiler.stop()
+        self.profiler = None
+        self.action_profile.setChecked(False)
+        self.tray_icon.setToolTip("Tally Counter")
+
+    def _sync_core(self):
+        """Hand the profiler and startup timings to the current monitor core."""
+        core = self.monitor.worker.core if self.monitor and self.monitor.worker else None
+        if core is None:
+            return
+        if "startup_process_ms" not in self.startup_timings:
+            # Includes interpreter start-up and everything before main.py ran
+            since_tray = time.time() - self._tray_shown_wall
+            self.startup_timings["startup_process_ms"] = round(
+                (_process_age() - since_tray) * 1000, 1)
+        core.diagnostics.extra.update(self.startup_timings)
+        # Only the in-process MonitorCore polls on this side; the child process
+        # of "Scan in Separate Process" is not profiled. Once stopped, the old
+        # profiler stays attached until the next poll has flushed its stats.
+        if hasattr(core, "profiler") and self.profiler is not None:
+            core.profiler = self.profiler
 
     def toggle_startup(self, checked: bool):
         if checked:
@@ -104,6 +307,55 @@ class TallyCounterApp:
         else:
             startup.disable_startup()
 
+    def toggle_scanner_process(self, checked: bool):
+        self.db.set_config("scanner_mode", "process" if checked else "thread")
+        if self.monitor:
+            self.monitor.set_out_of_process(checked)
+            self._sync_core()
+
+    def on_schedule_selected(self, action):
+        schedule = action.data()
+        if schedule and not self.db.get_config("export_dir"):
+            if not self.choose_export_dir():
+                # No folder chosen: fall back to the previous setting
+                previous = self.db.get_config("export_schedule") or ""
+                for a in self.schedule_group.actions():
+                    a.setChecked(a.data() == previous)
+                return
+        self.db.set_config("export_schedule", schedule)
+        self.scheduler.wake()
+
+    def choose_export_dir(self) -> bool:
+        folder = QFileDialog.getExistingDirectory(
+            None, "Scheduled Export Folder", self.db.get_config("export_dir") or ""
+        )
+        if not folder:
+            return False
+        self.db.set_config("export_dir", folder)
+        self.scheduler.wake()
+        return True
+
+    def force_poll(self):
+        if self.monitor:
+            self.monitor.force_poll()
+
+    def ipc_handlers(self):
+        """Commands answered for a second launch or the CLI (called on the IPC thread)."""
+        def core():
+            if not (self.monitor and self.monitor.worker):
+                raise RuntimeError("monitoring is not running")
+            return self.monitor.worker.core
+
+        def snapshot():
+            return dict(core().snapshot(), mode="tray", pid=os.getpid())
+
+        return {
+            "show": self.ipc_bridge.show_requested.emit,
+            "poll": self.ipc_bridge.poll_requested.emit,
+            "snapshot": snapshot,
+            "diagnostics": lambda: core().diagnostics.summary(),
+        }
+
     def on_tray_icon_activated(self, reason):
         if reason == QSystemTrayIcon.ActivationReason.Trigger:
             self.show_dashboard()
@@ -114,12 +366,30 @@ class TallyCounterApp:
     def exit_app(self):
         if self.monitor:
             self.monitor.stop()
+        if self.profiler is not None:
+            self.profiler.flush_worker()
+            self.stop_profiling()
+        self.scheduler.stop()
         self.tray_icon.hide()
         self.app.quit()
 
 def main():
+    lock = InstanceLock()
+    if not lock.acquire():
+        # Already running (e.g. auto-start plus a manual launch): surface it and leave
+        try:
+            request("show")
+        except (NoInstance, RuntimeError) as e:
+            print(f"Tally Counter is already running ({e})", file=sys.stderr)
+        return
     app = TallyCounterApp()
-    app.run()
+    server = IpcServer(app.ipc_handlers())
+    server.start()
+    try:
+        app.run()
+    finally:
+        server.stop()
+        lock.release()
 
 if __name__ == "__main__":
     main()
@@ -1,131 +1,111 @@
-import psutil
-import os
-import sys
-import threading
 from datetime import datetime
 from PyQt6.QtCore import QObject, QThread, pyqtSignal
-from database import Database
+from alerts import AlertEngine
+from live_publisher import open_publisher
+from monitor_core import MonitorCore
+from scanner_process import OutOfProcessMonitor
 
 
 
 class MonitorWorker(QObject):
+    """Qt adapter that re-emits MonitorCore callbacks as signals.
+
+    With out_of_process=True the scan runs in a child process and this thread
+    only waits on its pipe, keeping the GUI free of GIL contention.
+    """
     instance_count_updated = pyqtSignal(int)
     error = pyqtSignal(str)
+    alert = pyqtSignal(str)
 
-    def __init__(self, executable_path):
+    def __init__(self, executable_path, out_of_process=False, source=None, clock=None):
         super().__init__()
-        self.executable_path = executable_path
-        self.executable_name = os.path.basename(executable_path)
-        self._is_running = True
-        self._stop_event = threading.Event()
-        self.db = Database()
+        if out_of_process:
+            self.core = OutOfProcessMonitor(executable_path)
+        else:
+            self.core = MonitorCore(executable_path, source=source, clock=clock or datetime.now,
+                                    publisher=open_publisher(), alerts=AlertEngine())
+        self.core.add_count_listener(self.instance_count_updated.emit)
+        self.core.add_error_listener(self.error.emit)
+        self.core.add_alert_listener(self.alert.emit)
 
     def run(self):
-        if not os.path.exists(self.executable_path):
-            self.error.emit(f"Error: Executable not found at '{self.executable_path}'")
-            return
-
-        last_count = -1
-        while self._is_running:
-            try:
-                count = self._count_instances()
-                if count != last_count:
-                    last_count = count
-                    today_str = datetime.now().strftime('%Y-%m-%d')
-                    self.db.update_daily_max(today_str, count)
-                    self.instance_count_updated.emit(count)
-            except Exception as e:
-                self.error.emit(str(e))
-            # Check every 5 seconds so the UI reacts quickly when instances start/stop.
-            # Wakes immediately if stop() is called.
-            self._stop_event.wait(timeout=5)
-            self._stop_event.clear()
-
-    def _same_exe(self, path_a: str, path_b: str) -> bool:
-        """Return True if two paths refer to the same file, with a name-only fallback."""
-        try:
-            return os.path.samefile(path_a, path_b)
-        except (FileNotFoundError, OSError):
-            # Fallback: compare just the filenames (handles Store/UWP apps whose
-            # actual exe path differs from what was saved in config, e.g. Notepad on Win11)
-            return os.path.basename(path_a).lower() == os.path.basename(path_b).lower()
-
-    def _count_instances(self) -> int:
-        """Count the number of top-level running instances of the monitored executable."""
-        main_pids = set()
-        name_lower = self.executable_name.lower()
-
-        for proc in psutil.process_iter(['pid', 'ppid', 'name', 'exe']):
-            try:
-                proc_name = proc.info['name']
-                proc_exe  = proc.info['exe']
-
-                # Match by name first (fast check)
-                if sys.platform == 'win32':
-                    if proc_name.lower() != name_lower:
-                        continue
-                else:
-                    if proc_name != self.executable_name:
-                        continue
-
-                # Match by path if available; fall back to name-only match for
-                # Store/UWP apps (e.g. Notepad on Windows 11) where the exe path
-                # differs from the path stored in config.
-                if proc_exe and not self._same_exe(proc_exe, self.executable_path):
-                    continue
-
-                # Exclude child processes whose parent is the same executable
-                # (handles multi-process apps like Chrome, Electron, etc.)
-                parent_is_same = False
-                ppid = proc.info['ppid']
-                if ppid:
-                    try:
-                        parent = psutil.Process(ppid)
-                        parent_name = parent.name()
-                        if sys.platform == 'win32':
-                            parent_is_same = parent_name.lower() == name_lower
-                        else:
-                            parent_is_same = parent_name == self.executable_name
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        pass
-
-                if not parent_is_same:
-                    main_pids.add(proc.info['pid'])
-
-            except (psutil.NoSuchProcess, psutil.AccessDenied, FileNotFoundError):
-                continue
-
-        return len(main_pids)
+        self.core.run()
 
     def force_poll(self):
         """Trigger an immediate count without waiting for the next 5-second tick."""
-        self._stop_event.set()
+        self.core.force_poll()
 
     def stop(self):
-        self._is_running = False
-        self._stop_event.set()  # Wake up the sleeping thread immediately
+        self.core.stop()
+
+class ProcessMonitor(QObject):
+    """Long-lived monitor service: one thread and worker, retargeted in place.
 
-class ProcessMonitor:
-    def __init__(self, executable_path):
+    Connect to its signals once; set_targets() and force_poll() are safe to
+    call from the GUI thread at any time. Only switching between in-process
+    and out-of-process scanning rebuilds the worker.
+    """
+    instance_count_updated = pyqtSignal(int)
+    error = pyqtSignal(str)
+    alert = pyqtSignal(str)
+
+    def __init__(self, out_of_process=False, source=None, clock=None):
+        super().__init__()
+        self.out_of_process = out_of_process
+        self.source = source
+        self.clock = clock
+        self.executable_path = None
+        self.thread = None
+        self.worker = None
+
+    def _start_worker(self):
         self.thread = QThread()
-        self.worker = MonitorWorker(executable_path)
+        self.worker = MonitorWorker(self.executable_path, self.out_of_process, self.source, self.clock)
         self.worker.moveToThread(self.thread)
-
         self.thread.started.connect(self.worker.run)
-        self.worker.instance_count_updated.connect(self.on_instance_count_updated)
-        self.worker.error.connect(self.on_error)
-
-    def start(self):
+        self.worker.instance_count_updated.connect(self.instance_count_updated)
+        self.worker.error.connect(self.error)
+        self.worker.alert.connect(self.alert)
         self.thread.start()
 
-    def stop(self):
+    def _stop_worker(self):
+        if self.worker is None:
+            return
         self.worker.stop()
         self.thread.quit()
         self.thread.wait(3000)  # Wait max 3 seconds then force stop
+        self.worker.instance_count_updated.disconnect(self.instance_count_updated)
+        self.worker.error.disconnect(self.error)
+        self.worker.alert.disconnect(self.alert)
+        self.thread = self.worker = None
 
-    def on_instance_count_updated(self, count):
-        pass
+    def set_targets(self, executable_path):
+        """Count executable_path from the next poll on, starting the worker on first use."""
+        self.executable_path = executable_path
+        if self.worker is None:
+            self._start_worker()
+        else:
+            # Direct call: the worker's thread is busy in its loop, so a queued slot would never run
+            self.worker.core.set_targets(executable_path)
+
+    def set_out_of_process(self, out_of_process):
+        if out_of_process == self.out_of_process:
+            return
+        self.out_of_process = out_of_process
+        if self.worker is not None:
+            self._stop_worker()
+            self._start_worker()
+
+    def force_poll(self):
+        """Trigger an immediate count; called directly, as the worker's event loop never runs."""
+        if self.worker is not None:
+            self.worker.core.force_poll()
 
-    def on_error(self, err_msg):
-        pass
+    def scanner(self):
+        """The in-process InstanceScanner, whose last process table others may reuse; else None."""
+        if self.worker is None or self.out_of_process:
+            return None
+        return self.worker.core.scanner
 
+    def stop(self):
+        self._stop_worker()
@@ -0,0 +1,204 @@
+"""
+Qt-free monitoring loop: scan, aggregate into the daily maximum, persist.
+
+Observers register plain callables instead of connecting to Qt signals, so the
+same loop drives the tray app (through the thin QObject adapter in monitor.py)
+and the headless daemon, which never imports PyQt6.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from database import Database
+from diagnostics import MonitorDiagnostics, PollRecord
+from scanner import InstanceScanner
+
+POLL_INTERVAL = 5  # seconds between scans
+
+
+class MonitorCore:
+    def __init__(self, executable_path, db=None, clock=datetime.now, source=None, publisher=None,
+                 alerts=None):
+        self.executable_path = executable_path
+        self.executable_name = os.path.basename(executable_path)
+        self.db = db if db is not None else Database()
+        self.clock = clock
+        self.scanner = InstanceScanner(source)
+        self.diagnostics = MonitorDiagnostics()
+        self.profiler = None  # profiling.Profiler while on-demand profiling is in use
+        self.publisher = publisher  # live_publisher.SnapshotPublisher, only in the lock holder
+        self.alerts = alerts  # alerts.AlertEngine, likewise: a one-off CLI poll never fires hooks
+        self.poll_interval = POLL_INTERVAL
+        self.last_count = -1
+        self.last_date = None
+        self.today_max = 0
+        self.group_max = {}  # (dimension, name) -> today's maximum, per user / session / container
+        self._is_running = True
+        self._stop_event = threading.Event()
+        self._target_lock = threading.Lock()
+        self._pending_target = None
+        self._checked_path = None  # target whose existence tick() last checked
+        self._target_missing = False
+        self._count_listeners = []
+        self._error_listeners = []
+        self._alert_listeners = []
+        if alerts is not None:
+            alerts.add_listener(self._notify_alert)
+
+    def add_count_listener(self, callback):
+        """Call callback(count) whenever the instance count changes."""
+        self._count_listeners.append(callback)
+
+    def add_error_listener(self, callback):
+        """Call callback(message) when a scan fails or the executable is missing."""
+        self._error_listeners.append(callback)
+
+    def add_alert_listener(self, callback):
+        """Call callback(message) when an alert rule fires."""
+        self._alert_listeners.append(callback)
+
+    def _notify_error(self, message):
+        for callback in self._error_listeners:
+            callback(message)
+
+    def _notify_alert(self, message):
+        for callback in self._alert_listeners:
+            callback(message)
+
+    def set_targets(self, executable_path):
+        """Switch to counting another executable; thread-safe, applied before the next poll.
+
+        The scanner and its caches are kept, so retargeting costs nothing but
+        the next scan.
+        """
+        with self._target_lock:
+            self._pending_target = executable_path
+        self._stop_event.set()  # poll the new target right away
+
+    def _apply_pending_target(self):
+        with self._target_lock:
+            executable_path, self._pending_target = self._pending_target, None
+        if executable_path is None:
+            return
+        self.executable_path = executable_path
+        self.executable_name = os.path.basename(executable_path)
+        # Start over as on a fresh start: re-read today's row and re-announce the count
+        self.last_count = -1
+        self.last_date = None
+        self._checked_path = None  # check existence again, even when the path is unchanged
+        if self.alerts is not None:
+            self.alerts.reset()  # windows measured against the old target don't carry over
+
+    def poll_once(self):
+        """Scan once, persist a new daily maximum and notify if the count changed; return the count."""
+        if self._pending_target is not None:
+            self._apply_pending_target()
+        started = time.perf_counter()
+        count = self.scanner.count(self.executable_path)
+        now = self.clock()
+        today_str = now.strftime('%Y-%m-%d')
+        db_write_ms = 0.0
+        if today_str != self.last_date:
+            # First poll of a new day: record it even if the count is unchanged,
+            # otherwise instances running across midnight never reach the new day
+            write_start = time.perf_counter()
+            self.last_date = today_str
+            self.db.update_daily_max(today_str, count)
+            rows = self.db.get_counts_for_range(today_str, today_str)
+            self.today_max = rows[0][1] if rows else count
+            self.group_max = {(dimension, name): peak for dimension, name, peak
+                              in self.db.get_group_counts_for_date(today_str)}
+            db_write_ms = (time.perf_counter() - write_start) * 1000
+        elif count > self.today_max:
+            # Only a new daily high needs a write; drops can't change the max
+            write_start = time.perf_counter()
+            self.today_max = count
+            self.db.update_daily_max(today_str, count)
+            db_write_ms = (time.perf_counter() - write_start) * 1000
+        # Same for the per-user / session / container maxima: write only the ones that rose
+        group_max = self.group_max
+        raised = [(dimension, name, n) for dimension, names in self.scanner.last_groups.items()
+                  for name, n in names.items() if n > group_max.get((dimension, name), 0)]
+        if raised:
+            write_start = time.perf_counter()
+            self.db.update_group_daily_maxes(today_str, raised)
+            for dimension, name, n in raised:
+                group_max[(dimension, name)] = n
+            db_write_ms += (time.perf_counter() - write_start) * 1000
+        emits = 0
+        if count != self.last_count:
+            self.last_count = count
+            for callback in self._count_listeners:
+                callback(count)
+            emits = len(self._count_listeners)
+        alert_ms = 0.0
+        if self.alerts is not None:
+            alert_start = time.perf_counter()
+            self.alerts.reload(self.db)
+            self.alerts.evaluate(now, count, self.today_max)
+            alert_ms = (time.perf_counter() - alert_start) * 1000
+
+        scanner = self.scanner
+        self.diagnostics.record(PollRecord(
+            time.time(), (time.perf_counter() - started) * 1000,
+            scanner.processes, scanner.name_matches, scanner.exe_resolutions,
+            scanner.samefile_calls, db_write_ms, emits, alert_ms,
+        ))
+        if self.publisher is not None:
+            self.publisher.publish(self.snapshot())
+        return count
+
+    def snapshot(self) -> dict:
+        """Live state for IPC queries: target, current count and today's max."""
+        return {
+            "executable_path": self.executable_path,
+            "count": self.last_count if self.last_count >= 0 else None,
+            "date": self.last_date,
+            "today_max": self.today_max if self.last_date else None,
+            "polls": self.diagnostics.total_polls,
+            "groups": self.scanner.last_groups,
+        }
+
+    def tick(self):
+        """One iteration of run(): poll, unless the target executable does not exist."""
+        if self._pending_target is not None:
+            self._apply_pending_target()
+        if self.executable_path != self._checked_path:
+            # Checked once per target; set_targets() is the way out of a missing one
+            self._checked_path = self.executable_path
+            self._target_missing = not os.path.exists(self.executable_path)
+            if self._target_missing:
+                self._notify_error(f"Error: Executable not found at '{self.executable_path}'")
+        if self._target_missing:
+            return
+        try:
+            if self.profiler is None:
+                self.poll_once()
+            else:
+                self.profiler.run_poll(self.poll_once)
+        except Exception as e:
+            self._notify_error(str(e))
+
+    def run(self):
+        while self._is_running:
+            self.tick()
+            # Check every 5 seconds so the UI reacts quickly when instances start/stop.
+            # Wakes immediately if stop() is called.
+            self._stop_event.wait(timeout=self.poll_interval)
+            self._stop_event.clear()
+        self.close_publisher()
+
+    def close_publisher(self):
+        """Mark the live snapshot stopped; call once the loop has ended."""
+        if self.publisher is not None:
+            self.publisher.close(self.snapshot())
+            self.publisher = None
+
+    def force_poll(self):
+        """Trigger an immediate count without waiting for the next 5-second tick."""
+        self._stop_event.set()
+
+    def stop(self):
+        self._is_running = False
+        self._stop_event.set()  # Wake up the sleeping thread immediately
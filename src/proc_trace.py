@@ -0,0 +1,235 @@
+"""
+Process-table trace recording and replay.
+
+A trace is a gzip-compressed JSON Lines file. The first line is a header, and
+each following line is one snapshot stored as a delta against the previous one:
+
+  {"version": 1, "interval": 5}
+  {"t": 1760000000.0, "add": [[pid, ppid, name, exe], ...], "del": [pid, ...]}
+
+Recording on a live machine:
+  python proc_trace.py record -o day.trace.gz [--interval 5] [--duration 86400]
+
+Replaying drives MonitorCore + Database through the trace with a simulated
+clock, as fast as the scan allows, and checks the persisted daily maxima:
+  python proc_trace.py replay day.trace.gz --exe /path/to/app [--db replay.db]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from process_source import ProcessGone, ProcessSource, default_source
+
+TRACE_VERSION = 1
+
+
+class TraceWriter:
+    def __init__(self, path, interval):
+        self._f = gzip.open(path, "wt", encoding="utf-8")
+        self._f.write(json.dumps({"version": TRACE_VERSION, "interval": interval}) + "\n")
+        self._prev = {}  # pid -> (ppid, name, exe)
+        self.snapshots = 0
+
+    def write_snapshot(self, t, procs):
+        """Append a snapshot; procs maps pid -> (ppid, name, exe)."""
+        prev = self._prev
+        added = [[pid, *entry] for pid, entry in procs.items() if prev.get(pid) != entry]
+        removed = [pid for pid in prev if pid not in procs]
+        self._f.write(json.dumps({"t": t, "add": added, "del": removed},
+                                 separators=(",", ":")) + "\n")
+        self._prev = procs
+        self.snapshots += 1
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record(path, interval=5.0, duration=None, source=None):
+    """Snapshot the live process table every `interval` seconds into path."""
+    source = source if source is not None else default_source()
+    exes = {}  # (pid, ppid, name) -> exe, so each process is resolved once
+    deadline = time.time() + duration if duration else None
+    with TraceWriter(path, interval) as writer:
+        try:
+            while deadline is None or time.time() < deadline:
+                t = time.time()
+                procs = {}
+                for pid, (ppid, name) in source.scan().items():
+                    key = (pid, ppid, name)
+                    if key not in exes:
+                        try:
+                            exes[key] = source.exe(pid)
+                        except ProcessGone:
+                            continue
+                    procs[pid] = (ppid, name, exes[key])
+                # Drop cached exes for processes that have gone
+                for key in [k for k in exes if k[0] not in procs]:
+                    del exes[key]
+                writer.write_snapshot(t, procs)
+                time.sleep(max(0.0, interval - (time.time() - t)))
+        except KeyboardInterrupt:
+            pass
+        return writer.snapshots
+
+
+class TraceSource(ProcessSource):
+    """ProcessSource that serves one recorded snapshot per advance()."""
+
+    def __init__(self, path):
+        self._f = gzip.open(path, "rt", encoding="utf-8")
+        header = json.loads(self._f.readline())
+        if header.get("version") != TRACE_VERSION:
+            raise ValueError(f"Unsupported trace version: {header.get('version')}")
+        self.interval = header.get("interval", 5)
+        self._procs = {}
+        self.time = None
+
+    def advance(self):
+        """Move to the next snapshot; return its timestamp, or None at the end."""
+        line = self._f.readline()
+        if not line:
+            return None
+        record = json.loads(line)
+        procs = self._procs
+        for pid in record["del"]:
+            procs.pop(pid, None)
+        for pid, ppid, name, exe in record["add"]:
+            procs[pid] = (ppid, name, exe)
+        self.time = record["t"]
+        return self.time
+
+    def scan(self):
+        return {pid: (ppid, name) for pid, (ppid, name, _) in self._procs.items()}
+
+    def exe(self, pid):
+        entry = self._procs.get(pid)
+        if entry is None:
+            raise ProcessGone(pid)
+        return entry[2]
+
+    def close(self):
+        self._f.close()
+
+
+class _CountingDatabase:
+    """Wraps a Database and counts update_daily_max calls."""
+
+    def __init__(self, db):
+        self._db = db
+        self.writes = 0
+
+    def update_daily_max(self, date, count):
+        self.writes += 1
+        self._db.update_daily_max(date, count)
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+
+def replay(path, executable_path, db):
+    """
+    Drive MonitorCore through a trace with a simulated clock.
+
+    Returns a dict with the number of polls, database writes, count changes,
+    simulated and wall-clock seconds, the per-day maxima observed during replay
+    and any days where the database disagrees with them.
+    """
+    from monitor_core import MonitorCore
+
+    source = TraceSource(path)
+    sim = {"now": None}
+    counting_db = _CountingDatabase(db)
+    core = MonitorCore(executable_path, db=counting_db,
+                       clock=lambda: datetime.fromtimestamp(sim["now"]), source=source)
+    changes = []
+    core.add_count_listener(changes.append)
+
+    observed = {}
+    polls = 0
+    first_t = last_t = None
+    wall_start = time.perf_counter()
+    try:
+        while True:
+            t = source.advance()
+            if t is None:
+                break
+            sim["now"] = t
+            first_t = t if first_t is None else first_t
+            last_t = t
+            count = core.poll_once()
+            day = datetime.fromtimestamp(t).strftime('%Y-%m-%d')
+            observed[day] = max(observed.get(day, 0), count)
+            polls += 1
+    finally:
+        source.close()
+    wall = time.perf_counter() - wall_start
+
+    stored = {}
+    if observed:
+        stored = dict(db.get_counts_for_range(min(observed), max(observed)))
+    mismatches = {day: (expected, stored.get(day)) for day, expected in observed.items()
+                  if stored.get(day) != expected}
+    simulated = (last_t - first_t) if polls else 0.0
+    return {
+        "polls": polls,
+        "writes": counting_db.writes,
+        "count_changes": len(changes),
+        "simulated_seconds": simulated,
+        "wall_seconds": wall,
+        "speedup": simulated / wall if wall else float("inf"),
+        "daily_max": observed,
+        "mismatches": mismatches,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Record or replay process-table traces.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("record", help="Record the live process table")
+    p.add_argument("-o", "--output", required=True)
+    p.add_argument("--interval", type=float, default=5.0)
+    p.add_argument("--duration", type=float, help="Seconds to record (default: until Ctrl+C)")
+
+    p = sub.add_parser("replay", help="Replay a trace through the monitor")
+    p.add_argument("trace")
+    p.add_argument("--exe", required=True, help="Executable to count")
+    p.add_argument("--db", help="Database file (default: a temporary one)")
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        n = record(args.output, args.interval, args.duration)
+        print(f"Recorded {n} snapshots to {args.output}")
+        return 0
+
+    from database import Database
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="tally_replay_"), "replay.db")
+    db = Database(db_path)
+    try:
+        result = replay(args.trace, args.exe, db)
+    finally:
+        db.close()
+    print(f"Replayed {result['polls']} polls ({result['simulated_seconds'] / 3600:.1f} simulated h) "
+          f"in {result['wall_seconds']:.2f} s — {result['speedup']:.0f}x real time")
+    print(f"DB writes: {result['writes']}, count changes: {result['count_changes']}")
+    for day, peak in sorted(result["daily_max"].items()):
+        print(f"  {day}  {peak}")
+    if result["mismatches"]:
+        print(f"MISMATCH: {result['mismatches']}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
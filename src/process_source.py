@@ -0,0 +1,316 @@
+"""
+Process-table sources for the scanner.
+
+A source takes a cheap snapshot of every process (pid -> (ppid, name)) and
+resolves the executable path, owner and container lazily, only for the pids
+the scanner asks about.
+
+  ProcFsProcessSource  Linux: reads /proc/<pid>/stat directly and only calls
+                       readlink on /proc/<pid>/exe for name matches
+  PsutilProcessSource  Everywhere else, via psutil.process_iter
+
+scan() is only called by one thread at a time (under InstanceScanner.lock),
+but exe(), memory() and owner() may run on another thread while it does, so
+a scan swaps in new dicts and prunes its caches from a copy of their keys.
+
+Neither imports Qt.
+"""
+
+import os
+import re
+import sys
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+_NO_SESSION = "4294967295"  # /proc/<pid>/sessionid of a process outside any login session
+
+HOST = "(host)"  # container() of a process that runs outside any container
+# Docker, containerd, CRI-O, Podman and Kubernetes all name a container's
+# cgroup after its 64-hex id (…/docker-<id>.scope, …/kubepods/…/<id>); LXC after its name
+_CONTAINER_ID_RE = re.compile(r"(?<![0-9a-f])([0-9a-f]{64})(?![0-9a-f])")
+_LXC_RE = re.compile(r"(?:^|/)(?:lxc\.payload\.|lxc/)([^/]+)")
+
+
+def container_from_cgroup(text: str) -> str:
+    """Container of a /proc/<pid>/cgroup file: a short id, an LXC name, or HOST."""
+    for line in text.splitlines():
+        path = line.split(":", 2)[-1]
+        ids = _CONTAINER_ID_RE.findall(path)
+        if ids:
+            return ids[-1][:12]  # the innermost, shortened as `docker ps` shows it
+        lxc = _LXC_RE.search(path)
+        if lxc:
+            return lxc.group(1)
+    return HOST
+
+
+class ProcessGone(Exception):
+    """The process exited, or its pid was reused, since the snapshot was taken."""
+
+
+class ProcessSource:
+    # Longest process name the source reports; longer names arrive truncated
+    # (Linux comm is limited to 15 bytes). None means names are complete.
+    name_limit = None
+
+    def scan(self) -> dict:
+        """Return {pid: (ppid, name)} for every visible process."""
+        raise NotImplementedError
+
+    def exe(self, pid: int):
+        """Return the executable path of pid from the last scan, or None if it can't be read.
+
+        Raises ProcessGone if the process has exited or the pid now belongs to
+        a different process.
+        """
+        raise NotImplementedError
+
+    def memory(self, pid: int):
+        """Return the resident set size of pid in bytes, or None if it can't be read."""
+        return None
+
+    def owner(self, pid: int):
+        """Return (user, session) of pid from the last scan; either may be None if unknown.
+
+        session is the login or terminal-services session, as a string.
+        """
+        return None, None
+
+    def container(self, pid: int):
+        """Return the container pid runs in, HOST outside any, or None where containers aren't tracked."""
+        return None
+
+
+class PsutilProcessSource(ProcessSource):
+    def __init__(self):
+        import psutil
+        self._psutil = psutil
+        self._procs = {}        # pid -> psutil.Process; its .info holds the create_time
+        self._exe_cache = {}    # pid -> (create_time, exe) kept across scans
+        self._owners = {}       # pid -> (create_time, (user, session)) kept across scans
+        try:
+            import win32ts
+            self._session_id = win32ts.ProcessIdToSessionId
+        except ImportError:
+            self._session_id = None
+
+    def scan(self) -> dict:
+        table = {}
+        procs = {}
+        for proc in self._psutil.process_iter(['pid', 'ppid', 'name', 'create_time']):
+            info = proc.info
+            if info['name'] is None:
+                continue
+            table[info['pid']] = (info['ppid'] or 0, info['name'])
+            procs[info['pid']] = proc
+        self._procs = procs
+        # Forget cached answers for processes that are gone or whose pid was reused
+        for cache in (self._exe_cache, self._owners):
+            for pid in list(cache):
+                entry = cache.get(pid)
+                proc = procs.get(pid)
+                if entry is not None and (proc is None or entry[0] != proc.info['create_time']):
+                    cache.pop(pid, None)
+        return table
+
+    def exe(self, pid: int):
+        proc = self._procs.get(pid)
+        if proc is None:
+            raise ProcessGone(pid)
+        start = proc.info['create_time']  # with the pid, identifies the process
+        cached = self._exe_cache.get(pid)
+        if cached is not None and start is not None and cached[0] == start:
+            return cached[1]
+        try:
+            # psutil.Process remembers its create time, so a reused pid is
+            # reported as NoSuchProcess rather than answering for the new one
+            if not proc.is_running():
+                raise ProcessGone(pid)
+            exe = proc.exe() or None
+        except self._psutil.NoSuchProcess:
+            raise ProcessGone(pid)
+        except (self._psutil.AccessDenied, OSError):
+            exe = None
+        if start is not None:
+            self._exe_cache[pid] = (start, exe)
+        return exe
+
+    def memory(self, pid: int):
+        proc = self._procs.get(pid)
+        if proc is None:
+            return None
+        try:
+            return proc.memory_info().rss
+        except (self._psutil.Error, OSError):
+            return None
+
+    def owner(self, pid: int):
+        proc = self._procs.get(pid)
+        if proc is None:
+            return None, None
+        start = proc.info['create_time']
+        cached = self._owners.get(pid)
+        if cached is not None and start is not None and cached[0] == start:
+            return cached[1]
+        try:
+            user = proc.username() or None
+        except (self._psutil.Error, OSError):
+            user = None
+        session = None
+        try:
+            if self._session_id is not None:
+                session = str(self._session_id(pid))
+            elif hasattr(proc, "terminal"):
+                terminal = proc.terminal()
+                if terminal:
+                    session = terminal[5:] if terminal.startswith("/dev/") else terminal
+        except Exception:
+            session = None  # pywin32 raises its own error type when access is denied
+        if start is not None:
+            self._owners[pid] = (start, (user, session))
+        return user, session
+
+
+class ProcFsProcessSource(ProcessSource):
+    name_limit = 15
+
+    def __init__(self, root='/proc'):
+        self.root = root
+        self._start_times = {}   # pid -> starttime from the last scan
+        self._exe_cache = {}     # pid -> (starttime, exe) kept across scans
+        self._owner_cache = {}   # pid -> (starttime, (user, session)) kept across scans
+        self._container_cache = {}  # pid -> (starttime, container) kept across scans
+        self._user_names = {}    # uid -> user name
+
+    def _read_stat(self, pid):
+        """Return (ppid, comm, starttime, state) from /proc/<pid>/stat."""
+        with open(f"{self.root}/{pid}/stat", 'rb') as f:
+            data = f.read()
+        # comm is wrapped in parentheses and may itself contain spaces or ')'
+        open_paren = data.index(b'(')
+        close_paren = data.rindex(b')')
+        comm = data[open_paren + 1:close_paren].decode('utf-8', 'replace')
+        fields = data[close_paren + 2:].split()
+        # fields[0] is state, [1] ppid, ... [19] starttime (stat field 22)
+        return int(fields[1]), comm, int(fields[19]), fields[0]
+
+    def scan(self) -> dict:
+        table = {}
+        start_times = {}
+        with os.scandir(self.root) as it:
+            for entry in it:
+                name = entry.name
+                if not name.isdigit():
+                    continue
+                pid = int(name)
+                try:
+                    ppid, comm, start, state = self._read_stat(pid)
+                except (OSError, ValueError, IndexError):
+                    continue  # vanished mid-scan, or unreadable
+                if state in (b'Z', b'X'):
+                    continue  # exited, waiting to be reaped: not a running instance
+                table[pid] = (ppid, comm)
+                start_times[pid] = start
+        self._start_times = start_times
+        # Forget cached exes of processes that are no longer running
+        for cache in (self._exe_cache, self._owner_cache, self._container_cache):
+            for pid in [p for p in list(cache) if p not in start_times]:
+                cache.pop(pid, None)
+        return table
+
+    def exe(self, pid: int):
+        start = self._start_times.get(pid)
+        if start is None:
+            raise ProcessGone(pid)
+        cached = self._exe_cache.get(pid)
+        if cached is not None and cached[0] == start:
+            return cached[1]
+        try:
+            exe = os.readlink(f"{self.root}/{pid}/exe")
+        except (FileNotFoundError, ProcessLookupError):
+            raise ProcessGone(pid)
+        except OSError:
+            exe = None  # permission denied or kernel thread: no exe to compare
+        # The readlink happened after the snapshot: make sure it was answered
+        # by the same process and not by a newcomer that reused the pid.
+        try:
+            if self._read_stat(pid)[2] != start:
+                raise ProcessGone(pid)
+        except (OSError, ValueError, IndexError):
+            raise ProcessGone(pid)
+        if exe and exe.endswith(' (deleted)'):
+            exe = exe[:-len(' (deleted)')]
+        self._exe_cache[pid] = (start, exe)
+        return exe
+
+    def memory(self, pid: int):
+        try:
+            with open(f"{self.root}/{pid}/statm", 'rb') as f:
+                resident_pages = int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            return None
+        return resident_pages * _PAGE_SIZE
+
+    def _user_name(self, uid):
+        name = self._user_names.get(uid)
+        if name is None:
+            try:
+                import pwd
+                name = pwd.getpwuid(uid).pw_name
+            except (ImportError, KeyError):
+                name = str(uid)  # no passwd entry, e.g. a uid mapped in from a container
+            self._user_names[uid] = name
+        return name
+
+    def owner(self, pid: int):
+        start = self._start_times.get(pid)
+        if start is None:
+            return None, None
+        cached = self._owner_cache.get(pid)
+        if cached is not None and cached[0] == start:
+            return cached[1]
+        try:
+            user = self._user_name(os.stat(f"{self.root}/{pid}").st_uid)
+        except OSError:
+            return None, None
+        # The audit login session: one per SSH / console / xrdp login, shared by its children
+        try:
+            with open(f"{self.root}/{pid}/sessionid", 'rb') as f:
+                session = f.read().strip().decode('ascii') or None
+        except (OSError, ValueError):
+            session = None
+        if session == _NO_SESSION:
+            session = None
+        try:
+            if self._read_stat(pid)[2] != start:
+                return None, None  # the pid was reused after the snapshot
+        except (OSError, ValueError, IndexError):
+            return None, None
+        self._owner_cache[pid] = (start, (user, session))
+        return user, session
+
+    def container(self, pid: int):
+        start = self._start_times.get(pid)
+        if start is None:
+            return None
+        cached = self._container_cache.get(pid)
+        if cached is not None and cached[0] == start:
+            return cached[1]
+        try:
+            with open(f"{self.root}/{pid}/cgroup", 'rb') as f:
+                container = container_from_cgroup(f.read().decode('utf-8', 'replace'))
+        except OSError:
+            return None
+        try:
+            if self._read_stat(pid)[2] != start:
+                return None  # the pid was reused after the snapshot
+        except (OSError, ValueError, IndexError):
+            return None
+        self._container_cache[pid] = (start, container)
+        return container
+
+
+def default_source() -> ProcessSource:
+    """Return the fastest source available on this platform."""
+    if sys.platform.startswith('linux') and os.path.isdir('/proc/self'):
+        return ProcFsProcessSource()
+    return PsutilProcessSource()
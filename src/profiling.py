@@ -0,0 +1,195 @@
+"""
+On-demand profiling for a running instance.
+
+Enabled with the TALLYCOUNTER_PROFILE environment variable (its value, if a
+number, is the dump interval in seconds) or from the tray's hidden Profiling
+action (hold Shift while opening the tray menu). While active it collects:
+
+  worker-<time>.prof   cProfile of MonitorCore polls
+  ui-<time>.prof       cProfile of everything the Qt UI thread runs in Python
+  alloc-<time>.txt     tracemalloc diff against the previous interval
+
+into a `profiles` folder next to the database, keeping the newest few of each.
+The .prof files open with `python -m pstats`, snakeviz, etc.
+
+When profiling is off nothing here is imported by the monitor loop and no
+profiler or tracer is installed.
+"""
+
+import cProfile
+import glob
+import os
+import threading
+import time
+import tracemalloc
+from database import get_data_dir
+
+ENV_VAR = "TALLYCOUNTER_PROFILE"
+DEFAULT_INTERVAL = 300  # seconds between dumps
+DEFAULT_KEEP = 6        # files kept per kind
+TRACE_FRAMES = 10
+TOP_ALLOCATIONS = 40
+
+
+def env_interval():
+    """Return the dump interval requested through the environment, or None if profiling is off.
+
+    TALLYCOUNTER_PROFILE=1 (or any non-numeric value) uses the default
+    interval; a number above 1 is the interval in seconds; 0 or unset is off.
+    """
+    value = os.environ.get(ENV_VAR, "").strip()
+    if not value or value == "0":
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        return DEFAULT_INTERVAL
+    return seconds if seconds > 1 else DEFAULT_INTERVAL
+
+
+def _take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+
+
+def profiles_dir():
+    return os.path.join(get_data_dir(), "profiles")
+
+
+class _ThreadProfile:
+    """A cProfile.Profile used only by the thread that owns it, dumped and replaced every interval."""
+
+    def __init__(self, profiler, kind):
+        self._profiler = profiler
+        self.kind = kind
+        self.profile = cProfile.Profile()
+        self.next_dump = time.monotonic() + profiler.interval
+
+    def due(self):
+        return time.monotonic() >= self.next_dump
+
+    def rotate(self):
+        """Write the collected stats and start a fresh profile. Call from the owning thread."""
+        old, self.profile = self.profile, cProfile.Profile()
+        self.next_dump = time.monotonic() + self._profiler.interval
+        old.dump_stats(self._profiler.output_path(self.kind, ".prof"))
+
+
+class Profiler:
+    def __init__(self, out_dir=None, interval=DEFAULT_INTERVAL, keep=DEFAULT_KEEP):
+        self.out_dir = out_dir or profiles_dir()
+        self.interval = interval
+        self.keep = keep
+        self.active = False
+        self._worker = None
+        self._ui = None
+        self._ui_enabled = False
+        self._snapshot = None
+        self._owns_tracemalloc = False
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def output_path(self, kind, ext):
+        """Return a new timestamped path for kind, deleting the oldest files beyond keep."""
+        with self._lock:
+            os.makedirs(self.out_dir, exist_ok=True)
+            existing = sorted(glob.glob(os.path.join(self.out_dir, f"{kind}-*{ext}")))
+            for path in existing[:max(0, len(existing) - self.keep + 1)]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._seq += 1  # keeps two dumps within one second apart
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            return os.path.join(self.out_dir, f"{kind}-{stamp}-{self._seq:04d}{ext}")
+
+    def start(self):
+        """Start collecting. Call from the UI thread, then call ui_tick() regularly from it."""
+        if self.active:
+            return
+        self._worker = _ThreadProfile(self, "worker")
+        self._ui = _ThreadProfile(self, "ui")
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            self._owns_tracemalloc = True
+        self._snapshot = _take_snapshot()
+        self.active = True
+
+    def stop(self):
+        """Stop collecting and write the UI profile and allocation diff. Call from the UI thread.
+
+        The worker profile is written by the monitor thread on its next poll.
+        """
+        if not self.active:
+            return
+        self.active = False
+        self.ui_tick(final=True)
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+        self._snapshot = None
+
+    def flush_worker(self):
+        """Write the worker profile now. Only safe once the monitor thread has stopped."""
+        worker, self._worker = self._worker, None
+        if worker is not None:
+            worker.rotate()
+
+    # ── Worker thread ──────────────────────────────────────────────────────────
+
+    def run_poll(self, poll):
+        """Run one monitor poll under the worker profile (called on the monitor thread)."""
+        worker = self._worker
+        if worker is None:
+            return poll()
+        if not self.active:
+            # Stopped since the last poll: flush what was collected, from this thread
+            self._worker = None
+            worker.rotate()
+            return poll()
+        try:
+            result = worker.profile.runcall(poll)
+        except ValueError:
+            # Python 3.12+ allows one active cProfile per process; if the UI
+            # profile holds it, this poll runs unprofiled
+            return poll()
+        if worker.due():
+            worker.rotate()
+        return result
+
+    # ── UI thread ──────────────────────────────────────────────────────────────
+
+    def ui_tick(self, final=False):
+        """Keep the UI profile running and dump it (plus an allocation diff) when due."""
+        ui = self._ui
+        if ui is None:
+            return
+        if final or ui.due():
+            if self._ui_enabled:
+                ui.profile.disable()
+                self._ui_enabled = False
+            ui.rotate()
+            self._write_allocation_diff()
+        if self.active and not self._ui_enabled:
+            try:
+                ui.profile.enable()
+                self._ui_enabled = True
+            except ValueError:
+                pass  # another profiler is active (Python 3.12+)
+        if final:
+            self._ui = None
+
+    def _write_allocation_diff(self):
+        if self._snapshot is None or not tracemalloc.is_tracing():
+            return
+        snapshot = _take_snapshot()
+        stats = snapshot.compare_to(self._snapshot, "lineno")
+        self._snapshot = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        with open(self.output_path("alloc", ".txt"), "w", encoding="utf-8") as f:
+            f.write(f"traced: {current / 1024:.0f} KiB, peak {peak / 1024:.0f} KiB\n")
+            f.write(f"top {TOP_ALLOCATIONS} changes since the previous dump:\n\n")
+            for stat in stats[:TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
@@ -0,0 +1,185 @@
+"""
+Process scanning for the monitored executable.
+
+Kept free of any Qt import so the command-line interface can count instances
+without loading PyQt6.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from process_source import ProcessGone, default_source
+
+# One executable in the running-process overview. instances counts top-level
+# processes (as count() does), processes includes their helpers.
+RunningApp = namedtuple("RunningApp", ["exe", "name", "instances", "processes", "rss"])
+
+# Breakdowns of each count() by owner and, on Linux, by container. A session is
+# named "user #id" so that session ids, which are only unique per host, still
+# say whose they are.
+DIMENSIONS = ("user", "session", "container")
+UNKNOWN_USER = "(unknown)"
+
+
+def same_exe(path_a: str, path_b: str) -> bool:
+    """Return True if two paths refer to the same file, with a name-only fallback."""
+    try:
+        return os.path.samefile(path_a, path_b)
+    except (FileNotFoundError, OSError):
+        # Fallback: compare just the filenames (handles Store/UWP apps whose
+        # actual exe path differs from what was saved in config, e.g. Notepad on Win11)
+        return os.path.basename(path_a).lower() == os.path.basename(path_b).lower()
+
+
+class InstanceScanner:
+    """Counts top-level instances using a ProcessSource, keeping its caches between scans."""
+
+    def __init__(self, source=None):
+        self.source = source if source is not None else default_source()
+        # Counters for the most recent count(), read by the diagnostics
+        self.processes = 0
+        self.name_matches = 0
+        self.exe_resolutions = 0
+        self.samefile_calls = 0
+        # {dimension: {name: instances}} for the most recent count()
+        self.last_groups = {dimension: {} for dimension in DIMENSIONS}
+        # The last process table and when it was taken, shared with running_apps()
+        self.last_table = None
+        self.last_scan = 0.0
+        # Serializes scans: count() runs on the monitor thread, running_apps() on a UI loader thread
+        self.lock = threading.Lock()
+
+    def _name_matcher(self, executable_name):
+        fold = sys.platform == 'win32'
+        target = executable_name.lower() if fold else executable_name
+        limit = self.source.name_limit
+        truncated = target[:limit] if limit and len(target) > limit else None
+
+        def matches(name):
+            if fold:
+                name = name.lower()
+            return name == target or (truncated is not None and name == truncated)
+        return matches, truncated is not None
+
+    def _scan(self):
+        table = self.source.scan()
+        self.last_table = table
+        self.last_scan = time.monotonic()
+        return table
+
+    def count(self, executable_path: str) -> int:
+        """Count the number of top-level running instances of the executable."""
+        with self.lock:
+            return self._count(executable_path)
+
+    def _count(self, executable_path: str) -> int:
+        executable_name = os.path.basename(executable_path)
+        matches, name_truncated = self._name_matcher(executable_name)
+        source = self.source
+        table = self._scan()
+        main_pids = set()
+        name_matches = exe_resolutions = samefile_calls = 0
+
+        for pid, (ppid, name) in table.items():
+            # Match by name first (fast check)
+            if not matches(name):
+                continue
+            name_matches += 1
+
+            # Match by path if available; fall back to name-only match for
+            # Store/UWP apps (e.g. Notepad on Windows 11) where the exe path
+            # differs from the path stored in config.
+            exe_resolutions += 1
+            try:
+                proc_exe = source.exe(pid)
+            except ProcessGone:
+                continue
+            if proc_exe:
+                samefile_calls += 1
+                if not same_exe(proc_exe, executable_path):
+                    continue
+            elif name_truncated:
+                continue  # a truncated name alone is too weak a match
+
+            # Exclude child processes whose parent is the same executable
+            # (handles multi-process apps like Chrome, Electron, etc.)
+            parent = table.get(ppid) if ppid else None
+            if parent is None or not matches(parent[1]):
+                main_pids.add(pid)
+
+        self.processes = len(table)
+        self.name_matches = name_matches
+        self.exe_resolutions = exe_resolutions
+        self.samefile_calls = samefile_calls
+        self.last_groups = self._group(main_pids)
+        return len(main_pids)
+
+    def _group(self, main_pids):
+        """Split the matched instances by owner and container, looking up only these pids."""
+        users = {}
+        sessions = {}
+        containers = {}
+        source = self.source
+        for pid in main_pids:
+            user, session = source.owner(pid)
+            user = user or UNKNOWN_USER
+            users[user] = users.get(user, 0) + 1
+            if session is not None:
+                key = f"{user} #{session}"
+                sessions[key] = sessions.get(key, 0) + 1
+            container = source.container(pid)
+            if container is not None:
+                containers[container] = containers.get(container, 0) + 1
+        return {"user": users, "session": sessions, "container": containers}
+
+    def running_apps(self, max_age=None):
+        """Group every running process by executable, largest memory first.
+
+        Reuses the process table of the last count() if it is at most max_age
+        seconds old, so asking while the monitor is running costs no extra
+        scan; otherwise takes a new snapshot.
+
+        Only taking the table holds the lock: resolving every pid happens
+        outside it, so the monitor's count() is never held up by the walk.
+        """
+        with self.lock:
+            table = self.last_table
+            if table is None or max_age is None or time.monotonic() - self.last_scan > max_age:
+                table = self._scan()
+        # A scan builds a new dict, so this one is never modified from here on
+        source = self.source
+        exes = {}
+        for pid in table:
+            try:
+                exe = source.exe(pid)
+            except ProcessGone:
+                continue
+            if exe:
+                exes[pid] = exe
+        groups = {}  # normalized exe -> [exe, instances, processes, rss]
+        for pid, exe in exes.items():
+            key = os.path.normcase(exe)
+            group = groups.setdefault(key, [exe, 0, 0, 0])
+            group[2] += 1
+            group[3] += source.memory(pid) or 0
+            # Top-level unless the parent runs the same executable
+            parent_exe = exes.get(table[pid][0])
+            if parent_exe is None or os.path.normcase(parent_exe) != key:
+                group[1] += 1
+        apps = [RunningApp(exe, os.path.basename(exe), instances, processes, rss)
+                for exe, instances, processes, rss in groups.values()]
+        apps.sort(key=lambda app: (-app.rss, app.name.lower()))
+        return apps
+
+
+_default_scanner = None
+
+
+def count_instances(executable_path: str) -> int:
+    """Count top-level instances with a shared scanner for the default source."""
+    global _default_scanner
+    if _default_scanner is None:
+        _default_scanner = InstanceScanner()
+    return _default_scanner.count(executable_path)
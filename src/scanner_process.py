@@ -0,0 +1,233 @@
+"""
+Out-of-process scanner.
+
+Runs MonitorCore (scan + persist) in a child process so the pure-Python scan
+loop never competes with the GUI thread for the GIL. The child streams compact
+messages back over a multiprocessing pipe:
+
+  b'C' + json    count, date, today's max and per-user / session / container
+                 counts, sent when any of them changed
+  b'E' + utf-8   error message
+  b'A' + utf-8   alert rule fired
+  b'D' + struct  diagnostics PollRecord for one poll
+
+and accepts b'P' (poll now), b'T' + utf-8 (switch target executable) and
+b'S' (stop) from the parent. If the child dies
+it is restarted automatically with exponential backoff.
+
+The child also publishes the live snapshot (live_publisher.py), so readers
+see today's maximum even in this mode.
+
+OutOfProcessMonitor exposes the same listener API as MonitorCore, so the Qt
+adapter can drive either one.
+"""
+
+import json
+import multiprocessing
+import struct
+import threading
+import time
+from diagnostics import MonitorDiagnostics, PollRecord
+from monitor_core import MonitorCore, POLL_INTERVAL
+
+_COUNT = b'C'
+_ERROR = b'E'
+_ALERT = b'A'
+_DIAG = b'D'
+_DIAG_STRUCT = struct.Struct('<ddiiiidid')  # matches PollRecord's fields
+_POLL = b'P'
+_TARGET = b'T'
+_STOP = b'S'
+
+RESTART_BACKOFF_MIN = 1    # seconds
+RESTART_BACKOFF_MAX = 30
+
+
+class _PipeDiagnostics:
+    """Stands in for MonitorDiagnostics in the child, forwarding each record to the parent."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.total_polls = 0  # for MonitorCore.snapshot() in the child
+
+    def record(self, record):
+        self.total_polls += 1
+        self._conn.send_bytes(_DIAG + _DIAG_STRUCT.pack(*record))
+
+
+def _child_main(conn, executable_path, db_name, poll_interval, source_factory):
+    """Entry point of the scanner process."""
+    from database import Database
+    from live_publisher import open_publisher
+    from alerts import AlertEngine
+    source = source_factory() if source_factory is not None else None
+    core = MonitorCore(executable_path, db=Database(db_name), source=source,
+                       publisher=open_publisher(), alerts=AlertEngine())
+    announce = []  # set by the count listener, so re-announced counts are forwarded too
+    core.add_count_listener(announce.append)
+    core.add_error_listener(lambda message: conn.send_bytes(_ERROR + message.encode('utf-8')))
+    core.add_alert_listener(lambda message: conn.send_bytes(_ALERT + message.encode('utf-8')))
+    core.diagnostics = _PipeDiagnostics(conn)
+    sent = None
+    try:
+        while True:
+            core.tick()
+            snapshot = core.snapshot()
+            state = {key: snapshot[key] for key in ("count", "date", "today_max", "groups")}
+            if announce or state != sent:
+                message = dict(state, changed=bool(announce))
+                announce.clear()
+                sent = state
+                conn.send_bytes(_COUNT + json.dumps(message).encode('utf-8'))
+            # Sleep until the next tick, waking early for commands
+            if conn.poll(poll_interval):
+                command = conn.recv_bytes()
+                if command == _STOP:
+                    break
+                if command[:1] == _TARGET:
+                    core.set_targets(command[1:].decode('utf-8'))
+    except (EOFError, OSError):
+        pass  # parent went away
+    finally:
+        core.close_publisher()
+        core.db.close()
+        conn.close()
+
+
+class OutOfProcessMonitor:
+    def __init__(self, executable_path, db_name='tally_counter.db',
+                 poll_interval=POLL_INTERVAL, source_factory=None):
+        self.executable_path = executable_path
+        self.db_name = db_name
+        self.poll_interval = poll_interval
+        self.source_factory = source_factory
+        self.restarts = 0
+        self.last_count = None
+        self.last_date = None
+        self.today_max = None
+        self.last_groups = None
+        self.diagnostics = MonitorDiagnostics()
+        self._ctx = multiprocessing.get_context('spawn')  # never fork a Qt process
+        self._is_running = True
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._conn = None
+        self._process = None
+        self._count_listeners = []
+        self._error_listeners = []
+        self._alert_listeners = []
+
+    def add_count_listener(self, callback):
+        self._count_listeners.append(callback)
+
+    def add_error_listener(self, callback):
+        self._error_listeners.append(callback)
+
+    def add_alert_listener(self, callback):
+        self._alert_listeners.append(callback)
+
+    def _notify_error(self, message):
+        for callback in self._error_listeners:
+            callback(message)
+
+    def _spawn(self):
+        """Start a scanner child; return False instead if stop() has been called."""
+        # Checked and started under the lock, so stop() either prevents the spawn
+        # or sees the new child and stops it
+        with self._lock:
+            if not self._is_running:
+                return False
+            parent_conn, child_conn = self._ctx.Pipe()
+            process = self._ctx.Process(
+                target=_child_main, name="TallyCounterScanner", daemon=True,
+                args=(child_conn, self.executable_path, self.db_name,
+                      self.poll_interval, self.source_factory),
+            )
+            process.start()
+            child_conn.close()  # so recv() sees EOF when the child dies
+            self._conn, self._process = parent_conn, process
+        return True
+
+    def run(self):
+        """Supervise the scanner process until stop(); blocks the calling thread."""
+        backoff = RESTART_BACKOFF_MIN
+        while self._spawn():
+            started = time.monotonic()
+            try:
+                while True:
+                    message = self._conn.recv_bytes()  # blocks without holding the GIL
+                    kind, payload = message[:1], message[1:]
+                    if kind == _COUNT:
+                        state = json.loads(payload)
+                        self.last_date = state["date"]
+                        self.today_max = state["today_max"]
+                        self.last_groups = state["groups"]
+                        if state["changed"]:
+                            count = self.last_count = state["count"]
+                            for callback in self._count_listeners:
+                                callback(count)
+                    elif kind == _DIAG:
+                        self.diagnostics.record(PollRecord(*_DIAG_STRUCT.unpack(payload)))
+                    elif kind == _ERROR:
+                        self._notify_error(payload.decode('utf-8', 'replace'))
+                    elif kind == _ALERT:
+                        for callback in self._alert_listeners:
+                            callback(payload.decode('utf-8', 'replace'))
+            except (EOFError, OSError):
+                pass
+            self._process.join(1)
+            exit_code = self._process.exitcode
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+            if not self._is_running:
+                break
+            if exit_code == 0:
+                break  # clean exit after a stop command
+            self.restarts += 1
+            self._notify_error(f"Scanner process exited ({exit_code}); restarting")
+            # Reset the backoff once a child has stayed up for a while
+            if time.monotonic() - started > RESTART_BACKOFF_MAX:
+                backoff = RESTART_BACKOFF_MIN
+            self._stop_event.wait(backoff)
+            backoff = min(backoff * 2, RESTART_BACKOFF_MAX)
+
+    def snapshot(self) -> dict:
+        """Same shape as MonitorCore.snapshot(), from the state the child last reported."""
+        return {
+            "executable_path": self.executable_path,
+            "count": self.last_count,
+            "date": self.last_date,
+            "today_max": self.today_max,
+            "polls": self.diagnostics.total_polls,
+            "groups": self.last_groups,
+        }
+
+    def _send(self, command):
+        with self._lock:
+            conn = self._conn
+        if conn is None:
+            return
+        try:
+            conn.send_bytes(command)
+        except (OSError, ValueError):
+            pass  # child is restarting; the next one polls on start anyway
+
+    def force_poll(self):
+        self._send(_POLL)
+
+    def set_targets(self, executable_path):
+        """Switch the child to another executable; a restarted child starts with it too."""
+        self.executable_path = executable_path
+        self._send(_TARGET + executable_path.encode('utf-8'))
+
+    def stop(self):
+        with self._lock:
+            self._is_running = False  # no child is spawned after this
+            process = self._process
+        self._stop_event.set()
+        self._send(_STOP)
+        if process is not None:
+            process.join(3)
+            if process.is_alive():
+                process.kill()
@@ -0,0 +1,130 @@
+"""
+Scheduled incremental exports.
+
+Writes closed days from daily_counts into one file per period (day, ISO week
+or month) in a configured directory, using the same format as a manual export.
+A high-water mark in the config table records the last day already written, so
+each run appends only new days and never re-reads exported history.
+
+Settings live in the config table:
+  export_schedule    'daily' | 'weekly' | 'monthly' (empty or missing = off)
+  export_dir         directory the files are written to
+  export_format      exporter format key, defaults to 'csv'
+  export_high_water  last date already exported ('YYYY-MM-DD')
+
+This module has no Qt dependency; the tray app and headless mode both run it
+on a background thread.
+"""
+
+import os
+import threading
+from itertools import groupby
+from datetime import date, datetime, timedelta
+from database import Database
+import exporter
+
+SCHEDULES = ("daily", "weekly", "monthly")
+CHECK_INTERVAL = 3600  # seconds between checks for a newly closed period
+
+
+def period_key(day: date, schedule: str) -> str:
+    """Return the label of the period containing day, used in the file name."""
+    if schedule == "daily":
+        return day.isoformat()
+    if schedule == "weekly":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return f"{day.year}-{day.month:02d}"
+
+
+def last_closed_day(today: date, schedule: str) -> date:
+    """Return the last day of the most recent period that has fully ended."""
+    if schedule == "daily":
+        return today - timedelta(days=1)
+    if schedule == "weekly":
+        return today - timedelta(days=today.isoweekday())  # previous Sunday
+    return today.replace(day=1) - timedelta(days=1)         # end of last month
+
+
+class ExportScheduler:
+    def __init__(self, db_name='tally_counter.db', clock=datetime.now):
+        self.db_name = db_name
+        self.clock = clock
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+
+    def run_once(self, db) -> int:
+        """Export every closed day past the high-water mark; return rows written."""
+        schedule = db.get_config("export_schedule") or ""
+        out_dir = db.get_config("export_dir") or ""
+        if schedule not in SCHEDULES or not out_dir:
+            return 0
+
+        cutoff = last_closed_day(self.clock().date(), schedule)
+        high_water = db.get_config("export_high_water")
+        if high_water:
+            start = date.fromisoformat(high_water) + timedelta(days=1)
+        else:
+            first, _ = db.get_data_extent()
+            if first is None:
+                return 0
+            start = date.fromisoformat(first)
+        if start > cutoff:
+            return 0
+
+        fmt = db.get_config("export_format") or "csv"
+        if fmt not in exporter.FORMATS:
+            fmt = "csv"
+        ext = exporter.FORMATS[fmt][1]
+        exe_path = db.get_config("executable_path") or ""
+        app_name = os.path.splitext(os.path.basename(exe_path))[0] if exe_path else "TallyCounter"
+        exe_name = os.path.basename(exe_path) if exe_path else "Unknown"
+        os.makedirs(out_dir, exist_ok=True)
+
+        written = 0
+        rows = db.iter_counts_for_range(start.isoformat(), cutoff.isoformat())
+        for period, group in groupby(rows, key=lambda r: period_key(date.fromisoformat(r[0]), schedule)):
+            group = list(group)  # at most one period's worth of days
+            path = os.path.join(out_dir, f"{app_name}_{period}{ext}")
+            is_new = not os.path.exists(path)
+            # Files rotate by period; an existing one is appended to without a new header
+            with exporter.open_output(path, fmt, append=True) as f:
+                written += exporter.write_rows(f, fmt, group, exe_name, header=is_new)
+            # Advance the mark per file so a crash mid-run never duplicates rows
+            db.set_config("export_high_water", group[-1][0])
+
+        db.set_config("export_high_water", cutoff.isoformat())
+        return written
+
+    # ── Background thread ──────────────────────────────────────────────────────
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ExportScheduler", daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        """Re-check immediately, e.g. after the schedule settings change."""
+        self._wake_event.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None:
+            self._thread.join(3)
+            self._thread = None
+
+    def _run(self):
+        # SQLite connections are per-thread, so the scheduler opens its own
+        db = Database(self.db_name)
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    self.run_once(db)
+                except Exception as e:
+                    print(f"Scheduled export error: {e}")
+                self._wake_event.wait(timeout=CHECK_INTERVAL)
+                self._wake_event.clear()
+        finally:
+            db.close()
@@ -0,0 +1,213 @@
+"""
+Single-instance lock and local IPC to the running monitor.
+
+The tray app and the headless daemon take an exclusive lock on a file next to
+the database, so only one monitor ever scans and writes `daily_counts`. The
+lock holder also listens on a local channel (a named pipe on Windows, a Unix
+domain socket elsewhere) via multiprocessing.connection. A second launch, or
+the CLI, sends it one JSON request per connection:
+
+  {"cmd": "show"}                      bring up the dashboard (tray only)
+  {"cmd": "poll"}                      count now instead of at the next tick
+  {"cmd": "snapshot"}                  live count, today's max, target, uptime
+  {"cmd": "diagnostics"}               the monitor's diagnostics summary
+
+and gets back {"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+Connections are authenticated with a random key that the server writes next
+to the lock, readable only by the current user. The Unix socket lives in
+$XDG_RUNTIME_DIR or the data directory, both private to the user; the shared
+temp directory is only used when neither can hold a short enough path.
+
+Qt-free, so the CLI can use it without loading PyQt6.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from database import get_data_dir
+
+LOCK_FILE = "tally_counter.lock"
+KEY_FILE = "tally_counter.key"
+SOCKET_FILE = "tally_counter.sock"
+REQUEST_TIMEOUT = 3.0  # seconds
+ACCEPT_BACKOFF = 1.0  # seconds between retries when accept() keeps failing
+MAX_SOCKET_PATH = 100  # AF_UNIX paths are limited to ~104-108 bytes
+
+
+class NoInstance(Exception):
+    """No running instance is reachable."""
+
+
+class InstanceLock:
+    """Exclusive, process-lifetime lock; released by the OS if the process dies."""
+
+    def __init__(self, data_dir=None):
+        self.path = os.path.join(data_dir or get_data_dir(), LOCK_FILE)
+        self._f = None
+
+    def acquire(self) -> bool:
+        f = open(self.path, "a+")
+        try:
+            if sys.platform == 'win32':
+                import msvcrt
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        self._f = f
+        return True
+
+    def release(self):
+        if self._f is not None:
+            self._f.close()  # closing the handle drops the lock
+            self._f = None
+
+
+def ipc_address(data_dir=None):
+    """Return the channel address, unique per data directory."""
+    data_dir = os.path.abspath(data_dir or get_data_dir())
+    tag = hashlib.sha1(data_dir.encode("utf-8")).hexdigest()[:12]
+    if sys.platform == 'win32':
+        return rf"\\.\pipe\TallyCounter-{tag}"
+    # Prefer directories only this user can write to; the shared temp dir is a last resort
+    candidates = [os.path.join(data_dir, SOCKET_FILE)]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        candidates.insert(0, os.path.join(runtime_dir, f"tallycounter-{tag}.sock"))
+    for path in candidates:
+        if len(path.encode("utf-8")) <= MAX_SOCKET_PATH:
+            return path
+    return os.path.join(tempfile.gettempdir(), f"tallycounter-{tag}.sock")
+
+
+def _key_path(data_dir=None):
+    return os.path.join(data_dir or get_data_dir(), KEY_FILE)
+
+
+class IpcServer:
+    """Answers requests on a background thread; handlers map a command name to a callable."""
+
+    def __init__(self, handlers, data_dir=None):
+        self.handlers = handlers
+        self.address = ipc_address(data_dir)
+        self._key_path = _key_path(data_dir)
+        self._authkey = os.urandom(32)
+        self._listener = None
+        self._thread = None
+        self._running = False
+
+    def start(self) -> bool:
+        """Start listening. Only call while holding the InstanceLock.
+
+        Returns False, with IPC disabled, if the channel cannot be set up;
+        the monitor keeps running without it.
+        """
+        try:
+            if sys.platform == 'win32':
+                self._listener = Listener(self.address, authkey=self._authkey)
+            else:
+                if os.path.lexists(self.address):
+                    os.remove(self.address)  # left behind by a crashed instance; the lock proves it
+                # Bind with a private umask so the socket is never reachable by others
+                old_umask = os.umask(0o077)
+                try:
+                    self._listener = Listener(self.address, authkey=self._authkey)
+                finally:
+                    os.umask(old_umask)
+        except OSError as e:
+            print(f"IPC disabled: cannot listen on {self.address} ({e})", file=sys.stderr)
+            return False
+        fd = os.open(self._key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(self._authkey)
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name="TallyCounterIpc", daemon=True)
+        self._thread.start()
+        return True
+
+    def _serve(self):
+        while self._running:
+            try:
+                conn = self._listener.accept()
+            except (AuthenticationError, EOFError, ConnectionError):
+                continue  # a client with a stale key, or one that hung up mid-handshake
+            except OSError as e:
+                if not self._running:
+                    break  # the listener was closed by stop()
+                # e.g. EMFILE: retrying at once would spin, so wait for things to settle
+                print(f"IPC accept failed: {e}", file=sys.stderr)
+                time.sleep(ACCEPT_BACKOFF)
+                continue
+            with conn:
+                try:
+                    if not conn.poll(REQUEST_TIMEOUT):
+                        continue
+                    request = json.loads(conn.recv_bytes())
+                    conn.send_bytes(json.dumps(self._dispatch(request)).encode("utf-8"))
+                except (EOFError, OSError, ValueError):
+                    continue
+
+    def _dispatch(self, request):
+        handler = self.handlers.get(request.get("cmd"))
+        if handler is None:
+            return {"ok": False, "error": f"unknown command: {request.get('cmd')}"}
+        try:
+            return {"ok": True, "result": handler(**request.get("args", {}))}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        try:
+            # Wake accept() so the thread sees _running is False
+            Client(self.address, authkey=self._authkey).close()
+        except OSError:
+            pass
+        self._thread.join(REQUEST_TIMEOUT)
+        self._listener.close()
+        for path in (self._key_path,) + ((self.address,) if sys.platform != 'win32' else ()):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def request(cmd, data_dir=None, **args):
+    """Send one command to the running instance and return its result.
+
+    Raises NoInstance if nothing is listening, RuntimeError if the instance
+    reports an error.
+    """
+    try:
+        with open(_key_path(data_dir), "rb") as f:
+            authkey = f.read()
+        conn = Client(ipc_address(data_dir), authkey=authkey)
+    except (OSError, EOFError) as e:
+        raise NoInstance(str(e)) from e
+    except Exception as e:
+        # AuthenticationError: a stale key from an instance that has since gone
+        raise NoInstance(str(e)) from e
+    with conn:
+        conn.send_bytes(json.dumps({"cmd": cmd, "args": args}).encode("utf-8"))
+        if not conn.poll(REQUEST_TIMEOUT):
+            raise NoInstance("the running instance did not answer")
+        reply = json.loads(conn.recv_bytes())
+    if not reply.get("ok"):
+        raise RuntimeError(reply.get("error", "request failed"))
+    return reply.get("result")